@@ -0,0 +1,367 @@
+import os
+import sys
+import io
+import json
+import time
+import random
+import argparse
+import platform
+import resource
+import statistics
+import subprocess
+import contextlib
+import multiprocessing
+
+import numpy as np
+
+from cargar_input import leer_input
+from presolve import presolve
+from verificador import verificar
+from script import leer_config, cargar_modulo, parametros_solver, GRACIA_KILL, GRACIA_KILL_MIN
+
+# Tolerancias por defecto de la comparación contra la base (se pisan desde el .cfg)
+TOLERANCIAS = {
+    "tolerancia_objetivo": 0.01,   # caída relativa admitida del objetivo
+    "tolerancia_tiempo": 0.5,      # aumento relativo admitido del tiempo a la mejor solución
+    "holgura_tiempo": 2.0,         # ... más estos segundos
+    "tolerancia_memoria": 0.2,     # aumento relativo admitido del pico de memoria
+    "holgura_memoria": 20.0,       # ... más estos MB
+}
+# Métodos cuyas soluciones se anotan con su tiempo durante la corrida: lo
+# que devuelven o, en precalcular_incumbentes (Basic), los incumbentes que deja
+METODOS_INSTRUMENTADOS = {
+    "Opt_cantidadPasillosFija": lambda solver, devuelto: [devuelto],
+    "Opt_PasillosFijos": lambda solver, devuelto: [devuelto],
+    "precalcular_incumbentes": lambda solver, devuelto: list(solver.incumbentes.values()),
+}
+
+
+def clases_solver(modulo):
+    # Clases con Opt_ExplorarCantidadPasillos definidas en el propio módulo
+    # (no las importadas, como Basic en dinkelbach_solver.py)
+    return [nombre for nombre, valor in vars(modulo).items()
+            if isinstance(valor, type) and valor.__module__ == modulo.__name__
+            and hasattr(valor, "Opt_ExplorarCantidadPasillos")]
+
+
+def crear_solver(modulo, clase, W, S, LB, UB, parametros):
+    propias = clases_solver(modulo)
+    if clase is None:
+        if "Columns" in propias:
+            clase = "Columns"
+        elif len(propias) == 1:
+            clase = propias[0]
+        else:
+            raise ValueError(f"{modulo.__file__}: no se puede elegir el solver entre {propias or 'ninguna clase'}; "
+                             "indicarlo con ruta.py:Clase")
+    elif clase not in propias:
+        raise ValueError(f"{modulo.__file__}: {clase} no es un solver definido en el módulo")
+    solver = getattr(modulo, clase)(W, S, LB, UB)
+    for nombre, valor in parametros.items():
+        if hasattr(solver, nombre):
+            setattr(solver, nombre, valor)
+    return solver
+
+
+def instrumentar(solver, inicio, historial):
+    # Envuelve los métodos del solver (en la instancia, así las llamadas
+    # internas self.Opt_... también pasan por acá) para guardar cada solución
+    # que devuelven con el momento en que la devolvieron. Se verifican al final.
+    def envolver(metodo, soluciones):
+        def envuelto(*args, **kwargs):
+            devuelto = metodo(*args, **kwargs)
+            t = time.time() - inicio
+            for solucion in soluciones(solver, devuelto):
+                if solucion and solucion.get("pasillos_seleccionados"):
+                    historial.append((t, frozenset(solucion["ordenes_seleccionadas"]),
+                                      frozenset(solucion["pasillos_seleccionados"])))
+            return devuelto
+        return envuelto
+
+    for nombre, soluciones in METODOS_INSTRUMENTADOS.items():
+        if hasattr(solver, nombre):
+            setattr(solver, nombre, envolver(getattr(solver, nombre), soluciones))
+
+
+def cota_global(solver):
+    # Cota superior del cociente sobre todos los k: la de CotasK
+    cotas_k = getattr(solver, "cotas_k", None)
+    if cotas_k is None:
+        return None
+    cota = max((cotas_k.cota(k) for k in range(1, cotas_k.n_pasillos + 1)), default=-float("inf"))
+    return cota if cota > -float("inf") else None
+
+
+def cota_lagrangiana_restringida(solver):
+    # Mejor cociente al que puede llegar la formulación por columnas del
+    # solver, según sus cotas lagrangianas (en unidades) por k. El maestro
+    # restringe el problema, así que no acota al óptimo del problema real.
+    lagrangianas = getattr(solver, "cotas_lagrangianas", None)
+    if not lagrangianas:
+        return None
+    return max(cota / k for k, cota in lagrangianas.items())
+
+
+def linea_de_tiempo(W, S, LB, UB, historial):
+    # (tiempo a la primera factible, tiempo a cada mejora) de las soluciones
+    # anotadas, en orden; sólo se verifican las que mejorarían el cociente
+    primera = None
+    mejoras = []
+    mejor = -float("inf")
+    for t, ordenes, pasillos in historial:
+        valor = float(W.totales[list(ordenes)].sum()) / len(pasillos)
+        if primera is not None and valor <= mejor:
+            continue
+        if not verificar(W, S, LB, UB, sorted(ordenes), sorted(pasillos))["factible"]:
+            continue
+        if primera is None:
+            primera = t
+        if valor > mejor:
+            mejor = valor
+            mejoras.append((t, valor))
+    return primera, mejoras
+
+
+def correr(path_modelo, clase, path_instancia, segundos, semilla, usar_cache, usar_presolve, parametros):
+    # Una corrida: el solver sobre la instancia ya presuelta (como en
+    # script.py), con las semillas fijas. Devuelve las métricas.
+    random.seed(semilla)
+    np.random.seed(semilla)
+    modulo = cargar_modulo(path_modelo)
+    W, S, LB, UB = leer_input(path_instancia, usar_cache=usar_cache)
+    if usar_presolve:
+        reduccion = presolve(W, S, LB, UB)
+        W, S = reduccion.W, reduccion.S
+
+    inicio = time.time()
+    historial = []
+    solver = crear_solver(modulo, clase, W, S, LB, UB, parametros)
+    instrumentar(solver, inicio, historial)
+    resultado = solver.Opt_ExplorarCantidadPasillos(segundos)
+    tiempo_total = time.time() - inicio
+    if resultado and resultado.get("pasillos_seleccionados"):
+        historial.append((tiempo_total, frozenset(resultado["ordenes_seleccionadas"]),
+                          frozenset(resultado["pasillos_seleccionados"])))
+
+    metricas = {"factible": False, "objetivo": None, "tiempo_total": round(tiempo_total, 2),
+                "tiempo_primera_factible": None, "tiempo_mejor": None, "cota": cota_global(solver),
+                "cota_lagrangiana_restringida": cota_lagrangiana_restringida(solver)}
+    if resultado and resultado.get("pasillos_seleccionados"):
+        reporte = verificar(W, S, LB, UB, sorted(resultado["ordenes_seleccionadas"]),
+                            sorted(resultado["pasillos_seleccionados"]))
+        metricas["factible"] = reporte["factible"]
+        metricas["objetivo"] = reporte.get("valor_objetivo")
+    primera, mejoras = linea_de_tiempo(W, S, LB, UB, historial)
+    if primera is not None:
+        metricas["tiempo_primera_factible"] = round(primera, 2)
+    if metricas["factible"]:
+        # La primera vez que se alcanzó el objetivo final
+        metricas["tiempo_mejor"] = round(next((t for t, v in mejoras if v >= metricas["objetivo"] - 1e-9),
+                                              tiempo_total), 2)
+    # En Linux ru_maxrss está en KB
+    metricas["memoria_pico_mb"] = round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+    return metricas
+
+
+def _trabajador(conexion, log_path, *args):
+    destino = open(log_path, "w", buffering=1) if log_path else io.StringIO()
+    with destino, contextlib.redirect_stdout(destino), contextlib.redirect_stderr(destino):
+        try:
+            metricas = correr(*args)
+        except Exception as e:
+            print(f"❌ Error: {e!r}")
+            metricas = {"error": repr(e)}
+    conexion.send(metricas)
+    conexion.close()
+
+
+def correr_en_proceso(args, limite, log_path=None):
+    # Cada corrida en un proceso propio: el pico de memoria es sólo suyo y
+    # no hereda estado (cachés, columnas) de corridas anteriores
+    contexto = multiprocessing.get_context()
+    receptor, emisor = contexto.Pipe(duplex=False)
+    proceso = contexto.Process(target=_trabajador, args=(emisor, log_path) + tuple(args))
+    proceso.start()
+    emisor.close()
+    if receptor.poll(limite):
+        try:
+            metricas = receptor.recv()
+        except EOFError:
+            metricas = {"error": f"terminó sin resultado (código {proceso.exitcode})"}
+    else:
+        proceso.terminate()
+        proceso.join(2)
+        if proceso.is_alive():
+            proceso.kill()
+        metricas = {"error": f"superó {limite:.0f}s, se corta"}
+    proceso.join()
+    receptor.close()
+    return metricas
+
+
+def leer_suite(config):
+    base_dir = os.path.dirname(os.path.abspath(__file__))
+    modelos = {}
+    for clave, valor in config.items():
+        if clave.startswith("model"):
+            # model0=parte4/basic_solver.py o, con otra clase, ruta.py:Clase
+            ruta, _, clase = valor.partition(":")
+            modelos[f"modelo{clave[5:]}"] = (ruta, clase or None)
+    instancias = [i.strip() for i in config.get("instancias", "").split(",") if i.strip()]
+    return {
+        "base_dir": base_dir,
+        "input": os.path.join(base_dir, config.get("inPath", "datos_de_entrada")),
+        "modelos": modelos,
+        "instancias": instancias,
+        "segundos": float(config.get("segundos", 30)),
+        "semilla": int(config.get("semilla", 0)),
+        "repeticiones": int(config.get("repeticiones", 1)),
+        "usar_cache": config.get("cache", "1") != "0",
+        "usar_presolve": config.get("presolve", "1") != "0",
+        "parametros": parametros_solver(config),
+        "tolerancias": {clave: float(config.get(clave, valor)) for clave, valor in TOLERANCIAS.items()},
+    }
+
+
+def commit_actual(base_dir):
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=base_dir, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def correr_suite(suite, logs=None):
+    segundos = suite["segundos"]
+    limite = segundos + max(GRACIA_KILL_MIN, segundos * GRACIA_KILL)
+    if logs:
+        os.makedirs(logs, exist_ok=True)
+    corridas = []
+    for modelo, (ruta, clase) in suite["modelos"].items():
+        for instancia in suite["instancias"]:
+            path_instancia = os.path.join(suite["input"], instancia + ".txt")
+            for repeticion in range(suite["repeticiones"]):
+                log_path = None
+                if logs:
+                    log_path = os.path.join(logs, f"{modelo}_{instancia.replace('/', '_')}_{repeticion}.log")
+                print(f"▶️ {modelo} ({ruta}) - {instancia} [{repeticion + 1}/{suite['repeticiones']}]", flush=True)
+                args = (os.path.join(suite["base_dir"], ruta), clase, path_instancia, segundos, suite["semilla"],
+                        suite["usar_cache"], suite["usar_presolve"], suite["parametros"])
+                metricas = correr_en_proceso(args, limite, log_path)
+                corridas.append(dict(modelo=modelo, ruta=ruta, instancia=instancia, repeticion=repeticion,
+                                     semilla=suite["semilla"], **metricas))
+                print(f"   {formatear(corridas[-1])}", flush=True)
+    return corridas
+
+
+def formatear(corrida):
+    if "error" in corrida:
+        return f"❌ {corrida['error']}"
+    def num(valor, formato):
+        return format(valor, formato) if valor is not None else "-"
+    return (f"{'✅' if corrida['factible'] else '❌'} objetivo {num(corrida['objetivo'], '.4f')}, "
+            f"cota {num(corrida['cota'], '.4f')}, primera factible {num(corrida['tiempo_primera_factible'], '.1f')}s, "
+            f"mejor {num(corrida['tiempo_mejor'], '.1f')}s, total {corrida['tiempo_total']:.1f}s, "
+            f"memoria {corrida['memoria_pico_mb']:.0f} MB")
+
+
+def agrupar(corridas):
+    # Mediana de cada métrica sobre las repeticiones de (modelo, instancia)
+    grupos = {}
+    for corrida in corridas:
+        grupos.setdefault((corrida["modelo"], corrida["instancia"]), []).append(corrida)
+
+    def mediana(lista, clave):
+        valores = [c[clave] for c in lista if c.get(clave) is not None]
+        return statistics.median(valores) if valores else None
+
+    return {clave: {"factible": all(c.get("factible") for c in lista),
+                    "objetivo": mediana(lista, "objetivo"),
+                    "tiempo_mejor": mediana(lista, "tiempo_mejor"),
+                    "memoria_pico_mb": mediana(lista, "memoria_pico_mb")}
+            for clave, lista in grupos.items()}
+
+
+def comparar(actual, base, tolerancias):
+    # Una línea por (modelo, instancia) con ✅ / ❌; devuelve cuántas fallaron.
+    # Falla si deja de ser factible, si el objetivo cae más que la tolerancia,
+    # si tarda más en llegar a la mejor solución sin mejorarla, o si el pico
+    # de memoria crece más que la tolerancia.
+    actual, base = agrupar(actual), agrupar(base)
+    fallas = 0
+    for clave in sorted(set(actual) | set(base)):
+        modelo, instancia = clave
+        if clave not in actual or clave not in base:
+            print(f"⚠️ {modelo} {instancia}: sólo está en {'la base' if clave in base else 'la corrida actual'}")
+            continue
+        a, b = actual[clave], base[clave]
+        problemas = []
+        if b["factible"] and not a["factible"]:
+            problemas.append("dejó de ser factible")
+        obj_a, obj_b = a["objetivo"] or 0.0, b["objetivo"] or 0.0
+        if obj_a < obj_b * (1 - tolerancias["tolerancia_objetivo"]) - 1e-9:
+            problemas.append(f"objetivo {100 * (obj_b - obj_a) / obj_b:.1f}% peor")
+        if (obj_a <= obj_b + 1e-9 and a["tiempo_mejor"] is not None and b["tiempo_mejor"] is not None
+                and a["tiempo_mejor"] > b["tiempo_mejor"] * (1 + tolerancias["tolerancia_tiempo"]) + tolerancias["holgura_tiempo"]):
+            problemas.append("tarda más en llegar a la mejor solución")
+        if (a["memoria_pico_mb"] is not None and b["memoria_pico_mb"] is not None
+                and a["memoria_pico_mb"] > b["memoria_pico_mb"] * (1 + tolerancias["tolerancia_memoria"]) + tolerancias["holgura_memoria"]):
+            problemas.append("usa más memoria")
+
+        def par(clave_metrica, formato, unidad=""):
+            valores = [format(m[clave_metrica], formato) if m[clave_metrica] is not None else "-" for m in (b, a)]
+            return f"{valores[0]} → {valores[1]}{unidad}"
+
+        fallas += bool(problemas)
+        print(f"{'❌' if problemas else '✅'} {modelo} {instancia}: objetivo {par('objetivo', '.4f')}, "
+              f"mejor a los {par('tiempo_mejor', '.1f', 's')}, memoria {par('memoria_pico_mb', '.0f', ' MB')}"
+              + (f" ({'; '.join(problemas)})" if problemas else ""))
+    return fallas
+
+
+def leer_resultados(path):
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Corre la suite de benchmark de un .cfg y la compara contra una base")
+    parser.add_argument("config", nargs="?", default="benchmark.cfg", help="suite a correr (por defecto benchmark.cfg)")
+    parser.add_argument("--salida", default="benchmark_resultados.json", help="archivo JSON con los resultados")
+    parser.add_argument("--base", default=None, help="resultados de referencia contra los que comparar")
+    parser.add_argument("--comparar", default=None,
+                        help="no corre nada: compara este archivo de resultados contra --base")
+    parser.add_argument("--logs", default=None, help="carpeta donde guardar la salida de cada corrida")
+    args = parser.parse_args()
+
+    if args.comparar:
+        if not args.base:
+            parser.error("--comparar necesita --base")
+        resultados = leer_resultados(args.comparar)
+    else:
+        suite = leer_suite(leer_config(args.config))
+        print(f"Suite {args.config}: {len(suite['modelos'])} modelos × {len(suite['instancias'])} instancias × "
+              f"{suite['repeticiones']} repeticiones, {suite['segundos']:.0f}s cada una, semilla {suite['semilla']}")
+        inicio = time.time()
+        resultados = {
+            "config": args.config,
+            "commit": commit_actual(suite["base_dir"]),
+            "fecha": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "python": platform.python_version(),
+            "cpus": os.cpu_count(),
+            "segundos": suite["segundos"],
+            "semilla": suite["semilla"],
+            "parametros": suite["parametros"],
+            "tolerancias": suite["tolerancias"],
+            "corridas": correr_suite(suite, args.logs),
+        }
+        with open(args.salida, "w", encoding="utf-8") as f:
+            json.dump(resultados, f, indent=2, ensure_ascii=False)
+        print(f"\nResultados guardados en {args.salida} ({time.time() - inicio:.0f} segundos)")
+
+    if args.base:
+        base = leer_resultados(args.base)
+        print(f"\nComparación contra {args.base} (commit {base.get('commit')}):")
+        fallas = comparar(resultados["corridas"], base["corridas"], resultados.get("tolerancias", TOLERANCIAS))
+        print(f"\n{'❌' if fallas else '✅'} {fallas} regresiones")
+        sys.exit(1 if fallas else 0)
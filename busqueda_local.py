@@ -0,0 +1,279 @@
+import random
+import time
+import numpy as np
+
+from cargar_input import MatrizDispersa
+
+# Cada cuántos movimientos se mira el reloj en BusquedaLocal.mejorar
+MOVIMIENTOS_POR_CONTROL = 256
+
+
+def sin_memmap(M):
+    # Misma matriz sobre vistas ndarray: los arreglos de la caché son memmap,
+    # y cada rebanada de un memmap cuesta varias veces más que la de un ndarray
+    return MatrizDispersa(M.n_filas, M.n_columnas, *(np.asarray(getattr(M, nombre)).view(np.ndarray)
+                                                       for nombre in ("indptr", "indices", "datos", "totales")))
+
+
+class ConjuntoIndexado:
+    # Subconjunto de 0..n-1 con alta, baja y elección al azar en O(1)
+    def __init__(self, n, elementos=()):
+        self.elementos = []
+        self.posicion = np.full(n, -1, dtype=np.int64)
+        for e in elementos:
+            self.agregar(e)
+
+    def __len__(self):
+        return len(self.elementos)
+
+    def __contains__(self, e):
+        return self.posicion[e] >= 0
+
+    def agregar(self, e):
+        self.posicion[e] = len(self.elementos)
+        self.elementos.append(e)
+
+    def quitar(self, e):
+        pos = self.posicion[e]
+        ultimo = self.elementos.pop()
+        if ultimo != e:
+            self.elementos[pos] = ultimo
+            self.posicion[ultimo] = pos
+        self.posicion[e] = -1
+
+    def al_azar(self, generador):
+        return self.elementos[generador.randrange(len(self.elementos))]
+
+
+class BusquedaLocal:
+    # Búsqueda local sobre una solución factible (órdenes, pasillos). Mantiene
+    # la holgura por ítem (existencias de los pasillos abiertos menos demanda
+    # de las órdenes elegidas), las unidades totales y la demanda por ítem de
+    # las órdenes no elegidas, así que cada movimiento se evalúa y se aplica
+    # recorriendo sólo los no nulos de las órdenes y pasillos que toca:
+    #   - agregar una orden (sube las unidades),
+    #   - intercambiar una orden elegida por otra con más unidades,
+    #   - cerrar un pasillo (baja k),
+    #   - cerrar un pasillo quitando las órdenes que lo necesitan, si el
+    #     cociente mejora (recorre además las órdenes de los ítems faltantes),
+    #   - intercambiar un pasillo abierto por uno cerrado con más existencias
+    #     útiles para las órdenes no elegidas (no cambia el cociente, pero
+    #     habilita nuevas órdenes).
+    # Ningún movimiento aceptado empeora unidades / pasillos.
+    MOVIMIENTOS = ("agregar_orden", "intercambiar_orden", "cerrar_pasillo", "cerrar_pasillo_quitando",
+                   "intercambiar_pasillo")
+
+    def __init__(self, W, S, LB, UB, ordenes, pasillos, semilla=0):
+        self.W = W = sin_memmap(W)
+        self.S = S = sin_memmap(S)
+        self.LB = LB
+        self.UB = UB
+        self.generador = random.Random(semilla)
+        self.unidades_orden = W.totales.astype(np.int64)
+        self.ordenes_por_item = W.transpuesta()
+
+        ordenes = sorted(int(o) for o in ordenes)
+        pasillos = sorted(int(a) for a in pasillos)
+        self.ordenes = ConjuntoIndexado(W.n_filas, ordenes)
+        self.libres = ConjuntoIndexado(W.n_filas, (o for o in range(W.n_filas) if o not in self.ordenes))
+        self.pasillos = ConjuntoIndexado(S.n_filas, pasillos)
+        self.cerrados = ConjuntoIndexado(S.n_filas, (a for a in range(S.n_filas) if a not in self.pasillos))
+
+        demanda = W.suma_filas(ordenes) if ordenes else np.zeros(W.n_columnas, dtype=np.int64)
+        capacidad = S.suma_filas(pasillos) if pasillos else np.zeros(S.n_columnas, dtype=np.int64)
+        self.holgura = capacidad - demanda
+        self.demanda_libre = self.ordenes_por_item.totales.astype(np.int64) - demanda
+        self.unidades = int(self.unidades_orden[ordenes].sum()) if ordenes else 0
+        self.movimientos = dict.fromkeys(self.MOVIMIENTOS, 0)
+        self.evaluados = 0
+
+    def factible(self):
+        return len(self.pasillos) > 0 and self.LB <= self.unidades <= self.UB and bool((self.holgura >= 0).all())
+
+    def valor(self):
+        return self.unidades / len(self.pasillos) if len(self.pasillos) else 0.0
+
+    # --- Cambios de estado, O(no nulos) ---
+
+    def _agregar_orden(self, o):
+        idx, cant = self.W.fila(o)
+        self.holgura[idx] -= cant
+        self.demanda_libre[idx] -= cant
+        self.unidades += int(self.unidades_orden[o])
+        self.libres.quitar(o)
+        self.ordenes.agregar(o)
+
+    def _quitar_orden(self, o):
+        idx, cant = self.W.fila(o)
+        self.holgura[idx] += cant
+        self.demanda_libre[idx] += cant
+        self.unidades -= int(self.unidades_orden[o])
+        self.ordenes.quitar(o)
+        self.libres.agregar(o)
+
+    def _abrir_pasillo(self, a):
+        idx, cant = self.S.fila(a)
+        self.holgura[idx] += cant
+        self.cerrados.quitar(a)
+        self.pasillos.agregar(a)
+
+    def _cerrar_pasillo(self, a):
+        idx, cant = self.S.fila(a)
+        self.holgura[idx] -= cant
+        self.pasillos.quitar(a)
+        self.cerrados.agregar(a)
+
+    def _utilidad_pasillo(self, a):
+        # Existencias del pasillo que todavía podrían usar las órdenes no elegidas
+        idx, cant = self.S.fila(a)
+        return int(np.minimum(cant, np.maximum(self.demanda_libre[idx], 0)).sum())
+
+    # --- Movimientos: devuelven True si se aplicaron ---
+
+    def agregar_orden(self, o):
+        if self.unidades + self.unidades_orden[o] > self.UB:
+            return False
+        idx, cant = self.W.fila(o)
+        if (self.holgura[idx] < cant).any():
+            return False
+        self._agregar_orden(o)
+        return True
+
+    def intercambiar_orden(self, sale, entra):
+        unidades = self.unidades - self.unidades_orden[sale] + self.unidades_orden[entra]
+        if unidades <= self.unidades or unidades > self.UB:
+            return False
+        idx_sale, cant_sale = self.W.fila(sale)
+        idx_entra, cant_entra = self.W.fila(entra)
+        self.holgura[idx_sale] += cant_sale
+        entra_cabe = not (self.holgura[idx_entra] < cant_entra).any()
+        self.holgura[idx_sale] -= cant_sale
+        if not entra_cabe:
+            return False
+        self._quitar_orden(sale)
+        self._agregar_orden(entra)
+        return True
+
+    def cerrar_pasillo(self, a):
+        if len(self.pasillos) <= 1:
+            return False
+        idx, cant = self.S.fila(a)
+        if (self.holgura[idx] < cant).any():
+            return False
+        self._cerrar_pasillo(a)
+        return True
+
+    def cerrar_pasillo_quitando(self, a):
+        # Con k - 1 pasillos el cociente mejora mientras se pierdan menos de
+        # unidades / k unidades (y se siga en LB): se corta apenas se pasa
+        if len(self.pasillos) <= 1:
+            return False
+        idx, cant = self.S.fila(a)
+        faltantes = idx[self.holgura[idx] < cant].tolist()
+        margen = min(self.unidades / len(self.pasillos), self.unidades - self.LB + 1)
+        self._cerrar_pasillo(a)
+        quitadas = []
+        perdidas = 0
+        for i in faltantes:
+            if self.holgura[i] >= 0:
+                continue
+            # Las primeras órdenes elegidas que piden i hasta cubrir lo que falta
+            ordenes_i, cant_i = self.ordenes_por_item.fila(i)
+            elegidas = self.ordenes.posicion[ordenes_i] >= 0
+            ordenes_i, cant_i = ordenes_i[elegidas], cant_i[elegidas]
+            n = int(np.searchsorted(np.cumsum(cant_i), -self.holgura[i])) + 1
+            for o in ordenes_i[:n].tolist():
+                perdidas += int(self.unidades_orden[o])
+                self._quitar_orden(o)
+                quitadas.append(o)
+            if perdidas >= margen:
+                break
+        if perdidas < margen:
+            return True
+        for o in quitadas:
+            self._agregar_orden(o)
+        self._abrir_pasillo(a)
+        return False
+
+    def intercambiar_pasillo(self, sale, entra):
+        if self._utilidad_pasillo(entra) <= self._utilidad_pasillo(sale):
+            return False
+        idx_entra, cant_entra = self.S.fila(entra)
+        idx_sale, cant_sale = self.S.fila(sale)
+        self.holgura[idx_entra] += cant_entra
+        sale_sobra = not (self.holgura[idx_sale] < cant_sale).any()
+        self.holgura[idx_entra] -= cant_entra
+        if not sale_sobra:
+            return False
+        self._abrir_pasillo(entra)
+        self._cerrar_pasillo(sale)
+        return True
+
+    def movimiento_al_azar(self):
+        g = self.generador
+        tipo = self.MOVIMIENTOS[g.randrange(len(self.MOVIMIENTOS))]
+        if tipo == "agregar_orden":
+            aplicado = len(self.libres) > 0 and self.agregar_orden(self.libres.al_azar(g))
+        elif tipo == "intercambiar_orden":
+            aplicado = len(self.libres) > 0 and len(self.ordenes) > 0 and self.intercambiar_orden(
+                self.ordenes.al_azar(g), self.libres.al_azar(g))
+        elif tipo == "cerrar_pasillo":
+            aplicado = len(self.pasillos) > 1 and self.cerrar_pasillo(self.pasillos.al_azar(g))
+        elif tipo == "cerrar_pasillo_quitando":
+            aplicado = len(self.pasillos) > 1 and self.cerrar_pasillo_quitando(self.pasillos.al_azar(g))
+        else:
+            aplicado = len(self.cerrados) > 0 and self.intercambiar_pasillo(
+                self.pasillos.al_azar(g), self.cerrados.al_azar(g))
+        self.evaluados += 1
+        if aplicado:
+            self.movimientos[tipo] += 1
+        return aplicado
+
+    def mejorar(self, umbral, max_movimientos=None):
+        # Movimientos al azar hasta agotar `umbral` segundos (o max_movimientos
+        # evaluados). Devuelve las estadísticas de la corrida.
+        inicio = time.time()
+        valor_inicial = self.valor()
+        while max_movimientos is None or self.evaluados < max_movimientos:
+            if self.evaluados % MOVIMIENTOS_POR_CONTROL == 0 and time.time() - inicio > umbral:
+                break
+            self.movimiento_al_azar()
+        duracion = time.time() - inicio
+        return {
+            "valor_inicial": valor_inicial,
+            "valor_final": self.valor(),
+            "evaluados": self.evaluados,
+            "aplicados": dict(self.movimientos),
+            "tiempo": duracion,
+            "movimientos_por_segundo": self.evaluados / max(duracion, 1e-9),
+        }
+
+    def solucion(self):
+        return set(self.ordenes.elementos), set(self.pasillos.elementos)
+
+
+def mejorar_resultado(W, S, LB, UB, resultado, umbral, semilla=0):
+    # Post-proceso del dict de Opt_ExplorarCantidadPasillos: si la solución es
+    # factible, la mejora con BusquedaLocal durante `umbral` segundos y
+    # actualiza órdenes, pasillos y valor objetivo (y la productividad, si
+    # está). Devuelve el mismo dict.
+    if not resultado or umbral <= 0 or not resultado.get("pasillos_seleccionados"):
+        return resultado
+    busqueda = BusquedaLocal(W, S, LB, UB, resultado["ordenes_seleccionadas"],
+                             resultado["pasillos_seleccionados"], semilla)
+    if not busqueda.factible():
+        print("⚠️ Búsqueda local: la solución de partida no es factible, se deja como está.")
+        return resultado
+
+    estadisticas = busqueda.mejorar(umbral)
+    if estadisticas["valor_final"] > estadisticas["valor_inicial"]:
+        ordenes, pasillos = busqueda.solucion()
+        resultado["ordenes_seleccionadas"] = ordenes
+        resultado["pasillos_seleccionados"] = pasillos
+        resultado["valor_objetivo"] = busqueda.valor()
+        if "productividad_por_pasillo" in resultado:
+            resultado["productividad_por_pasillo"] = busqueda.valor()
+    resultado["busqueda_local"] = estadisticas
+    print(f"🔧 Búsqueda local: {estadisticas['valor_inicial']:.4f} → {estadisticas['valor_final']:.4f} "
+          f"({estadisticas['evaluados']} movimientos, {estadisticas['movimientos_por_segundo']:.0f}/s)")
+    return resultado
@@ -1,27 +1,295 @@
-def leer_input(nombre_archivo):
+import argparse
+import glob
+import hashlib
+import json
+import os
+import shutil
+import numpy as np
+
+# Caché binaria de instancias ya parseadas: un directorio por archivo de
+# entrada con los arreglos CSR en .npy (se reabren con mmap, así varios
+# procesos comparten las mismas páginas) y un meta.json con la clave.
+DIRECTORIO_CACHE = os.environ.get(
+    "CACHE_INSTANCIAS",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache_instancias")
+)
+VERSION_CACHE = 1
+_ARREGLOS = ("indptr", "indices", "datos", "totales")
+
+
+class FilaDispersa:
+    __slots__ = ("indices", "datos", "n_columnas", "_mapa")
+
+    def __init__(self, indices, datos, n_columnas):
+        self.indices = indices
+        self.datos = datos
+        self.n_columnas = n_columnas
+        self._mapa = None
+
+    def __len__(self):
+        return self.n_columnas
+
+    def __getitem__(self, columna):
+        if self._mapa is None:
+            self._mapa = dict(zip(self.indices.tolist(), self.datos.tolist()))
+        if columna < 0:
+            columna += self.n_columnas
+        return self._mapa.get(columna, 0)
+
+    def __iter__(self):
+        return iter(self.densa().tolist())
+
+    def __array__(self, dtype=None, copy=None):
+        densa = self.densa()
+        return densa if dtype is None else densa.astype(dtype)
+
+    def densa(self):
+        densa = np.zeros(self.n_columnas, dtype=np.int64)
+        densa[self.indices] = self.datos
+        return densa
+
+    def items(self):
+        return zip(self.indices.tolist(), self.datos.tolist())
+
+
+class MatrizDispersa:
+    # Matriz entera en formato CSR. Se indexa como la lista de listas densa
+    # original (M[f][c], len(M), len(M[0])), pero el código nuevo debería
+    # recorrer sólo los no nulos con fila()/items() o con la transpuesta.
+    __slots__ = ("n_filas", "n_columnas", "indptr", "indices", "datos", "totales", "_filas", "_transpuesta")
+
+    def __init__(self, n_filas, n_columnas, indptr, indices, datos, totales=None):
+        self.n_filas = n_filas
+        self.n_columnas = n_columnas
+        self.indptr = indptr
+        self.indices = indices
+        self.datos = datos
+        if totales is None:
+            acumulado = np.concatenate(([0], np.cumsum(datos, dtype=np.int64)))
+            totales = acumulado[indptr[1:]] - acumulado[indptr[:-1]]
+        self.totales = totales
+        self._filas = [None] * n_filas
+        self._transpuesta = None
+
+    @classmethod
+    def desde_densa(cls, filas):
+        filas = np.asarray(filas, dtype=np.int64)
+        if filas.ndim != 2:
+            filas = filas.reshape(len(filas), -1)
+        n_filas, n_columnas = filas.shape
+        fila_nz, columna_nz = np.nonzero(filas)
+        indptr = np.zeros(n_filas + 1, dtype=np.int64)
+        np.cumsum(np.bincount(fila_nz, minlength=n_filas), out=indptr[1:])
+        return cls(n_filas, n_columnas, indptr, columna_nz.astype(np.int32), filas[fila_nz, columna_nz].astype(np.int32))
+
+    def __len__(self):
+        return self.n_filas
+
+    def __getitem__(self, fila):
+        if fila < 0:
+            fila += self.n_filas
+        if not 0 <= fila < self.n_filas:
+            raise IndexError(fila)
+        vista = self._filas[fila]
+        if vista is None:
+            ini, fin = self.indptr[fila], self.indptr[fila + 1]
+            vista = FilaDispersa(self.indices[ini:fin], self.datos[ini:fin], self.n_columnas)
+            self._filas[fila] = vista
+        return vista
+
+    def __iter__(self):
+        for fila in range(self.n_filas):
+            yield self[fila]
+
+    def __array__(self, dtype=None, copy=None):
+        densa = self.densa()
+        return densa if dtype is None else densa.astype(dtype)
+
+    @property
+    def nnz(self):
+        return len(self.datos)
+
+    def fila(self, fila):
+        ini, fin = self.indptr[fila], self.indptr[fila + 1]
+        return self.indices[ini:fin], self.datos[ini:fin]
+
+    def items(self, fila):
+        ini, fin = self.indptr[fila], self.indptr[fila + 1]
+        return zip(self.indices[ini:fin].tolist(), self.datos[ini:fin].tolist())
+
+    def suma_filas(self, filas):
+        # Vector denso con la suma de las filas dadas (p. ej. la demanda por
+        # ítem de un conjunto de órdenes), recorriendo sólo sus no nulos
+        filas = np.asarray(filas, dtype=np.int64)
+        largos = self.indptr[filas + 1] - self.indptr[filas]
+        inicio = np.repeat(self.indptr[filas] - np.concatenate(([0], np.cumsum(largos)[:-1])), largos)
+        posiciones = inicio + np.arange(largos.sum())
+        return np.bincount(self.indices[posiciones], weights=self.datos[posiciones],
+                           minlength=self.n_columnas).astype(np.int64)
+
+    def densa(self):
+        densa = np.zeros((self.n_filas, self.n_columnas), dtype=np.int64)
+        filas = np.repeat(np.arange(self.n_filas), np.diff(self.indptr))
+        densa[filas, self.indices] = self.datos
+        return densa
+
+    def transpuesta(self):
+        # Para W da, por ítem, las órdenes que lo piden; para S, los pasillos que lo tienen.
+        if self._transpuesta is None:
+            filas = np.repeat(np.arange(self.n_filas, dtype=np.int32), np.diff(self.indptr))
+            orden = np.lexsort((filas, self.indices))
+            indptr = np.zeros(self.n_columnas + 1, dtype=np.int64)
+            np.cumsum(np.bincount(self.indices, minlength=self.n_columnas), out=indptr[1:])
+            self._transpuesta = MatrizDispersa(self.n_columnas, self.n_filas, indptr, filas[orden], self.datos[orden])
+        return self._transpuesta
+
+    def memoria_bytes(self):
+        return self.indptr.nbytes + self.indices.nbytes + self.datos.nbytes + self.totales.nbytes
+
+
+def asegurar_dispersa(M):
+    if isinstance(M, MatrizDispersa):
+        return M
+    return MatrizDispersa.desde_densa(M)
+
+
+def _leer_bloque(tokens, pos, n_filas, n_columnas):
+    largos = np.zeros(n_filas, dtype=np.int64)
+    posiciones = np.zeros(n_filas, dtype=np.int64)
+    for fila in range(n_filas):
+        largos[fila] = tokens[pos]
+        posiciones[fila] = pos + 1
+        pos += 1 + 2 * int(tokens[pos])
+
+    # Índices de todos los pares (elemento, cantidad) del bloque, en orden de fila
+    indptr = np.zeros(n_filas + 1, dtype=np.int64)
+    np.cumsum(largos, out=indptr[1:])
+    desplazamiento = np.arange(indptr[-1]) - np.repeat(indptr[:-1], largos)
+    base = np.repeat(posiciones, largos) + 2 * desplazamiento
+    elementos = tokens[base]
+    cantidades = tokens[base + 1]
+
+    # Ordenar por elemento dentro de cada fila; si un elemento se repite, vale
+    # la última aparición (igual que la asignación sobre la matriz densa).
+    filas = np.repeat(np.arange(n_filas), largos)
+    orden = np.lexsort((np.arange(len(elementos)), elementos, filas))
+    filas, elementos, cantidades = filas[orden], elementos[orden], cantidades[orden]
+    ultimo = np.ones(len(elementos), dtype=bool)
+    ultimo[:-1] = (filas[1:] != filas[:-1]) | (elementos[1:] != elementos[:-1])
+    ultimo &= cantidades != 0
+    filas, elementos, cantidades = filas[ultimo], elementos[ultimo], cantidades[ultimo]
+
+    indptr[:] = 0
+    np.cumsum(np.bincount(filas, minlength=n_filas), out=indptr[1:])
+    matriz = MatrizDispersa(n_filas, n_columnas, indptr, elementos.astype(np.int32), cantidades.astype(np.int32))
+    return matriz, pos
+
+
+def _parsear(nombre_archivo):
     with open(nombre_archivo, 'r') as f:
-        lineas = f.read().strip().split('\n')
-    
-    o, i, a = map(int, lineas[0].split())
-
-    W = [[0] * i for _ in range(o)]
-    for idx in range(1, 1 + o):
-        partes = list(map(int, lineas[idx].split()))
-        k = partes[0]
-        for j in range(k):
-            item = partes[1 + 2*j]
-            cantidad = partes[1 + 2*j + 1]
-            W[idx - 1][item] = cantidad
-
-    S = [[0] * i for _ in range(a)]
-    for idx in range(1 + o, 1 + o + a):
-        partes = list(map(int, lineas[idx].split()))
-        l = partes[0]
-        for j in range(l):
-            item = partes[1 + 2*j]
-            cantidad = partes[1 + 2*j + 1]
-            S[idx - (1 + o)][item] = cantidad
-
-    LB, UB = map(int, lineas[-1].split())
+        tokens = np.array(f.read().split(), dtype=np.int64)
+
+    o, i, a = (int(t) for t in tokens[:3])
+
+    W, pos = _leer_bloque(tokens, 3, o, i)
+    S, pos = _leer_bloque(tokens, pos, a, i)
+
+    LB, UB = (int(t) for t in tokens[-2:])
     return W, S, LB, UB
-    
+
+
+def _directorio_cache(ruta):
+    return os.path.join(DIRECTORIO_CACHE, hashlib.sha1(ruta.encode("utf-8")).hexdigest()[:16])
+
+
+def _clave_cache(ruta):
+    # Una entrada es válida sólo si la ruta, el mtime y el tamaño del archivo
+    # de entrada coinciden con los guardados; si no, se vuelve a parsear y se
+    # reemplaza la entrada completa.
+    estado = os.stat(ruta)
+    return {"ruta": ruta, "mtime_ns": estado.st_mtime_ns, "tamano": estado.st_size, "version": VERSION_CACHE}
+
+
+def _leer_cache(directorio, clave):
+    try:
+        with open(os.path.join(directorio, "meta.json"), "r") as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if any(meta.get(campo) != valor for campo, valor in clave.items()):
+        return None
+
+    matrices = []
+    for nombre in ("W", "S"):
+        arreglos = [np.load(os.path.join(directorio, f"{nombre}_{arr}.npy"), mmap_mode="r") for arr in _ARREGLOS]
+        n_filas, n_columnas = meta[nombre]
+        matrices.append(MatrizDispersa(n_filas, n_columnas, *arreglos))
+    return matrices[0], matrices[1], meta["LB"], meta["UB"]
+
+
+def _escribir_cache(directorio, clave, W, S, LB, UB):
+    temporal = f"{directorio}.tmp-{os.getpid()}"
+    shutil.rmtree(temporal, ignore_errors=True)
+    os.makedirs(temporal)
+    for nombre, M in (("W", W), ("S", S)):
+        for arr in _ARREGLOS:
+            np.save(os.path.join(temporal, f"{nombre}_{arr}.npy"), getattr(M, arr))
+    meta = dict(clave, W=[W.n_filas, W.n_columnas], S=[S.n_filas, S.n_columnas], LB=LB, UB=UB)
+    with open(os.path.join(temporal, "meta.json"), "w") as f:
+        json.dump(meta, f)
+
+    shutil.rmtree(directorio, ignore_errors=True)
+    try:
+        os.rename(temporal, directorio)
+    except OSError:
+        # Otro proceso escribió la misma entrada primero
+        shutil.rmtree(temporal, ignore_errors=True)
+
+
+def leer_input(nombre_archivo, usar_cache=False):
+    if not usar_cache:
+        return _parsear(nombre_archivo)
+
+    ruta = os.path.abspath(nombre_archivo)
+    clave = _clave_cache(ruta)
+    directorio = _directorio_cache(ruta)
+
+    datos = _leer_cache(directorio, clave)
+    if datos is not None:
+        return datos
+
+    W, S, LB, UB = _parsear(nombre_archivo)
+    try:
+        _escribir_cache(directorio, clave, W, S, LB, UB)
+    except OSError as e:
+        print(f"⚠️ No se pudo escribir la caché de {nombre_archivo}: {e}")
+        return W, S, LB, UB
+    return _leer_cache(directorio, clave) or (W, S, LB, UB)
+
+
+def calentar_cache(directorio):
+    archivos = sorted(glob.glob(os.path.join(directorio, "*.txt")))
+    for archivo in archivos:
+        W, S, _, _ = leer_input(archivo, usar_cache=True)
+        print(f"  {os.path.basename(archivo)}: {W.nnz} + {S.nnz} no nulos")
+    return len(archivos)
+
+
+def limpiar_cache():
+    shutil.rmtree(DIRECTORIO_CACHE, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Caché binaria de instancias")
+    parser.add_argument("--calentar", nargs="+", metavar="DIRECTORIO",
+                        help="parsea y guarda en caché todas las instancias .txt del directorio")
+    parser.add_argument("--limpiar", action="store_true", help="borra la caché completa")
+    args = parser.parse_args()
+
+    if args.limpiar:
+        limpiar_cache()
+        print(f"🗑️ Caché borrada: {DIRECTORIO_CACHE}")
+    for directorio in args.calentar or []:
+        print(f"Calentando caché para {directorio} ...")
+        n = calentar_cache(directorio)
+        print(f"✅ {n} instancias en {DIRECTORIO_CACHE}")
@@ -0,0 +1,162 @@
+import contextlib
+import importlib
+import importlib.util
+import multiprocessing
+import os
+import sys
+import time
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from cargar_input import MatrizDispersa
+
+_ARREGLOS = ("indptr", "indices", "datos", "totales")
+
+# Estado de cada proceso del pool: el solver se crea una sola vez por proceso,
+# sobre las matrices de la instancia mapeadas desde memoria compartida.
+_solver = None
+_memorias = []
+_mejor_valor = None
+
+
+def compartir_matriz(M):
+    descriptor = {"n_filas": M.n_filas, "n_columnas": M.n_columnas, "arreglos": {}}
+    memorias = []
+    for nombre in _ARREGLOS:
+        arreglo = np.ascontiguousarray(getattr(M, nombre))
+        memoria = shared_memory.SharedMemory(create=True, size=max(1, arreglo.nbytes))
+        np.ndarray(arreglo.shape, dtype=arreglo.dtype, buffer=memoria.buf)[:] = arreglo
+        descriptor["arreglos"][nombre] = (memoria.name, arreglo.dtype.str, arreglo.shape)
+        memorias.append(memoria)
+    return descriptor, memorias
+
+
+def abrir_matriz(descriptor):
+    arreglos = {}
+    memorias = []
+    for nombre, (nombre_memoria, dtype, forma) in descriptor["arreglos"].items():
+        memoria = shared_memory.SharedMemory(name=nombre_memoria)
+        arreglos[nombre] = np.ndarray(forma, dtype=np.dtype(dtype), buffer=memoria.buf)
+        memorias.append(memoria)
+    M = MatrizDispersa(descriptor["n_filas"], descriptor["n_columnas"], arreglos["indptr"],
+                       arreglos["indices"], arreglos["datos"], arreglos["totales"])
+    return M, memorias
+
+
+def _ubicacion_clase(clase):
+    modulo = sys.modules.get(clase.__module__)
+    archivo = getattr(modulo, "__file__", None)
+    return clase.__module__, os.path.abspath(archivo) if archivo else None, clase.__name__
+
+
+def _importar_clase(nombre_modulo, archivo, nombre_clase):
+    modulo = sys.modules.get(nombre_modulo)
+    if modulo is None:
+        try:
+            modulo = importlib.import_module(nombre_modulo)
+        except ImportError:
+            spec = importlib.util.spec_from_file_location(nombre_modulo, archivo)
+            modulo = importlib.util.module_from_spec(spec)
+            sys.modules[nombre_modulo] = modulo
+            spec.loader.exec_module(modulo)
+    return getattr(modulo, nombre_clase)
+
+
+def _inicializar_worker(ubicacion, desc_W, desc_S, LB, UB, atributos, mejor_valor):
+    global _solver, _mejor_valor
+    _mejor_valor = mejor_valor
+    clase = _importar_clase(*ubicacion)
+    W, memorias_W = abrir_matriz(desc_W)
+    S, memorias_S = abrir_matriz(desc_S)
+    _memorias.extend(memorias_W + memorias_S)
+
+    with open(os.devnull, "w") as nulo, contextlib.redirect_stdout(nulo):
+        _solver = clase(W, S, LB, UB)
+    for nombre, valor in atributos.items():
+        setattr(_solver, nombre, valor)
+
+
+def _resolver_k(tarea):
+    k, tiempo_k, fin_global, cota = tarea
+    restante = fin_global - time.time()
+    if restante < 1.0:
+        return k, None, None, 0.0
+    # El incumbente ya alcanza la cota de este k: no vale la pena resolverlo
+    if cota is not None and cota <= _mejor_valor.value:
+        return k, None, None, 0.0
+    # Igual que en la exploración secuencial, cada k recibe al menos 1 segundo
+    tiempo_k = min(max(1.0, tiempo_k), restante)
+
+    # Los solvers que cortan por cota usan el mejor valor de todos los procesos
+    if hasattr(_solver, "mejor_valor_conocido"):
+        _solver.mejor_valor_conocido = _mejor_valor.value
+
+    inicio = time.time()
+    with open(os.devnull, "w") as nulo, contextlib.redirect_stdout(nulo):
+        sol = _solver.Opt_cantidadPasillosFija(k, tiempo_k)
+    columnas = getattr(_solver, "columnas", None)
+    columnas_k = columnas.get(k) if isinstance(columnas, dict) else None
+    return k, sol, columnas_k, time.time() - inicio
+
+
+def explorar_k_en_paralelo(solver, lista_k, umbral, procesos, lista_umbrales=None,
+                           clave_valor="valor_objetivo", atributos=None, cotas=None):
+    # Reparte los k entre `procesos` procesos. El presupuesto total se divide
+    # entre los procesos (no entre las iteraciones): cada k recibe hasta
+    # umbral * procesos / len(lista_k) segundos, y ningún k pasa del tiempo
+    # total. Las soluciones se van recibiendo a medida que terminan.
+    # `atributos` se copian al solver de cada proceso (p. ej. columnas ya
+    # generadas por el proceso principal). Con `cotas` (un CotasK) cada
+    # proceso saltea los k cuya cota no supera al mejor valor ya encontrado.
+    inicio = time.time()
+    fin_global = inicio + umbral
+    if not lista_k:
+        return None, {}
+
+    tiempo_por_k = umbral * procesos / len(lista_k)
+    if lista_umbrales is None:
+        lista_umbrales = [umbral] * len(lista_k)
+    tareas = [(k, min(t, tiempo_por_k, umbral), fin_global, cotas.cota(k) if cotas else None)
+              for k, t in zip(lista_k, lista_umbrales)]
+
+    desc_W, memorias_W = compartir_matriz(solver.W)
+    desc_S, memorias_S = compartir_matriz(solver.S)
+    memorias = memorias_W + memorias_S
+
+    mejor_sol = None
+    mejor_valor = -float("inf")
+    columnas_por_k = {}
+    contexto = multiprocessing.get_context()
+    # Arranca en el mejor valor que ya conoce el proceso principal (si lo lleva)
+    valor_compartido = contexto.Value("d", getattr(solver, "mejor_valor_conocido", -float("inf")))
+    pool = contexto.Pool(
+        processes=procesos,
+        initializer=_inicializar_worker,
+        initargs=(_ubicacion_clase(type(solver)), desc_W, desc_S, solver.LB, solver.UB, atributos or {}, valor_compartido)
+    )
+    try:
+        resultados = pool.imap_unordered(_resolver_k, tareas)
+        for _ in tareas:
+            restante = fin_global - time.time()
+            try:
+                k, sol, columnas_k, duracion = resultados.next(timeout=max(1.0, restante + 5))
+            except multiprocessing.TimeoutError:
+                print("[TIMEOUT] Se cortó la exploración paralela por tiempo.")
+                break
+
+            if columnas_k is not None:
+                columnas_por_k[k] = columnas_k
+            if sol and sol.get(clave_valor, -float("inf")) > mejor_valor:
+                mejor_valor = sol[clave_valor]
+                mejor_sol = sol
+                valor_compartido.value = mejor_valor
+                print(f"🔄 k={k} terminó en {duracion:.1f}s → nuevo mejor valor {mejor_valor:.4f}")
+    finally:
+        pool.terminate()
+        pool.join()
+        for memoria in memorias:
+            memoria.close()
+            memoria.unlink()
+
+    return mejor_sol, columnas_por_k
@@ -0,0 +1,118 @@
+import time
+import numpy as np
+
+# Memoria máxima de la matriz de capacidades (int32, grupos x ítems) por
+# bloque de grupos que se llenan juntos en generar_columnas_greedy
+MEMORIA_BLOQUE = 128 * 1024 * 1024
+
+
+def capacidades_por_grupo(S, grupos, items):
+    # Capacidad de cada grupo de pasillos restringida a los ítems dados.
+    # Devuelve la matriz (len(grupos), len(items)) y el mapa ítem -> columna.
+    posicion = np.full(S.n_columnas, -1, dtype=np.int64)
+    posicion[items] = np.arange(len(items))
+
+    capacidades = np.zeros((len(grupos), len(items)), dtype=np.int32)
+    for g, pasillos in enumerate(grupos):
+        for a in pasillos:
+            idx, cant = S.fila(a)
+            columnas = posicion[idx]
+            util = columnas >= 0
+            capacidades[g, columnas[util]] += cant[util]
+    return capacidades, posicion
+
+
+def llenado_greedy(W, S, grupos, orden, UB, limite=None):
+    # Llena todos los grupos de pasillos a la vez recorriendo las órdenes en el
+    # orden dado: cada orden entra en todos los grupos donde todavía cabe. El
+    # costo es O(len(grupos) * no nulos de las órdenes recorridas). Si se pasa
+    # `limite` (time.time() absoluto) se corta ahí con lo seleccionado hasta
+    # el momento, que sigue siendo factible.
+    orden = np.asarray(orden, dtype=np.int64)
+    seleccion = [[] for _ in grupos]
+    totales = np.zeros(len(grupos), dtype=np.int64)
+    if len(grupos) == 0 or len(orden) == 0:
+        return seleccion, totales
+
+    recorridas = np.zeros(W.n_filas, dtype=bool)
+    recorridas[orden] = True
+    items = np.unique(W.indices[recorridas[np.repeat(np.arange(W.n_filas), np.diff(W.indptr))]])
+    capacidades, posicion = capacidades_por_grupo(S, grupos, items)
+    unidades = W.totales
+
+    espacio = UB
+    for n, o in enumerate(orden.tolist()):
+        if limite is not None and n % 256 == 0 and time.time() > limite:
+            break
+        # Sin recorrer la orden: no entra en ningún grupo por UB
+        u = int(unidades[o])
+        if u > espacio:
+            if espacio <= 0:
+                break
+            continue
+        idx, cant = W.fila(o)
+        columnas = posicion[idx]
+        entra = totales + u <= UB
+        if len(columnas):
+            entra &= np.all(capacidades[:, columnas] >= cant, axis=1)
+        filas = np.flatnonzero(entra)
+        if len(filas) == 0:
+            continue
+        if len(columnas):
+            capacidades[np.ix_(filas, columnas)] -= cant
+        totales[filas] += u
+        espacio = UB - int(totales.min())
+        for g in filas.tolist():
+            seleccion[g].append(o)
+
+    return seleccion, totales
+
+
+def ordenes_diversas(n_ordenes, rondas, primero=None, semilla=None):
+    # Un orden de recorrido por ronda: `primero` (o el natural) y después
+    # permutaciones al azar, para obtener columnas distintas por pasillo
+    generador = np.random.default_rng(semilla)
+    for ronda in range(rondas):
+        if ronda == 0:
+            yield np.arange(n_ordenes) if primero is None else np.asarray(primero)
+        else:
+            yield generador.permutation(n_ordenes)
+
+
+def generar_columnas_greedy(W, S, UB, grupos, recorridos, umbral=None):
+    # Motor de inicialización: una pasada de llenado_greedy por recorrido sobre
+    # todos los grupos (en bloques que entran en MEMORIA_BLOQUE), hasta agotar `umbral`
+    # segundos. Devuelve las columnas distintas como (grupo, órdenes,
+    # unidades) y estadísticas con columnas por segundo.
+    inicio = time.time()
+    limite = None if umbral is None else inicio + umbral
+    vistas = set()
+    columnas = []
+    rondas = 0
+    tam_bloque = max(16, MEMORIA_BLOQUE // (4 * max(1, W.n_columnas)))
+
+    for orden in recorridos:
+        if limite is not None and time.time() > limite:
+            break
+        for desde in range(0, len(grupos), tam_bloque):
+            bloque = grupos[desde:desde + tam_bloque]
+            seleccion, totales = llenado_greedy(W, S, bloque, orden, UB, limite)
+            for g, (ordenes, unidades) in enumerate(zip(seleccion, totales.tolist())):
+                if unidades <= 0:
+                    continue
+                clave = (desde + g, tuple(sorted(ordenes)))
+                if clave in vistas:
+                    continue
+                vistas.add(clave)
+                columnas.append((desde + g, clave[1], unidades))
+        rondas += 1
+
+    duracion = time.time() - inicio
+    estadisticas = {
+        "columnas": len(columnas),
+        "rondas": rondas,
+        "tiempo": duracion,
+        "columnas_por_segundo": len(columnas) / duracion if duracion > 0 else float("inf"),
+    }
+    return columnas, estadisticas
+
@@ -1,37 +1,54 @@
 from pyscipopt import Model, quicksum
 import os
 import sys
+import time
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
-from cargar_input import leer_input
+from cargar_input import leer_input, asegurar_dispersa
 from guardar_output import guardar_resultado_estandar
+from presolve import presolve, k_minimo_por_orden
 
 
 def crear_modelo(W, S, LB, UB, max_pasillos):
-    n_ordenes = len(W)
-    n_elementos = len(W[0])
-    n_pasillos = len(S)
+    inicio = time.time()
+    W = asegurar_dispersa(W)
+    S = asegurar_dispersa(S)
+    n_ordenes = W.n_filas
+    n_elementos = W.n_columnas
+    n_pasillos = S.n_filas
 
     modelo = Model("Desafio_Parte1")
     modelo.setParam('display/verblevel', 0)
 
-    x = {o: modelo.addVar(vtype="B", name=f"x_{o}") for o in range(n_ordenes)}
+    # Una orden que necesita más de max_pasillos pasillos queda fija en 0
+    k_minimo = k_minimo_por_orden(W, S)
+    x = {o: modelo.addVar(vtype="B", name=f"x_{o}", ub=1 if k_minimo[o] <= max_pasillos else 0) for o in range(n_ordenes)}
     y = {a: modelo.addVar(vtype="B", name=f"y_{a}") for a in range(n_pasillos)}
 
-    total_recolectado = quicksum(W[o][i] * x[o] for o in range(n_ordenes) for i in range(n_elementos))
+    total_recolectado = quicksum(int(W.totales[o]) * x[o] for o in range(n_ordenes))
     modelo.setObjective(total_recolectado / max_pasillos, "maximize")
 
     modelo.addCons(total_recolectado >= LB, "LB")
     modelo.addCons(total_recolectado <= UB, "UB")
 
+    ordenes_por_item = W.transpuesta()
+    pasillos_por_item = S.transpuesta()
+    terminos = 0
     for i in range(n_elementos):
+        ordenes_i = [(o, cant) for o, cant in ordenes_por_item.items(i) if k_minimo[o] <= max_pasillos]
+        if not ordenes_i:
+            continue
+        pasillos_i = list(pasillos_por_item.items(i))
         modelo.addCons(
-            quicksum(W[o][i] * x[o] for o in range(n_ordenes)) <=
-            quicksum(S[a][i] * y[a] for a in range(n_pasillos)),
+            quicksum(cant * x[o] for o, cant in ordenes_i) <=
+            quicksum(cant * y[a] for a, cant in pasillos_i),
             name=f"disp_elem_{i}"
         )
+        terminos += len(ordenes_i) + len(pasillos_i)
 
     modelo.addCons(quicksum(y[a] for a in range(n_pasillos)) == max_pasillos, "cant_pasillos")
+    terminos += 3 * n_ordenes + n_pasillos
 
+    modelo.data = {"tiempo_construccion": time.time() - inicio, "terminos": terminos}
     return modelo, x, y
 
 
@@ -80,10 +97,15 @@ if __name__ == "__main__":
     W, S, LB, UB = leer_input(archivo_input)
     max_pasillos = 2
 
+    reduccion = presolve(W, S, LB, UB)
+    print(f"Presolve: {reduccion.resumen(W, S)}")
+    W, S = reduccion.W, reduccion.S
+
     n_ordenes = len(W)
     n_pasillos = len(S)
 
     modelo, x, y = crear_modelo(W, S, LB, UB, max_pasillos)
+    print(f"Modelo construido en {modelo.data['tiempo_construccion']:.3f} s con {modelo.data['terminos']} términos")
     modelo.optimize()
     status = modelo.getStatus()
     print("Estado de solución:", status)
@@ -107,7 +129,8 @@ if __name__ == "__main__":
         x_vars=x,
         y_vars=y,
         n_ordenes=n_ordenes,
-        n_pasillos=n_pasillos
+        n_pasillos=n_pasillos,
+        reduccion=reduccion
     )
 
 
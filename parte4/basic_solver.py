@@ -1,19 +1,73 @@
-from pyscipopt import Model, quicksum, SCIP_PARAMSETTING
+from pyscipopt import Model, Eventhdlr, quicksum, SCIP_EVENTTYPE, SCIP_PARAMSETTING
+import math
+import os
+import sys
 import time
+import numpy as np
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from cargar_input import asegurar_dispersa
+from exploracion_paralela import explorar_k_en_paralelo
+from greedy_vectorizado import generar_columnas_greedy
+from poda_k import CotasK, capacidad_util_por_pasillo
+from presolve import k_minimo_por_orden
+from busqueda_local import mejorar_resultado
+from planificador_k import PlanificadorK
+
+class CorteCotaDual(Eventhdlr):
+    # Interrumpe el solve en cuanto la cota dual ya no alcanza `unidades_minimas`
+    # (las unidades son enteras, así que basta con que quede por debajo)
+    EVENTOS = SCIP_EVENTTYPE.NODESOLVED | SCIP_EVENTTYPE.LPSOLVED
+
+    def __init__(self):
+        self.unidades_minimas = None
+        self.cortado = False
+
+    def eventinit(self):
+        self.model.catchEvent(self.EVENTOS, self)
+
+    def eventexit(self):
+        self.model.dropEvent(self.EVENTOS, self)
+
+    def eventexec(self, event):
+        if self.unidades_minimas is not None and not self.cortado and \
+                self.model.getDualbound() < self.unidades_minimas - 1e-6:
+            self.cortado = True
+            self.model.interruptSolve()
+
 
 class Basic:
     def __init__(self, W, S, LB, UB):
-        self.W = W
-        self.S = S
+        self.W = asegurar_dispersa(W)
+        self.S = asegurar_dispersa(S)
         self.LB = LB
         self.UB = UB
-        self.n_ordenes = len(W)
-        self.n_elementos = len(W[0])
-        self.n_pasillos = len(S)
+        self.n_ordenes = self.W.n_filas
+        self.n_elementos = self.W.n_columnas
+        self.n_pasillos = self.S.n_filas
         self.mejores_pasillos = set()
         self.mejor_solucion = None
         self.ultima_cota_dual = -float("inf")
         self.mejor_cota_dual = -float("inf")
+        self.estadisticas_construccion = []
+        self.procesos_k = 1
+        self.cotas_k = CotasK(self.W, self.S, LB, UB)
+        self.k_minimo = k_minimo_por_orden(self.W, self.S)
+        self.tiempo_busqueda_local = 1.0
+        # Incumbentes greedy por k: pasillos por existencias útiles y órdenes por unidades, de mayor a menor
+        self.pasillos_por_utilidad = np.argsort(-capacidad_util_por_pasillo(self.W, self.S), kind="stable")
+        self.ordenes_por_unidades = np.argsort(-self.W.totales, kind="stable")
+        self.incumbentes = {}
+        self.fraccion_incumbentes = 0.05
+        # Un solo modelo para todos los k: cambia el lado derecho de cons_k
+        self.modelo_persistente = True
+        self.modelo_k = None
+        self.k_modelo = None
+        # Mejor cociente de cualquier k: da el corte de cada solve (mejor × k)
+        self.mejor_valor_conocido = -float("inf")
+        self.k_cortados = 0
+        self.tiempo_recuperado = 0.0
+        # Reparto del tiempo entre los k con PlanificadorK (si no, partes iguales en orden)
+        self.planificador_adaptativo = True
 
     def modelo_para_k(self, K, umbral=None, start_time_ref=None):
         if start_time_ref is None:
@@ -22,88 +76,212 @@ class Basic:
         def timeout_check(umbral, start_time):
             return umbral is not None and (time.time() - start_time > umbral)
 
+        inicio_construccion = time.time()
         modelo = Model(f"Modelo_k_{K}")
         modelo.setPresolve(SCIP_PARAMSETTING.OFF)
         modelo.setParam("display/verblevel", 0)
+        corte = CorteCotaDual()
+        modelo.includeEventhdlr(corte, "corte_cota_dual", "Corta el solve cuando la cota dual no supera al incumbente")
 
         x = {a: modelo.addVar(vtype="B", name=f"x_{a}") for a in range(self.n_pasillos)}
-        y = {o: modelo.addVar(vtype="B", name=f"y_{o}") for o in range(self.n_ordenes)}
+        # Sólo las órdenes que se pueden atender con K pasillos
+        y = {o: modelo.addVar(vtype="B", name=f"y_{o}") for o in range(self.n_ordenes)
+             if K is None or self.k_minimo[o] <= K}
+        # Variables por índice, para cargar y leer soluciones sin parsear nombres
+        modelo.data = {
+            "x": list(x.values()),
+            "y": list(y.values()),
+            "ordenes_y": np.fromiter(y.keys(), dtype=np.int64, count=len(y)),
+            "corte": corte
+        }
 
+        # Una fila por ítem pedido por alguna orden, con sólo sus coeficientes no nulos
+        ordenes_por_item = self.W.transpuesta()
+        pasillos_por_item = self.S.transpuesta()
+        terminos = 0
         for i in range(self.n_elementos):
             if timeout_check(umbral, start_time_ref):
                 return None
+            ordenes_i = [(o, cant) for o, cant in ordenes_por_item.items(i) if o in y]
+            if not ordenes_i:
+                continue
+            pasillos_i = list(pasillos_por_item.items(i))
             modelo.addCons(
-                quicksum(self.W[o][i] * y[o] for o in y) <= quicksum(self.S[a][i] * x[a] for a in x),
+                quicksum(cant * y[o] for o, cant in ordenes_i) <= quicksum(cant * x[a] for a, cant in pasillos_i),
                 name=f"cap_{i}"
             )
+            terminos += len(ordenes_i) + len(pasillos_i)
 
-        modelo.addCons(quicksum(x.values()) == K, name="cons_k")
+        # Con K=None la cantidad de pasillos queda libre (al menos uno)
+        if K is None:
+            modelo.data["cons_k"] = modelo.addCons(quicksum(x.values()) >= 1, name="cons_k")
+        else:
+            modelo.data["cons_k"] = modelo.addCons(quicksum(x.values()) == K, name="cons_k")
         
-        total = quicksum(self.W[o][i] * y[o] for o in y for i in range(self.n_elementos))
+        total = quicksum(int(self.W.totales[o]) * y[o] for o in y)
         modelo.addCons(total >= self.LB, name="LB")
         modelo.addCons(total <= self.UB, name="UB")
         modelo.setObjective(total, "maximize")
+        terminos += self.n_pasillos + 3 * len(y)
+
+        self.estadisticas_construccion.append({
+            "k": K,
+            "tiempo": time.time() - inicio_construccion,
+            "terminos": terminos
+        })
+
+        return modelo
+
+    def modelo_persistente_para_k(self, K, umbral=None, start_time_ref=None):
+        # El modelo se arma una vez, sin fijar k y con todas las órdenes; para
+        # cada K se libera la transformación, se cambia el lado derecho de
+        # cons_k y se apagan las órdenes que no se pueden atender con K
+        # pasillos (sólo las que cambian respecto del K anterior).
+        if self.modelo_k is None:
+            modelo = self.modelo_para_k(None, umbral, start_time_ref)
+            if modelo is None:
+                return None
+            self.modelo_k = modelo
+            self.k_modelo = None
+        modelo = self.modelo_k
+        modelo.freeTransform()
+
+        cons_k = modelo.data["cons_k"]
+        # Sin pasar nunca por lhs > rhs
+        if K >= modelo.getLhs(cons_k):
+            modelo.chgRhs(cons_k, K)
+            modelo.chgLhs(cons_k, K)
+        else:
+            modelo.chgLhs(cons_k, K)
+            modelo.chgRhs(cons_k, K)
+
+        k_minimo = self.k_minimo[modelo.data["ordenes_y"]]
+        habilitadas = k_minimo <= K
+        if self.k_modelo is None:
+            cambian = np.flatnonzero(~habilitadas)
+        else:
+            cambian = np.flatnonzero(habilitadas != (k_minimo <= self.k_modelo))
+        y = modelo.data["y"]
+        for j in cambian.tolist():
+            modelo.chgVarUb(y[j], 1.0 if habilitadas[j] else 0.0)
+        self.k_modelo = K
 
+        # El corte del k anterior no vale para este
+        modelo.setObjlimit(-modelo.infinity())
         return modelo
 
+    def leer_solucion(self, modelo):
+        # Pasillos y órdenes con valor 1 en la mejor solución del modelo
+        x, y = modelo.data["x"], modelo.data["y"]
+        pasillos = {a for a, var in enumerate(x) if modelo.getVal(var) > 0.5}
+        ordenes_y = modelo.data["ordenes_y"]
+        ordenes = {int(ordenes_y[j]) for j, var in enumerate(y) if modelo.getVal(var) > 0.5}
+        total = int(self.W.totales[list(ordenes)].sum())
+        return {"valor_objetivo": total / len(pasillos) if pasillos else 0, "ordenes_seleccionadas": ordenes, "pasillos_seleccionados": pasillos}
+
+    def precalcular_incumbentes(self, lista_k, umbral=None):
+        # Incumbente de cada k: los k pasillos con más existencias útiles y,
+        # sobre ellos, las órdenes de mayor a menor cantidad de unidades
+        # mientras entren. Todos los k se llenan en una sola pasada del greedy
+        # vectorizado; los que no llegan a LB quedan sin incumbente.
+        lista_k = [k for k in lista_k if k not in self.incumbentes]
+        grupos = [self.pasillos_por_utilidad[:k].tolist() for k in lista_k]
+        columnas, _ = generar_columnas_greedy(self.W, self.S, self.UB, grupos, [self.ordenes_por_unidades], umbral)
+        for g, ordenes, unidades in columnas:
+            if unidades >= self.LB:
+                self.incumbentes[lista_k[g]] = {
+                    "valor_objetivo": unidades / len(grupos[g]),
+                    "ordenes_seleccionadas": set(ordenes),
+                    "pasillos_seleccionados": set(grupos[g])
+                }
+
+    def incumbente_greedy(self, k):
+        if k not in self.incumbentes:
+            self.precalcular_incumbentes([k])
+        return self.incumbentes.get(k)
+
+    def agregar_solucion(self, modelo, solucion, umbral=None, start_time=None):
+        # Carga `solucion` como solución inicial del modelo; False si se agotó el tiempo
+        sol = modelo.createSol()
+        x, y = modelo.data["x"], modelo.data["y"]
+        valores_x = np.zeros(len(x))
+        valores_x[list(solucion["pasillos_seleccionados"])] = 1.0
+        valores_y = np.isin(modelo.data["ordenes_y"], list(solucion["ordenes_seleccionadas"])).astype(float)
+
+        for var, valor in zip(x + y, valores_x.tolist() + valores_y.tolist()):
+            if umbral is not None and time.time() - start_time >= umbral:
+                modelo.freeSol(sol)
+                return False
+            modelo.setSolVal(sol, var, valor)
+        modelo.addSol(sol, False)
+        return True
+
     def Rankear(self):
-        return list(range(1, self.n_pasillos + 1))
+        # Sólo los k que pueden llegar a LB, de mayor a menor cota del cociente
+        return self.cotas_k.ordenar(self.cotas_k.podar(range(1, self.n_pasillos + 1)))
 
     def Opt_cantidadPasillosFija(self, k, umbral):
         start_time = time.time()
         
         def tiempo_consumido():
             return time.time() - start_time
+
+        # El incumbente greedy es la respuesta si el MIP no llega a nada mejor
+        incumbente = self.incumbente_greedy(k)
+        if self.mejor_solucion and len(self.mejor_solucion["pasillos_seleccionados"]) == k and (
+                incumbente is None or self.mejor_solucion["valor_objetivo"] > incumbente["valor_objetivo"]):
+            incumbente = self.mejor_solucion
             
         if umbral is not None and tiempo_consumido() >= umbral:
-            return None
+            return incumbente
             
-        modelo = self.modelo_para_k(k, umbral, start_time)
+        if self.modelo_persistente:
+            modelo = self.modelo_persistente_para_k(k, umbral, start_time)
+        else:
+            modelo = self.modelo_para_k(k, umbral, start_time)
         if modelo is None:
-            return None
+            return incumbente
 
         if umbral is not None and tiempo_consumido() >= umbral:
-            return None
+            return incumbente
 
-        if self.mejor_solucion and len(self.mejor_solucion["pasillos_seleccionados"]) == k:
-            sol = modelo.createSol()
-            
-            pasillos = self.mejor_solucion["pasillos_seleccionados"]
-            ordenes = self.mejor_solucion["ordenes_seleccionadas"]
-
-            for var in modelo.getVars():
-                if umbral is not None and tiempo_consumido() >= umbral:
-                    return None
-                    
-                nombre, indice = var.name.split("_")
-                indice = int(indice)
-                if nombre == "x":
-                    valor = 1.0 if indice in pasillos else 0.0
-                elif nombre == "y":
-                    valor = 1.0 if indice in ordenes else 0.0
-                else:
-                    continue  
-                modelo.setSolVal(sol, var, valor)
-            modelo.addSol(sol, False)
+        if incumbente:
+            if not self.agregar_solucion(modelo, incumbente, umbral, start_time):
+                return incumbente
+
+        # Corte: sólo interesan soluciones que superen al mejor cociente
+        # conocido (de este k o de cualquier otro), o sea más de mejor × k unidades
+        corte = modelo.data["corte"]
+        corte.cortado = False
+        corte.unidades_minimas = None
+        mejor = max(incumbente["valor_objetivo"] if incumbente else -float("inf"), self.mejor_valor_conocido)
+        if mejor > -float("inf"):
+            modelo.setObjlimit(mejor * k)
+            corte.unidades_minimas = math.floor(mejor * k + 1e-9) + 1
 
         if umbral is not None:
             tiempo_restante_solver = max(1.0, umbral - tiempo_consumido()) # Minimo 1 segundo
             modelo.setParam("limits/time", tiempo_restante_solver)
 
         modelo.optimize()
+        if corte.cortado:
+            self.k_cortados += 1
         self.ultima_cota_dual = modelo.getDualbound()
         if self.ultima_cota_dual > self.mejor_cota_dual:
             self.mejor_cota_dual = self.ultima_cota_dual
 
-        if modelo.getStatus() == "optimal" or modelo.getStatus() == "feasible":
-            pasillos = {int(v.name.split("_")[1]) for v in modelo.getVars()if v.name.startswith("x_") and modelo.getVal(v) > 0.5}
-            ordenes = {int(v.name.split("_")[1]) for v in modelo.getVars()if v.name.startswith("y_") and modelo.getVal(v) > 0.5}
-            total = sum(sum(self.W[o][i] for i in range(self.n_elementos)) for o in ordenes)
-            sol = { "valor_objetivo": total / len(pasillos) if pasillos else 0, "ordenes_seleccionadas": ordenes, "pasillos_seleccionados": pasillos}
-            self.mejor_solucion = sol
-            return sol
-        else:
-            return None
+        # Con límite de tiempo también sirve la mejor solución encontrada
+        if modelo.getNSols() > 0:
+            sol = self.leer_solucion(modelo)
+            if incumbente is None or sol["valor_objetivo"] > incumbente["valor_objetivo"]:
+                # Una revisita de k arranca desde acá
+                self.incumbentes[k] = sol
+                self.mejor_solucion = sol
+                return sol
+
+        if incumbente:
+            self.mejor_solucion = incumbente
+        return incumbente
 
     def Opt_PasillosFijos(self, umbral):
         start_time = time.time()
@@ -122,24 +300,15 @@ class Basic:
         if umbral is not None and tiempo_consumido() >= umbral:
             return None
 
-        for var in modelo.getVars():
+        for a, var in enumerate(modelo.data["x"]):
             if umbral is not None and tiempo_consumido() >= umbral:
                 return None
                 
-            if var.name.startswith("x_"):
-                idx = int(var.name.split("_")[1])
-                if idx in self.mejores_pasillos:
-                    modelo.chgVarLb(var, 1.0)
-                    modelo.chgVarUb(var, 1.0)
-                else:
-                    modelo.chgVarUb(var, 0.0)
-
-        y_vars = [var for var in modelo.getVars() if var.name.startswith("y_")]
-        total_unidades = quicksum(
-            sum(self.W[int(var.name.split("_")[1])][i] for i in range(self.n_elementos)) * var
-            for var in y_vars
-        )
-        modelo.addCons(total_unidades >= self.LB, name="restr_total_lb")
+            if a in self.mejores_pasillos:
+                modelo.chgVarLb(var, 1.0)
+                modelo.chgVarUb(var, 1.0)
+            else:
+                modelo.chgVarUb(var, 0.0)
 
         if umbral is not None:
             tiempo_restante_solver = max(1.0, umbral - tiempo_consumido()) # Minimo 1 segundo
@@ -148,10 +317,7 @@ class Basic:
         modelo.optimize()
 
         if modelo.getStatus() == "optimal" or modelo.getStatus() == "feasible":
-            pasillos = {int(v.name.split("_")[1]) for v in modelo.getVars() if v.name.startswith("x_") and modelo.getVal(v) > 0.5}
-            ordenes = {int(v.name.split("_")[1]) for v in modelo.getVars() if v.name.startswith("y_") and modelo.getVal(v) > 0.5}
-            total = sum(sum(self.W[o][i] for i in range(self.n_elementos)) for o in ordenes)
-            sol = { "valor_objetivo": total / len(pasillos) if pasillos else 0, "ordenes_seleccionadas": ordenes, "pasillos_seleccionados": pasillos}
+            sol = self.leer_solucion(modelo)
             self.mejor_solucion = sol
             return sol
         else:
@@ -164,12 +330,58 @@ class Basic:
         mejor_valor = -float("inf")
         
         k_list = self.Rankear()
+        print(f"✂️ Poda por cotas: {self.cotas_k.resumen()}")
         
         tiempo_exploracion_max = umbral_total * 0.9 
-        
-        tiempo_por_k = tiempo_exploracion_max / len(k_list) if k_list else 0
-        
+
+        # Incumbentes greedy de todos los k: dan una respuesta aunque no
+        # alcance el tiempo para ningún MIP, y su mejor cociente ya poda k
+        self.precalcular_incumbentes(k_list, umbral_total * self.fraccion_incumbentes)
+        if k_list and not self.incumbentes:
+            # Con el k más grande es más fácil llegar a LB
+            self.incumbente_greedy(max(k_list))
         for k in k_list:
+            incumbente = self.incumbentes.get(k)
+            if incumbente and incumbente["valor_objetivo"] > mejor_valor:
+                mejor_valor = incumbente["valor_objetivo"]
+                mejor_sol = incumbente
+        if mejor_sol:
+            print(f"🌱 Incumbente greedy: {mejor_valor:.4f} con {len(mejor_sol['pasillos_seleccionados'])} pasillos")
+        self.mejor_valor_conocido = mejor_valor
+        self.k_cortados = 0
+        self.tiempo_recuperado = 0.0
+
+        if self.procesos_k > 1 and len(k_list) > 1:
+            sol_paralela, _ = explorar_k_en_paralelo(self, k_list, tiempo_exploracion_max, self.procesos_k, cotas=self.cotas_k)
+            if sol_paralela and sol_paralela["valor_objetivo"] > mejor_valor:
+                mejor_valor = sol_paralela["valor_objetivo"]
+                mejor_sol = sol_paralela
+            k_list = []
+        
+        if self.planificador_adaptativo and k_list:
+            # Cada turno informa al planificador el cociente y la cota dual
+            # del k, que decide a qué k darle más tiempo y cuáles retirar
+            planificador = PlanificadorK(k_list, self.cotas_k.cota,
+                                         min(tiempo_exploracion_max, umbral_total - 5) - (time.time() - start))
+            while True:
+                turno = planificador.siguiente(mejor_valor)
+                if turno is None:
+                    break
+                k, tiempo_k = turno
+                self.ultima_cota_dual = float("inf")
+                inicio_turno = time.time()
+                solucion = self.Opt_cantidadPasillosFija(k, tiempo_k)
+                planificador.registrar(k, tiempo_k, time.time() - inicio_turno,
+                                       solucion["valor_objetivo"] if solucion else None, self.ultima_cota_dual / k)
+                if solucion and solucion["valor_objetivo"] > mejor_valor:
+                    mejor_valor = solucion["valor_objetivo"]
+                    mejor_sol = solucion
+                    self.mejor_valor_conocido = mejor_valor
+            print(f"🎰 Planificador: {planificador.resumen()}")
+            k_list = []
+
+        podados = 0
+        for posicion, k in enumerate(k_list):
             tiempo_transcurrido = time.time() - start
             tiempo_restante_total = umbral_total - tiempo_transcurrido
             
@@ -177,12 +389,34 @@ class Basic:
                 print(f"[TIMEOUT] Tiempo limite alcanzado. Tiempo restante: {tiempo_restante_total:.2f}s")
                 break
 
+            # Los k cuya cota no supera al incumbente se saltean, y su tiempo
+            # se reparte entre los que todavía pueden mejorarlo
+            vivos = self.cotas_k.podar(k_list[posicion:], mejor_valor)
+            if not vivos:
+                podados += len(k_list) - posicion
+                break
+            if vivos[0] != k:
+                podados += 1
+                continue
+
+            tiempo_por_k = (tiempo_exploracion_max - tiempo_transcurrido) / len(vivos)
             tiempo_para_este_k = max(1.0, min(tiempo_por_k, tiempo_restante_total - 5))
             
             solucion = self.Opt_cantidadPasillosFija(k, tiempo_para_este_k)
             if solucion and solucion["valor_objetivo"] > mejor_valor:
                 mejor_valor = solucion["valor_objetivo"]
                 mejor_sol = solucion
+                self.mejor_valor_conocido = mejor_valor
+
+        # El tiempo que cada k cortado deja libre pasa al siguiente, así que
+        # lo recuperado se mide una sola vez, contra el fin de la exploración
+        if self.k_cortados:
+            self.tiempo_recuperado = max(0.0, start + min(tiempo_exploracion_max, umbral_total - 5) - time.time())
+
+        if podados:
+            print(f"✂️ {podados} valores de k descartados por cota frente a {mejor_valor:.4f}")
+        if self.k_cortados:
+            print(f"✂️ {self.k_cortados} valores de k cortados por cota dual, {self.tiempo_recuperado:.1f}s recuperados")
 
         if mejor_sol:
             self.mejores_pasillos = mejor_sol["pasillos_seleccionados"]
@@ -195,5 +429,24 @@ class Basic:
                 if solucion_para_k_fijo and solucion_para_k_fijo["valor_objetivo"] > mejor_valor:
                     mejor_sol = solucion_para_k_fijo
 
+        # Lo que quede del tiempo (hasta tiempo_busqueda_local) va a la búsqueda local
+        tiempo_busqueda = min(self.tiempo_busqueda_local, umbral_total - (time.time() - start))
+        mejor_sol = mejorar_resultado(self.W, self.S, self.LB, self.UB, mejor_sol, tiempo_busqueda)
+
+        if mejor_sol:
+            mejor_sol["k_cortados"] = self.k_cortados
+            mejor_sol["tiempo_recuperado"] = round(self.tiempo_recuperado, 2)
         self.mejor_solucion = mejor_sol
-        return mejor_sol
\ No newline at end of file
+        return mejor_sol
+
+
+def aplicar_parametros(solver, parametros):
+    # Copia los parámetros del .cfg que el solver tenga como atributo
+    for nombre, valor in (parametros or {}).items():
+        if hasattr(solver, nombre):
+            setattr(solver, nombre, valor)
+    return solver
+
+
+def resolver(W, S, LB, UB, umbral, parametros=None):
+    return aplicar_parametros(Basic(W, S, LB, UB), parametros).Opt_ExplorarCantidadPasillos(umbral)
@@ -0,0 +1,124 @@
+from pyscipopt import quicksum, SCIP_PARAMSETTING
+import os
+import sys
+import time
+sys.path.append(os.path.abspath(os.path.dirname(__file__)))
+from basic_solver import Basic, aplicar_parametros
+
+# Tolerancia para decidir que F(λ) = max unidades - λ·pasillos ya es cero
+TOLERANCIA_DINKELBACH = 1e-6
+# Las iteraciones intermedias sólo necesitan una solución con F > 0, así que
+# se resuelven con gap relajado y una fracción del tiempo restante; sólo la
+# que certifica F(λ) = 0 se resuelve exacta con todo el tiempo.
+GAP_ITERACION = 0.05
+FRACCION_TIEMPO_ITERACION = 0.5
+
+
+class Dinkelbach(Basic):
+    # Maximiza unidades / pasillos directamente: en cada iteración resuelve
+    # max unidades - λ·pasillos sobre el modelo de Basic sin fijar k y
+    # actualiza λ con el cociente de la solución obtenida. Termina cuando
+    # F(λ) <= 0, que es cuando λ es el óptimo del cociente.
+    def __init__(self, W, S, LB, UB):
+        super().__init__(W, S, LB, UB)
+        self.iteraciones = []
+
+    def Opt_Dinkelbach(self, umbral, lambda_inicial=0.0):
+        start_time = time.time()
+
+        def tiempo_consumido():
+            return time.time() - start_time
+
+        # El mejor incumbente greedy de Basic da el λ inicial y la primera
+        # solución del MIP, y es la respuesta si no se llega a nada mejor
+        k_list = self.Rankear()
+        self.precalcular_incumbentes(k_list, None if umbral is None else umbral * self.fraccion_incumbentes)
+        if k_list and not self.incumbentes:
+            self.incumbente_greedy(max(k_list))
+        mejor_sol = max(self.incumbentes.values(), key=lambda sol: sol["valor_objetivo"], default=None)
+        if mejor_sol:
+            print(f"🌱 Incumbente greedy: {mejor_sol['valor_objetivo']:.4f} con {len(mejor_sol['pasillos_seleccionados'])} pasillos")
+        self.mejor_solucion = mejor_sol
+
+        modelo = self.modelo_para_k(None, umbral, start_time)
+        if modelo is None:
+            return mejor_sol
+        modelo.setPresolve(SCIP_PARAMSETTING.DEFAULT)
+
+        x, y = modelo.data["x"], modelo.data["y"]
+        unidades = quicksum(int(self.W.totales[o]) * v for o, v in zip(modelo.data["ordenes_y"].tolist(), y))
+        cantidad_pasillos = quicksum(x)
+
+        lam = max(lambda_inicial, mejor_sol["valor_objetivo"]) if mejor_sol else lambda_inicial
+        exacto = False
+        # Una iteración que se queda sin tiempo y sin solución se repite con todo el tiempo restante
+        reintento = False
+        while True:
+            restante = None if umbral is None else umbral - tiempo_consumido()
+            if restante is not None and restante < 1.0:
+                print(f"[TIMEOUT] Dinkelbach cortado con λ={lam:.4f}")
+                break
+
+            modelo.freeTransform()
+            modelo.setObjective(unidades - lam * cantidad_pasillos, "maximize")
+            modelo.setParam("limits/gap", 0.0 if exacto else GAP_ITERACION)
+            if restante is not None:
+                limite = restante if exacto or reintento else max(1.0, restante * FRACCION_TIEMPO_ITERACION)
+                modelo.setParam("limits/time", limite)
+
+            # La mejor solución anterior sigue siendo factible: arranca con F >= 0
+            if mejor_sol:
+                self.agregar_solucion(modelo, mejor_sol)
+
+            inicio_iteracion = time.time()
+            modelo.optimize()
+            estado = modelo.getStatus()
+            if modelo.getNSols() == 0:
+                if estado != "timelimit" or reintento:
+                    break
+                reintento = True
+                continue
+            reintento = False
+
+            sol = self.leer_solucion(modelo)
+            pasillos, ordenes = sol["pasillos_seleccionados"], sol["ordenes_seleccionadas"]
+            total = int(self.W.totales[list(ordenes)].sum())
+            valor_F = total - lam * len(pasillos)
+
+            # Para cualquier solución, cociente <= λ + cota(F(λ)) / pasillos <= λ + max(cota, 0)
+            cota = lam + max(modelo.getDualbound(), 0.0)
+            self.ultima_cota_dual = cota
+            self.mejor_cota_dual = cota if self.mejor_cota_dual == -float("inf") else min(self.mejor_cota_dual, cota)
+
+            self.iteraciones.append({
+                "lambda": lam,
+                "F": valor_F,
+                "pasillos": len(pasillos),
+                "estado": estado,
+                "tiempo": time.time() - inicio_iteracion
+            })
+            print(f"λ={lam:.4f} → F={valor_F:.4f} con {len(pasillos)} pasillos ({estado})")
+
+            if pasillos and (mejor_sol is None or total / len(pasillos) > mejor_sol["valor_objetivo"]):
+                mejor_sol = {"valor_objetivo": total / len(pasillos), "ordenes_seleccionadas": ordenes, "pasillos_seleccionados": pasillos}
+
+            if valor_F <= TOLERANCIA_DINKELBACH * max(1.0, abs(lam)):
+                if not exacto and estado != "optimal":
+                    # Repetir el mismo λ sin gap ni corte parcial para certificarlo
+                    exacto = True
+                    continue
+                if estado != "optimal":
+                    print("⚠️ F(λ) no mejoró antes del límite de tiempo; λ puede no ser óptimo")
+                break
+            lam = mejor_sol["valor_objetivo"]
+            exacto = False
+
+        self.mejor_solucion = mejor_sol
+        return mejor_sol
+
+    def Opt_ExplorarCantidadPasillos(self, umbral_total):
+        return self.Opt_Dinkelbach(umbral_total)
+
+
+def resolver(W, S, LB, UB, umbral, parametros=None):
+    return aplicar_parametros(Dinkelbach(W, S, LB, UB), parametros).Opt_Dinkelbach(umbral)
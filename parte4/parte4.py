@@ -5,42 +5,59 @@ import time
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 from cargar_input import leer_input
 from guardar_output import guardar_resultado
+from presolve import presolve
 
-# Cargar datos W, S, LB, UB como hacías antes
-archivo_input = "datos_de_entrada/A/instance_0002.txt"
-W, S, LB, UB = leer_input(archivo_input)
+if __name__ == "__main__":
+    # Cantidad de procesos para explorar valores de k en paralelo (opcional)
+    procesos = int(sys.argv[1]) if len(sys.argv) > 1 else 1
 
-# Ejecutar parte 4
-# Buscar mejor solución explorando distintas cantidades de pasillos en x segundos
-basic = Basic(W, S, LB, UB)
-start = time.time()
-resultado = basic.Opt_ExplorarCantidadPasillos(600)
-end = time.time()
-print(f"Tiempo total de ejecución: {end - start:.0f} segundos")
+    # Cargar datos W, S, LB, UB como hacías antes
+    archivo_input = "datos_de_entrada/A/instance_0002.txt"
+    W, S, LB, UB = leer_input(archivo_input)
+    reduccion = presolve(W, S, LB, UB)
+    print(f"Presolve: {reduccion.resumen(W, S)}")
+    W, S = reduccion.W, reduccion.S
 
-if resultado is None:
-    print("No se encontró ninguna solución factible dentro del tiempo límite.")
-    guardar_resultado(
-        archivo_input=archivo_input,
-        parte="parte4",
-        resultado={
-            "valor_objetivo": None,
-            "ordenes_seleccionadas": [],
-            "pasillos_seleccionados": []
-        }
-    )
-else:
-    print("Mejor valor objetivo:", resultado["valor_objetivo"])
-    print("Órdenes seleccionadas:", resultado["ordenes_seleccionadas"])
-    print("Pasillos seleccionados:", resultado["pasillos_seleccionados"])
+    # Ejecutar parte 4
+    # Buscar mejor solución explorando distintas cantidades de pasillos en x segundos
+    basic = Basic(W, S, LB, UB)
+    basic.procesos_k = procesos
+    start = time.time()
+    resultado = basic.Opt_ExplorarCantidadPasillos(600)
+    end = time.time()
+    print(f"Tiempo total de ejecución: {end - start:.0f} segundos")
 
-    # === Guardar resultados en archivo .out ===
-    guardar_resultado(
-        archivo_input=archivo_input,
-        parte="parte4",  
-        resultado={
-            "valor_objetivo": resultado["valor_objetivo"],
-            "ordenes_seleccionadas": list(resultado["ordenes_seleccionadas"]),
-            "pasillos_seleccionados": list(resultado["pasillos_seleccionados"])
-        }
-    )
\ No newline at end of file
+    construcciones = basic.estadisticas_construccion
+    if construcciones:
+        tiempo_construccion = sum(c["tiempo"] for c in construcciones)
+        terminos = sum(c["terminos"] for c in construcciones)
+        print(f"Modelos construidos: {len(construcciones)} en {tiempo_construccion:.2f} segundos, {terminos} términos emitidos")
+
+    if resultado is None:
+        print("No se encontró ninguna solución factible dentro del tiempo límite.")
+        guardar_resultado(
+            archivo_input=archivo_input,
+            parte="parte4",
+            resultado={
+                "valor_objetivo": None,
+                "ordenes_seleccionadas": [],
+                "pasillos_seleccionados": []
+            },
+            reduccion=reduccion
+        )
+    else:
+        print("Mejor valor objetivo:", resultado["valor_objetivo"])
+        print("Órdenes seleccionadas:", resultado["ordenes_seleccionadas"])
+        print("Pasillos seleccionados:", resultado["pasillos_seleccionados"])
+
+        # === Guardar resultados en archivo .out ===
+        guardar_resultado(
+            archivo_input=archivo_input,
+            parte="parte4",  
+            resultado={
+                "valor_objetivo": resultado["valor_objetivo"],
+                "ordenes_seleccionadas": list(resultado["ordenes_seleccionadas"]),
+                "pasillos_seleccionados": list(resultado["pasillos_seleccionados"])
+            },
+            reduccion=reduccion
+        )
@@ -0,0 +1,69 @@
+import argparse
+import io
+import contextlib
+import os
+import sys
+import time
+import numpy as np
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from cargar_input import leer_input
+from columns_solver import Columns
+from greedy_vectorizado import generar_columnas_greedy
+from pool_columnas import Columna, PoolColumnas
+
+
+# Tiempo de construcción del maestro en función de la cantidad de columnas.
+# Las columnas son de un pasillo, generadas con el greedy vectorizado sobre
+# recorridos al azar de subconjuntos de las órdenes (con todas las órdenes
+# cada pasillo termina casi siempre en la misma columna).
+
+
+def generar_pool(W, S, UB, n_columnas, semilla=0):
+    rng = np.random.default_rng(semilla)
+    grupos = [[a] for a in range(S.n_filas)]
+    rondas = max(1, -(-n_columnas // S.n_filas) * 4)
+    recorridos = [rng.permutation(W.n_filas)[:rng.integers(1, W.n_filas + 1)] for _ in range(rondas)]
+    columnas, _ = generar_columnas_greedy(W, S, UB, grupos, recorridos)
+    pool = PoolColumnas(W.n_filas)
+    for g, ordenes, unidades in columnas:
+        if len(pool) >= n_columnas:
+            break
+        pool.agregar(Columna(ordenes, grupos[g], unidades))
+    return pool
+
+
+def medir(archivo, cantidades, k, repeticiones):
+    W, S, LB, UB = leer_input(archivo, usar_cache=True)
+    solver = Columns(W, S, LB, UB)
+    pool_total = generar_pool(solver.W, solver.S, UB, max(cantidades))
+
+    filas = []
+    for n in cantidades:
+        solver.columnas[k] = PoolColumnas(solver.O, pool_total.columnas[:n])
+        no_nulos = sum(len(col.ordenes) + len(col.pasillos) for col in solver.columnas[k])
+        tiempos = []
+        for _ in range(repeticiones):
+            inicio = time.time()
+            with contextlib.redirect_stdout(io.StringIO()):
+                modelo = solver.construir_modelo_maestro(k, float("inf"))[0]
+            tiempos.append(time.time() - inicio)
+            modelo.freeProb()
+        filas.append((len(solver.columnas[k]), no_nulos, float(np.median(tiempos))))
+    return filas
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Tiempo de construcción del maestro vs. cantidad de columnas")
+    parser.add_argument("instancias", nargs="*", default=["datos_de_entrada/b/instance_0003.txt"])
+    parser.add_argument("--columnas", default="250,500,1000,2000,4000", help="cantidades de columnas separadas por coma")
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--repeticiones", type=int, default=3)
+    args = parser.parse_args()
+
+    cantidades = [int(n) for n in args.columnas.split(",")]
+    for archivo in args.instancias:
+        print(f"📄 {archivo}")
+        print(f"{'columnas':>10} {'no nulos':>10} {'segundos':>10} {'µs/no nulo':>11}")
+        for n, no_nulos, segundos in medir(archivo, cantidades, args.k, args.repeticiones):
+            print(f"{n:>10} {no_nulos:>10} {segundos:>10.3f} {1e6 * segundos / max(no_nulos, 1):>11.2f}")
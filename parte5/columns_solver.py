@@ -1,21 +1,40 @@
+import os
+import sys
 import time
 import random
-from pyscipopt import Model, quicksum, SCIP_PARAMSETTING
+import numpy as np
+from pyscipopt import LP, Model, quicksum, SCIP_PARAMSETTING
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from cargar_input import asegurar_dispersa
+from greedy_vectorizado import llenado_greedy, generar_columnas_greedy, ordenes_diversas
+from pool_columnas import Columna, PoolColumnas
+from estabilizacion import EstabilizacionDual, costo_reducido
+from cota_lagrangiana import valor_dual, cota_costo_reducido, gap_relativo
+from exploracion_paralela import explorar_k_en_paralelo
+from poda_k import CotasK, TOLERANCIA_PODA
+from presolve import k_minimo_por_orden
+from busqueda_local import mejorar_resultado
+from planificador_k import PlanificadorK
+from telemetria import Telemetria
 
 def tiempo_excedido(tiempo_ini, umbral):
     return time.time() - tiempo_ini > umbral
 
-def construir_mejor_solucion(modelo_relajado, columnas_k, valor_obj_primal, cant_var_inicio):
-    pasillos_seleccionados = set()
-    ordenes_seleccionadas = set()
+def mayor_costo_reducido(columnas, duales):
+    return max((costo_reducido(col, duales) for col in columnas), default=None)
 
-    for idx, x in enumerate(modelo_relajado.getVars()):
-        val = modelo_relajado.getVal(x)
-        if val and val > 1e-5:
-            pasillos_seleccionados.add(columnas_k[idx]['pasillo'])
-            for o, seleccionado in enumerate(columnas_k[idx]['ordenes']):
-                if seleccionado:
-                    ordenes_seleccionadas.add(o)
+
+def valores_columnas(modelo_relajado, nombres):
+    # Valor en la copia relajada de cada variable del maestro, en el orden de
+    # `nombres` (el del pool): chgVarType reordena getVars() de la copia
+    por_nombre = {var.name: var for var in modelo_relajado.getVars()}
+    return [modelo_relajado.getVal(por_nombre[nombre]) for nombre in nombres]
+
+
+def construir_mejor_solucion(modelo_relajado, columnas_k, nombres, valor_obj_primal, cant_var_inicio):
+    valores = valores_columnas(modelo_relajado, nombres)
+    pasillos_seleccionados, ordenes_seleccionadas, _ = columnas_k.seleccion(valores)
 
     cota_dual_real = modelo_relajado.getDualbound()
     gap_real = valor_obj_primal - cota_dual_real
@@ -33,144 +52,250 @@ def construir_mejor_solucion(modelo_relajado, columnas_k, valor_obj_primal, cant
 
     return mejor_sol
 
+
+def soluciones_mejorantes(modelo, y, z, max_columnas):
+    # Soluciones distintas del pool de SCIP con costo reducido positivo, de la
+    # mejor a la peor, como pares (pasillos, ordenes) de índices.
+    vistas = set()
+    soluciones = []
+    for sol in modelo.getSols():
+        if modelo.getSolObjVal(sol) <= 1e-6:
+            break
+        pasillos = tuple(a for a in y if modelo.getSolVal(sol, y[a]) > 0.5)
+        ordenes = tuple(o for o in z if modelo.getSolVal(sol, z[o]) > 0.5)
+        if (pasillos, ordenes) in vistas:
+            continue
+        vistas.add((pasillos, ordenes))
+        soluciones.append((pasillos, ordenes))
+        if len(soluciones) >= max_columnas:
+            break
+    return soluciones
+
+
+class MaestroIncremental:
+    # Relajación lineal del maestro restringido para un k, persistente entre
+    # iteraciones: cada columna nueva se agrega como variable con sus
+    # coeficientes en las filas card_k, orden_o, restr_total_ub y pasillo_a,
+    # y el LP se re-optimiza con primal simplex desde la base anterior.
+    def __init__(self, k, O, A, UB):
+        self.lp = LP(f"RMP_LP_k_{k}", sense="maximize")
+        infinito = self.lp.infinity()
+
+        self.fila_card = 0
+        self.fila_ub = 1
+        self.fila_orden = 2
+        self.fila_pasillo = 2 + O
+        self.nombres = ["card_k", "restr_total_ub"] + [f"orden_{o}" for o in range(O)] + [f"pasillo_{a}" for a in range(A)]
+
+        self.lp.addRow([], lhs=float(k), rhs=float(k))
+        self.lp.addRow([], lhs=-infinito, rhs=float(UB))
+        for _ in range(O + A):
+            self.lp.addRow([], lhs=-infinito, rhs=1.0)
+
+        self.n_columnas = 0
+        self.valor_objetivo = None
+
+    def agregar_columna(self, col):
+        unidades = float(col.unidades)
+        entradas = [(self.fila_card, float(len(col.pasillos))), (self.fila_ub, unidades)]
+        entradas += [(self.fila_orden + o, 1.0) for o in col.ordenes.tolist()]
+        entradas += [(self.fila_pasillo + a, 1.0) for a in col.pasillos]
+        self.lp.addCol(entradas, obj=unidades, lb=0.0, ub=1.0)
+        self.n_columnas += 1
+
+    def resolver(self):
+        valor = self.lp.solve(dual=False)
+        if not self.lp.isOptimal():
+            self.valor_objetivo = None
+            return None
+        self.valor_objetivo = valor
+        return valor
+
+    def duales(self):
+        return dict(zip(self.nombres, self.lp.getDual()))
+
+    def valores(self):
+        return self.lp.getPrimal()
+
+
+def construir_mejor_solucion_lp(maestro, columnas_k, cant_var_inicio):
+    pasillos_seleccionados, ordenes_seleccionadas, _ = columnas_k.seleccion(maestro.valores())
+    valor_obj_primal = maestro.valor_objetivo
+
+    return {
+        "valor_objetivo": valor_obj_primal / len(pasillos_seleccionados) if pasillos_seleccionados else 0,
+        "pasillos_seleccionados": pasillos_seleccionados,
+        "ordenes_seleccionadas": ordenes_seleccionadas,
+        "variables": cant_var_inicio,
+        "variables_final": maestro.n_columnas,
+        "cota_dual": valor_obj_primal,
+        "gap_real": 0.0
+    }
+
+
 class Columns:
     def __init__(self, W, S, LB, UB):
-        self.W = W
-        self.S = S
+        self.W = asegurar_dispersa(W)
+        self.S = asegurar_dispersa(S)
         self.LB = LB
         self.UB = UB
-        self.O = len(W)
-        self.I = len(W[0])
-        self.A = len(S)
+        self.O = self.W.n_filas
+        self.I = self.W.n_columnas
+        self.A = self.S.n_filas
         self.columnas = {}
         self.pasillos_fijos = []
         self.cant_var_inicio = 0
-
-    def inicializar_columnas_para_k(self, k, umbral=None):
-        tiempo_ini = time.time()
-
+        self.maestro_incremental = True
+        self.max_columnas_por_iteracion = 20
+        self.procesos_k = 1
+        # Un registro por iteración de la generación de columnas (ver
+        # telemetria.py); con archivo_telemetria también va a un JSONL
+        self.telemetria = Telemetria()
+        self.archivo_telemetria = None
+        # Los mensajes de cada iteración sólo se imprimen con verbose
+        self.verbose = False
+        self.cotas_k = CotasK(self.W, self.S, LB, UB)
+        self.k_podados = 0
+        self.rondas_inicializacion = 5
+        self.estadisticas_inicializacion = []
+        self.estabilizacion = False
+        self.alfa_estabilizacion = 0.5
+        self.estabilizador = None
+        self.tolerancia_gap = 1e-4
+        self.mejor_valor_conocido = -float("inf")
+        self.costo_reducido_exacto = None
+        self.cotas_lagrangianas = {}
+        self.k_minimo = k_minimo_por_orden(self.W, self.S)
+        self.reusar_columnas = True
+        self.pool_global = PoolColumnas(self.O)
+        self.ultimos_duales = None
+        self.llamadas_pricing = 0
+        self.tiempo_busqueda_local = 1.0
+        # Reparto del tiempo entre los k con PlanificadorK (si no, cada k con su umbral en orden)
+        self.planificador_adaptativo = True
+
+    def inicializar_columnas_con_recorridos(self, k, recorridos, umbral=None):
+        # Columnas de un pasillo llenadas con el motor vectorizado: cada
+        # recorrido de las órdenes es una pasada sobre todos los pasillos
         if not hasattr(self, 'columnas'):
             self.columnas = {}
 
-        self.columnas[k] = []
-        unidades_o = [sum(self.W[o]) for o in range(self.O)]
+        grupos = [[a] for a in range(self.A)]
+        columnas, estadisticas = generar_columnas_greedy(self.W, self.S, self.UB, grupos, recorridos, umbral)
+        self.columnas[k] = PoolColumnas(self.O, (Columna(ordenes, grupos[g], unidades) for g, ordenes, unidades in columnas))
+        self.estadisticas_inicializacion.append(dict(estadisticas, k=k))
+
+        if umbral and estadisticas["tiempo"] > umbral:
+            print("⏱️ Tiempo agotado durante inicialización de columnas")
+        self.mostrar(f"✅ {len(self.columnas[k])} columnas iniciales creadas para k = {k} "
+                     f"({estadisticas['columnas_por_segundo']:.0f} columnas/s)")
 
+    def inicializar_columnas_para_k(self, k, umbral=None):
+        # Varias pasadas al azar por pasillo; sólo se guardan columnas distintas
         ordenes_indexadas = list(range(self.O))
         random.shuffle(ordenes_indexadas)
+        recorridos = ordenes_diversas(self.O, self.rondas_inicializacion, ordenes_indexadas, random.getrandbits(32))
+        self.inicializar_columnas_con_recorridos(k, recorridos, umbral)
 
-        for a in range(self.A):
-            if umbral and (time.time() - tiempo_ini) > umbral:
-                print("⏱️ Tiempo agotado durante inicialización de columnas")
-                break
-            
-            for _ in range(5): 
-                cap_restante = list(self.S[a])
-                sel = [0] * self.O
-                total_unidades = 0
-                for o in ordenes_indexadas:
-                    if (unidades_o[o] + total_unidades <= self.UB) and \
-                    all(self.W[o][i] <= cap_restante[i] for i in range(self.I)):
-                        
-                        sel[o] = 1
-                        total_unidades += unidades_o[o]
-                        for i in range(self.I):
-                            cap_restante[i] -= self.W[o][i]
-                
-                if total_unidades > 0:
-                    nueva_columna = {
-                        'pasillo': a,
-                        'ordenes': sel,
-                        'unidades': total_unidades
-                    }
-                    self.columnas[k].append(nueva_columna)
-
-        print(f"✅ {len(self.columnas[k])} columnas iniciales creadas para k = {k}")
-
-
+    def reiniciar_columnas(self):
+        self.columnas = {}
+        self.pool_global = PoolColumnas(self.O)
+        self.ultimos_duales = None
+        self.llamadas_pricing = 0
+
+    def registrar_columnas(self, columnas):
+        # Con reusar_columnas, toda columna generada para algún k queda en el
+        # pool global (sin repetidas)
+        if self.reusar_columnas:
+            for col in columnas:
+                self.pool_global.agregar(col)
+
+    def sembrar_columnas_para_k(self, k, umbral=None):
+        # Una columna de a lo sumo k pasillos sigue siendo factible para k:
+        # si ya hay columnas de otros k, k arranca con ellas y con las del
+        # pricing heurístico en los últimos duales, sin volver a inicializar.
+        # Sin reusar_columnas, una revisita de k sigue con sus propias columnas
+        if self.reusar_columnas and len(self.pool_global):
+            self.columnas[k] = PoolColumnas(self.O, (col for col in self.pool_global if len(col.pasillos) <= k))
+            if self.ultimos_duales is not None:
+                for col in self.pricing_heuristico(self.ultimos_duales)[:self.max_columnas_por_iteracion]:
+                    self.columnas[k].agregar(col)
+            self.mostrar(f"♻️ {len(self.columnas[k])} columnas reutilizadas para k = {k}")
+        elif self.columnas.get(k):
+            self.mostrar(f"♻️ {len(self.columnas[k])} columnas de la visita anterior a k = {k}")
+        else:
+            self.inicializar_columnas_para_k(k, umbral=umbral)
+        self.registrar_columnas(self.columnas[k])
 
     def construir_modelo_maestro(self, k, umbral):
+        # Todo se arma desde los no nulos de cada columna: el objetivo va en
+        # la variable (unidades de la columna) y las filas orden_o / pasillo_a
+        # salen de los índices inversos del pool, así que el costo es
+        # proporcional a los no nulos y no a (O + A) x columnas. Las órdenes y
+        # pasillos sin ninguna columna no generan fila (su dual sería 0).
         tiempo_ini = time.time()
+        pool = self.columnas[k]
 
         modelo = Model(f"RMP_k_{k}")
         modelo.setParam('display/verblevel', 0)
         x_vars = []
 
-        for idx, col in enumerate(self.columnas[k]):
+        for idx, col in enumerate(pool):
             if tiempo_excedido(tiempo_ini, umbral):
                 print("⏱️ Tiempo excedido durante la creación de variables.")
                 return None, None, None, None, None, None
 
-            x = modelo.addVar(vtype="B", name=f"x_{col['pasillo']}_{idx}")
-            x_vars.append(x)
+            x_vars.append(modelo.addVar(vtype="B", name=f"x_{idx}", obj=col.unidades))
+        modelo.setMaximize()
 
-        restr_card_k = modelo.addCons(quicksum(x_vars) == k, name="card_k")
+        restr_card_k = modelo.addCons(
+            quicksum(len(col.pasillos) * x for col, x in zip(pool, x_vars)) == k, name="card_k"
+        )
+        restr_ub = modelo.addCons(
+            quicksum(col.unidades * x for col, x in zip(pool, x_vars)) <= self.UB, name="restr_total_ub"
+        )
 
         restr_ordenes = {}
         for o in range(self.O):
+            columnas_o = pool.columnas_de_orden(o)
+            if not columnas_o:
+                continue
             if tiempo_excedido(tiempo_ini, umbral):
                 print("⏱️ Tiempo excedido durante la creación de restricciones de órdenes.")
                 return None, None, None, None, None, None
 
-            cons = modelo.addCons(
-                quicksum(x_vars[j] * self.columnas[k][j]['ordenes'][o] for j in range(len(x_vars))) <= 1,
-                name=f"orden_{o}"
-            )
-            restr_ordenes[o] = cons
-
-        if tiempo_excedido(tiempo_ini, umbral):
-            print("⏱️ Tiempo excedido antes de la restricción de unidades totales.")
-            return None, None, None, None, None, None
-
-        restr_ub = modelo.addCons(
-            quicksum(x_vars[j] * self.columnas[k][j]['unidades'] for j in range(len(x_vars))) <= self.UB,
-            name="restr_total_ub"
-        )
+            restr_ordenes[o] = modelo.addCons(quicksum(x_vars[j] for j in columnas_o) <= 1, name=f"orden_{o}")
 
         restr_pasillos = {}
-        for a in range(self.A):
+        for a in sorted(pool.por_pasillo):
             if tiempo_excedido(tiempo_ini, umbral):
                 print("⏱️ Tiempo excedido durante la creación de restricciones de pasillos.")
                 return None, None, None, None, None, None
 
-            cons = modelo.addCons(
-                quicksum(
-                    x_vars[j] for j in range(len(x_vars)) if self.columnas[k][j]['pasillo'] == a
-                ) <= 1,
-                name=f"pasillo_{a}"
+            restr_pasillos[a] = modelo.addCons(
+                quicksum(x_vars[j] for j in pool.columnas_de_pasillo(a)) <= 1, name=f"pasillo_{a}"
             )
-            restr_pasillos[a] = cons
-
-        if tiempo_excedido(tiempo_ini, umbral):
-            print("⏱️ Tiempo excedido antes de definir la función objetivo.")
-            return None, None, None, None, None, None
-
-        modelo.setObjective(
-            quicksum(
-                x_vars[j] * sum(
-                    self.W[o][i]
-                    for o in range(self.O) if self.columnas[k][j]['ordenes'][o]
-                    for i in range(self.I)
-                )
-                for j in range(len(x_vars))
-            ),
-            sense="maximize"
-        )
 
         return modelo, x_vars, restr_card_k, restr_ordenes, restr_ub, restr_pasillos
     
 
     
     def resolver_subproblema(self, W, S, dual_vals, UB, k, umbral=None):
+        columnas = self.resolver_subproblema_multiple(W, S, dual_vals, UB, k, umbral, max_columnas=1)
+        return columnas[0] if columnas else None
+
+    def resolver_subproblema_multiple(self, W, S, dual_vals, UB, k, umbral=None, max_columnas=1):
         tiempo_ini = time.time()
+        self.llamadas_pricing += 1
         O = len(W)
         I = len(W[0])
         A = len(S)
 
         if tiempo_excedido(tiempo_ini, umbral):
             print("⏱️ Tiempo excedido antes de comenzar.")
-            return None
+            return []
 
-        units_o = [sum(W[o][i] for i in range(I)) for o in range(O)]
+        units_o = W.totales.tolist()
 
         modelo = Model("Subproblema_unico")
         modelo.setParam("display/verblevel", 0)
@@ -180,13 +305,18 @@ class Columns:
 
         modelo.addCons(quicksum(y[a] for a in range(A)) == 1, name="unico_pasillo")
 
+        ordenes_por_item = W.transpuesta()
+        pasillos_por_item = S.transpuesta()
         for i in range(I):
             if tiempo_excedido(tiempo_ini, umbral):
                 print("⏱️ Tiempo excedido antes de comenzar.")
-                return None
+                return []
+            ordenes_i = list(ordenes_por_item.items(i))
+            if not ordenes_i:
+                continue
             modelo.addCons(
-                quicksum(W[o][i] * z[o] for o in range(O)) <=
-                quicksum(S[a][i] * y[a] for a in range(A)),
+                quicksum(cant * z[o] for o, cant in ordenes_i) <=
+                quicksum(cant * y[a] for a, cant in pasillos_por_item.items(i)),
                 name=f"capacidad_total_item_{i}"
             )
 
@@ -200,31 +330,182 @@ class Columns:
             + quicksum(dual_vals.get(f"pasillo_{a}", 0) * y[a] for a in range(A))
 
         modelo.setObjective(expr_cj - expr_Ajy, sense="maximize")
+        if umbral is not None:
+            modelo.setParam("limits/time", max(1.0, umbral - (time.time() - tiempo_ini)))
         modelo.optimize()
+        # La cota dual del subproblema acota el costo reducido de cualquier columna
+        if abs(modelo.getDualbound()) < modelo.infinity():
+            self.costo_reducido_exacto = (dual_vals, modelo.getDualbound())
 
         if modelo.getStatus() != "optimal":
             print("⚠️ Subproblema no óptimo.")
+            return []
+
+        columnas = []
+        for pasillos, ordenes_sel in soluciones_mejorantes(modelo, y, z, max_columnas):
+            unidades = sum(units_o[o] for o in ordenes_sel)
+            columnas.append(Columna(ordenes_sel, pasillos, unidades))
+
+        return columnas
+
+
+    def pricing_heuristico(self, dual_vals):
+        # Para cada pasillo, mochila greedy sobre los beneficios reducidos de las
+        # órdenes; se evalúan todos los pasillos a la vez. Devuelve las columnas
+        # con costo reducido positivo, de mayor a menor.
+        self.llamadas_pricing += 1
+        unidades = self.W.totales
+        dual_ordenes = np.array([dual_vals.get(f"orden_{o}", 0) for o in range(self.O)])
+        dual_pasillos = np.array([dual_vals.get(f"pasillo_{a}", 0) for a in range(self.A)])
+        beneficio = unidades - dual_ordenes - dual_vals.get("restr_total_ub", 0) * unidades
+        costo_fijo = dual_vals.get("card_k", 0) + dual_pasillos
+
+        candidatas = np.flatnonzero(beneficio > 1e-9)
+        candidatas = candidatas[np.argsort(-beneficio[candidatas], kind="stable")]
+
+        # Pasillos que ni con todas las órdenes rentables podrían mejorar
+        pasillos = np.flatnonzero(beneficio[candidatas].sum() - costo_fijo > 1e-6)
+        seleccion, totales = llenado_greedy(self.W, self.S, [[a] for a in pasillos.tolist()], candidatas, self.UB)
+
+        nuevas = []
+        for a, ordenes_a, total in zip(pasillos.tolist(), seleccion, totales.tolist()):
+            costo_reducido = beneficio[ordenes_a].sum() - costo_fijo[a]
+            if costo_reducido <= 1e-6:
+                continue
+            nuevas.append((costo_reducido, Columna(ordenes_a, (a,), total)))
+
+        nuevas.sort(key=lambda par: par[0], reverse=True)
+        return [col for _, col in nuevas]
+
+    def configuracion(self):
+        # Parámetros que se copian a los solvers de los procesos de la exploración paralela
+        return {nombre: getattr(self, nombre) for nombre in
+                ("maestro_incremental", "max_columnas_por_iteracion", "estabilizacion", "alfa_estabilizacion",
+                 "tolerancia_gap", "reusar_columnas", "tiempo_busqueda_local", "archivo_telemetria", "verbose")}
+
+    def mostrar(self, *mensaje):
+        if self.verbose:
+            print(*mensaje)
+
+    def registrar_iteracion(self, registro):
+        self.telemetria.archivo = self.archivo_telemetria
+        self.telemetria.imprimir = self.verbose
+        self.telemetria.registrar(registro)
+
+    def pasillos_por_columna(self, k):
+        return 1
+
+    def columnas_por_solucion(self, k):
+        return k
+
+    def cota_lagrangiana(self, duales, k):
+        # Mejor cota lagrangiana de k (ver cota_lagrangiana.py): con los duales
+        # actuales y la cota de mochila, y con los del último pricing exacto
+        cota = valor_dual(duales, k, self.UB) + self.columnas_por_solucion(k) * cota_costo_reducido(
+            self.W.totales, duales, self.UB, self.S.totales, self.pasillos_por_columna(k), self.k_minimo
+        )
+        if self.costo_reducido_exacto is not None:
+            duales_exacto, costo = self.costo_reducido_exacto
+            cota = min(cota, valor_dual(duales_exacto, k, self.UB) + self.columnas_por_solucion(k) * costo)
+        self.cotas_lagrangianas[k] = min(self.cotas_lagrangianas.get(k, float("inf")), cota)
+        return self.cotas_lagrangianas[k]
+
+    def motivo_de_corte(self, valor_maestro, k):
+        # La generación de columnas de k puede terminar si el LP ya está a
+        # menos de tolerancia_gap de la cota, o si la cota dividida k no
+        # supera el mejor valor ya encontrado en otro k
+        cota = self.cotas_lagrangianas.get(k)
+        if cota is None:
             return None
+        gap = gap_relativo(cota, valor_maestro)
+        if gap <= self.tolerancia_gap:
+            return f"gap {gap:.2e} <= {self.tolerancia_gap:.0e}"
+        if cota / k <= self.mejor_valor_conocido + TOLERANCIA_PODA:
+            return f"cota {cota / k:.4f} <= mejor valor {self.mejor_valor_conocido:.4f}"
+        return None
+
+    def generar_columnas_estabilizadas(self, dual_map, k, generar, generar_suavizado=None):
+        # `generar(duales)` -> (columnas, tipo); con estabilización el pricing
+        # se hace sobre duales suavizados (ver estabilizacion.py). Las columnas
+        # que ya están en el pool no cuentan (pueden tener costo reducido
+        # positivo si su variable está en la cota 1).
+        if not self.estabilizacion:
+            return generar(dual_map)
+
+        def sin_repetidas(generador):
+            if generador is None:
+                return None
 
-        reduced_cost = modelo.getObjVal()
+            def generar_nuevas(duales):
+                nuevas, tipo = generador(duales)
+                nuevas = [col for col in nuevas if self.columnas[k].buscar(col) is None]
+                return nuevas[:self.max_columnas_por_iteracion], tipo
+            return generar_nuevas
 
-        if reduced_cost <= 1e-6:
-            return None
+        return self.estabilizador.generar(dual_map, sin_repetidas(generar), sin_repetidas(generar_suavizado))
 
-        pasillo_seleccionado = next((a for a in range(A) if modelo.getVal(y[a]) > 0.5), None)
-        ordenes = [int(modelo.getVal(z[o]) + 0.5) for o in range(O)]
-        unidades = sum(units_o[o] for o in range(O) if ordenes[o])
-
-        return {'pasillo': pasillo_seleccionado, 'ordenes': ordenes, 'unidades': unidades}
+    def generar_columnas(self, dual_vals, k, umbral=None):
+        # Pricing en dos niveles: la heurística greedy primero y, sólo si no
+        # encuentra columnas que no estén ya en el pool, el MIP exacto (que prueba la optimalidad del LP).
+        # En ambos casos se devuelven hasta max_columnas_por_iteracion columnas.
+        nuevas = [col for col in self.pricing_heuristico(dual_vals) if self.columnas[k].buscar(col) is None]
+        if nuevas:
+            return nuevas[:self.max_columnas_por_iteracion], "heuristico"
 
+        nuevas = self.resolver_subproblema_multiple(
+            self.W, self.S, dual_vals, self.UB, k, umbral, max_columnas=self.max_columnas_por_iteracion
+        )
+        return nuevas, "exacto"
+
+    def _resolver_maestro_reconstruido(self, k, umbral):
+        # Devuelve (maestro relajado, nombres de sus variables en el orden del pool,
+        # duales, tiempo de construcción)
+        inicio = time.time()
+        maestro, x_vars, restr_card_k, restr_ordenes, restr_ub, restr_pasillos = self.construir_modelo_maestro(k, umbral)
+        if maestro is None:
+            print("No se pudo construir el modelo maestro a tiempo")
+            return None, None, None, time.time() - inicio
+
+        # Los nombres se leen antes de que se libere el maestro original
+        nombres = [x.name for x in x_vars]
+        maestro_relajado = Model(sourceModel=maestro)
+        maestro_relajado.setPresolve(SCIP_PARAMSETTING.OFF)
+        maestro_relajado.disablePropagation()
+        for var in maestro_relajado.getVars():
+            maestro_relajado.chgVarType(var, "CONTINUOUS")
+        tiempo_construccion = time.time() - inicio
+        maestro_relajado.optimize()
+
+        if maestro_relajado.getStatus() != "optimal":
+            print("⚠️ No se encontró solución. Estado del modelo:", maestro_relajado.getStatus())
+            return maestro_relajado, nombres, None, tiempo_construccion
+
+        dual_map = {cons.name: maestro_relajado.getDualSolVal(cons) for cons in maestro_relajado.getConss()}
+        return maestro_relajado, nombres, dual_map, tiempo_construccion
 
     def Opt_cantidadPasillosFija(self, k, umbral):
         tiempo_ini = time.time()
         tiempo_inicializacion = 0.3 * umbral
-        self.inicializar_columnas_para_k(k, umbral=tiempo_inicializacion)
+        self.sembrar_columnas_para_k(k, umbral=tiempo_inicializacion)
+        self.estabilizador = EstabilizacionDual(self.alfa_estabilizacion)
+        if self.reusar_columnas:
+            # Los duales del k anterior son el primer centro de estabilidad
+            self.estabilizador.centro = self.ultimos_duales
+        self.costo_reducido_exacto = None
 
         mejor_sol = None
         primera_iteracion = True
+        iteracion = 0
+
+        maestro_lp = None
+        # Con el maestro incremental, la construcción de cada iteración es
+        # agregar las columnas de la anterior
+        inicio_construccion = time.time()
+        if self.maestro_incremental:
+            maestro_lp = MaestroIncremental(k, self.O, self.A, self.UB)
+            for col in self.columnas[k]:
+                maestro_lp.agregar_columna(col)
+        tiempo_construccion = time.time() - inicio_construccion
 
         while True:
             tiempo_actual = time.time()
@@ -232,49 +513,102 @@ class Columns:
             tiempo_restante_total = umbral - tiempo_transcurrido
 
             if tiempo_restante_total <= 0:
-                print("⏳ Tiempo agotado en Opt_cantidadPasillosFija → Fin del bucle.")
+                self.mostrar("⏳ Tiempo agotado en Opt_cantidadPasillosFija → Fin del bucle.")
                 break
 
-            print(f"⌛ Iteración con {len(self.columnas.get(k, []))} columnas")
-
-            maestro, x_vars, restr_card_k, restr_ordenes, restr_ub, restr_pasillos = self.construir_modelo_maestro(k, tiempo_restante_total)
-            if maestro is None:
-                print("No se pudo construir el modelo maestro a tiempo")
-                return None
-
-            maestro_relajado = Model(sourceModel=maestro)
-            maestro_relajado.setPresolve(SCIP_PARAMSETTING.OFF)
-            maestro_relajado.disablePropagation()
-            for var in maestro_relajado.getVars():
-                maestro_relajado.chgVarType(var, "CONTINUOUS")
-            maestro_relajado.optimize()
-
-            if maestro_relajado.getStatus() != "optimal":
-                print("⚠️ No se encontró solución. Estado del modelo:", maestro_relajado.getStatus())
+            self.mostrar(f"⌛ Iteración con {len(self.columnas.get(k, []))} columnas")
+            inicio_maestro = time.time()
+
+            if maestro_lp is not None:
+                if maestro_lp.resolver() is None:
+                    print("⚠️ No se encontró solución del maestro relajado.")
+                    break
+                dual_map = maestro_lp.duales()
+                if primera_iteracion:
+                    self.cant_var_inicio = maestro_lp.n_columnas
+                    primera_iteracion = False
+                valor_maestro = maestro_lp.valor_objetivo
+                mejor_sol = construir_mejor_solucion_lp(maestro_lp, self.columnas[k], self.cant_var_inicio)
+            else:
+                maestro_relajado, nombres, dual_map, tiempo_construccion = self._resolver_maestro_reconstruido(k, tiempo_restante_total)
+                if maestro_relajado is None:
+                    return None
+                if dual_map is None:
+                    break
+
+                if primera_iteracion:
+                    self.cant_var_inicio = maestro_relajado.getNVars()
+                    primera_iteracion = False
+
+                valor_maestro = maestro_relajado.getObjVal()
+                mejor_sol = construir_mejor_solucion(maestro_relajado, self.columnas[k], nombres, valor_maestro, self.cant_var_inicio)
+
+            tiempo_lp = time.time() - inicio_maestro
+            if maestro_lp is None:
+                tiempo_lp -= tiempo_construccion
+            self.ultimos_duales = dual_map
+
+            iteracion += 1
+            mejor_sol["cota_lagrangiana"] = self.cota_lagrangiana(dual_map, k)
+            registro = {
+                "k": k,
+                "iteracion": iteracion,
+                "maestro": "incremental" if maestro_lp is not None else "reconstruido",
+                "columnas": len(self.columnas.get(k, [])),
+                "tiempo_construccion": tiempo_construccion,
+                "tiempo_lp": tiempo_lp,
+                "valor_lp": valor_maestro,
+                "cota_lagrangiana": mejor_sol["cota_lagrangiana"],
+                "pricing": None,
+                "columnas_nuevas": 0,
+                "tiempo_pricing": 0.0,
+                "costo_reducido": None,
+                "mal_precios": self.estabilizador.mal_precios
+            }
+            motivo = self.motivo_de_corte(valor_maestro, k)
+            if motivo:
+                self.registrar_iteracion(registro)
+                self.mostrar(f"✂️ Fin de la generación de columnas para k = {k}: {motivo}")
                 break
 
-            dual_map = {cons.name: maestro_relajado.getDualSolVal(cons) for cons in maestro_relajado.getConss()}
-
-            if primera_iteracion:
-                self.cant_var_inicio = maestro_relajado.getNVars()
-                primera_iteracion = False
-
-
-            valor_objetivo_primal = maestro_relajado.getObjVal()
-
-            mejor_sol = construir_mejor_solucion(maestro_relajado, self.columnas.get(k, []), valor_objetivo_primal, self.cant_var_inicio)
-            
-
+            inicio_pricing = time.time()
             tiempo_restante_total = umbral - (time.time() - tiempo_ini)
-            nueva_col = self.resolver_subproblema(self.W, self.S, dual_map, self.UB, k, tiempo_restante_total)
-
+            nuevas_cols, tipo_pricing = self.generar_columnas_estabilizadas(
+                dual_map, k,
+                lambda duales: self.generar_columnas(duales, k, umbral - (time.time() - tiempo_ini)),
+                lambda duales: (self.pricing_heuristico(duales), "heuristico")
+            )
 
-            if nueva_col is None :
-                print("No se generó columna nueva → Fin del bucle.")
+            # El pricing exacto pudo haber mejorado la cota
+            mejor_sol["cota_lagrangiana"] = self.cota_lagrangiana(dual_map, k)
+            registro.update({
+                "pricing": tipo_pricing,
+                "columnas_nuevas": len(nuevas_cols),
+                "tiempo_pricing": time.time() - inicio_pricing,
+                "costo_reducido": mayor_costo_reducido(nuevas_cols, dual_map),
+                "cota_lagrangiana": mejor_sol["cota_lagrangiana"],
+                "mal_precios": self.estabilizador.mal_precios
+            })
+            self.registrar_iteracion(registro)
+
+            if not nuevas_cols:
+                self.mostrar("No se generó columna nueva → Fin del bucle.")
                 break
 
-            print("Nueva columna encontrada:", nueva_col)
-            self.columnas.setdefault(k, []).append(nueva_col)
+            self.mostrar(f"Nuevas columnas encontradas ({tipo_pricing}): {len(nuevas_cols)}")
+            inicio_construccion = time.time()
+            agregadas = 0
+            for nueva_col in nuevas_cols:
+                if not self.columnas[k].agregar(nueva_col):
+                    continue
+                agregadas += 1
+                self.registrar_columnas([nueva_col])
+                if maestro_lp is not None:
+                    maestro_lp.agregar_columna(nueva_col)
+            tiempo_construccion = time.time() - inicio_construccion
+            if not agregadas:
+                self.mostrar("Las columnas nuevas ya estaban en el pool → Fin del bucle.")
+                break
 
         return mejor_sol
 
@@ -307,16 +641,7 @@ class Columns:
 
         if status in ["optimal", "feasible"] and modelo.getNSols() > 0:
             obj_val = modelo.getObjVal()
-            pasillos_seleccionados = set()
-            ordenes_seleccionadas = set()
-
-            for idx, x in enumerate(x_vars):
-                val = x.getLPSol()
-                if val and val > 1e-5:
-                    pasillos_seleccionados.add(self.columnas[k][idx]['pasillo'])
-                    for o, seleccionado in enumerate(self.columnas[k][idx]['ordenes']):
-                        if seleccionado:
-                            ordenes_seleccionadas.add(o)
+            pasillos_seleccionados, ordenes_seleccionadas, _ = self.columnas[k].seleccion([modelo.getVal(x) for x in x_vars])
 
             mejor_sol = {
                 "valor_objetivo": obj_val / len(pasillos_seleccionados) if pasillos_seleccionados else 0,
@@ -342,12 +667,74 @@ class Columns:
         return mejor_sol
 
 
+    def podar_lista_k(self, lista_k, lista_umbrales, mejor_valor=-float("inf")):
+        # Quita de la lista (y de sus umbrales) los k cuya cota no supera mejor_valor
+        vivos = set(self.cotas_k.podar(lista_k, mejor_valor))
+        pares = [(k, t) for k, t in zip(lista_k, lista_umbrales) if k in vivos]
+        self.k_podados += len(lista_k) - len(pares)
+        return [k for k, _ in pares], [t for _, t in pares]
+
+    def resumen_telemetria(self):
+        # Tiempo de la generación de columnas por fase, para el CSV
+        self.telemetria.cerrar()
+        resumen = self.telemetria.resumen()
+        print(f"📊 Generación de columnas: {resumen['iteraciones']} iteraciones; maestro "
+              f"{resumen['tiempo_construccion']:.1f}s construcción + {resumen['tiempo_lp']:.1f}s LP, "
+              f"pricing {resumen['tiempo_pricing']:.1f}s")
+        return {campo: round(valor, 2) for campo, valor in resumen.items()}
+
+    def explorar_con_planificador(self, lista_k, lista_umbrales, presupuesto, clave_valor="valor_objetivo"):
+        # Los umbrales de Rankear quedan como tope de la primera visita de
+        # cada k; el planificador decide el resto (ver planificador_k.py).
+        # `clave_valor` es la clave del cociente en las soluciones del solver
+        planificador = PlanificadorK(lista_k, self.cotas_k.cota, presupuesto, lista_umbrales)
+        best_sol = None
+        best_obj = -float("inf")
+        while True:
+            turno = planificador.siguiente(best_obj)
+            if turno is None:
+                break
+            k, tiempo_k = turno
+            self.mejor_valor_conocido = best_obj
+            inicio_turno = time.time()
+            sol = self.Opt_cantidadPasillosFija(k, tiempo_k)
+            cota = self.cotas_lagrangianas.get(k)
+            planificador.registrar(k, tiempo_k, time.time() - inicio_turno,
+                                   sol.get(clave_valor) if sol else None, cota / k if cota is not None else None)
+            if sol and sol.get(clave_valor, -float("inf")) > best_obj:
+                best_obj = sol[clave_valor]
+                best_sol = sol
+        self.k_podados += sum(1 for motivo in planificador.retirados.values() if motivo == "cota")
+        print(f"🎰 Planificador: {planificador.resumen()}")
+        return best_sol
+
     def Opt_ExplorarCantidadPasillos(self, umbral):
-        self.columnas = {}
+        # El archivo de telemetría se cierra aunque la exploración termine sin
+        # solución o con una excepción
+        try:
+            return self.explorar_cantidad_pasillos(umbral)
+        finally:
+            self.telemetria.cerrar()
+
+    def explorar_cantidad_pasillos(self, umbral):
+        self.reiniciar_columnas()
         best_sol = None
         tiempo_ini = time.time()
 
-        lista_k, lista_umbrales = self.Rankear(umbral)
+        lista_k, lista_umbrales = self.podar_lista_k(*self.Rankear(umbral))
+        print(f"✂️ Poda por cotas: {self.cotas_k.resumen()}")
+
+        if self.procesos_k > 1 and len(lista_k) > 1:
+            best_sol, columnas_por_k = explorar_k_en_paralelo(
+                self, lista_k, umbral * 0.9, self.procesos_k, lista_umbrales,
+                atributos=self.configuracion(), cotas=self.cotas_k
+            )
+            self.columnas.update(columnas_por_k)
+            lista_k, lista_umbrales = [], []
+
+        if self.planificador_adaptativo and lista_k:
+            best_sol = self.explorar_con_planificador(lista_k, lista_umbrales, umbral * 0.9 - (time.time() - tiempo_ini))
+            lista_k, lista_umbrales = [], []
 
         for k, tiempo_k in zip(lista_k, lista_umbrales):
             tiempo_actual = time.time()
@@ -357,10 +744,14 @@ class Columns:
             if tiempo_restante_total <= 0:
                 break
 
+            best_obj = best_sol.get("valor_objetivo", -float('inf')) if best_sol else -float('inf')
+            if not self.podar_lista_k([k], [tiempo_k], best_obj)[0]:
+                continue
+
             tiempo_k_deseado = tiempo_k
             tiempo_k = min(tiempo_k_deseado, tiempo_restante_total)
 
-
+            self.mejor_valor_conocido = best_obj
             sol = self.Opt_cantidadPasillosFija(k, tiempo_k)
 
             if sol:
@@ -369,6 +760,9 @@ class Columns:
                 if sol_obj > best_obj:
                     best_sol = sol
 
+        if self.k_podados:
+            print(f"✂️ {self.k_podados} valores de k descartados por cota")
+
         if best_sol:
             tiempo_usado = time.time() - tiempo_ini
             tiempo_final = max(1.0, umbral - tiempo_usado)
@@ -376,6 +770,9 @@ class Columns:
             self.pasillos_fijos = best_sol["pasillos_seleccionados"]
             resultado_final = self.Opt_PasillosFijos(tiempo_final)
             resultado_final["variables"] = best_sol["variables"]
+            resultado_final["cota_lagrangiana"] = best_sol.get("cota_lagrangiana")
+            resultado_final["llamadas_pricing"] = self.llamadas_pricing
+            resultado_final.update(self.resumen_telemetria())
 
             if resultado_final is None:
                 print("⚠️ Opt_PasillosFijos no devolvió una solución válida.")
@@ -388,10 +785,13 @@ class Columns:
                     "cota_dual": best_sol.get("cota_dual", 0)
                 }
 
-            print("✅ Resultado final con pasillos fijos:", resultado_final)
+            self.mostrar("✅ Resultado final con pasillos fijos:", resultado_final)
             print("✅ Cantidad de variables:", resultado_final["variables"])
             print("✅ Cantidad de variables finales:", resultado_final["variables_final"])
 
+            tiempo_busqueda = min(self.tiempo_busqueda_local, umbral - (time.time() - tiempo_ini))
+            resultado_final = mejorar_resultado(self.W, self.S, self.LB, self.UB, resultado_final, tiempo_busqueda)
+
             resultado_final["tiempo_total"] = round(time.time() - tiempo_ini, 2)
             return resultado_final
         
@@ -408,7 +808,7 @@ class Columns:
 
 
     def Rankear(self, umbral):
-        capacidades = [sum(self.S[a]) for a in range(self.A)]
+        capacidades = self.S.totales.tolist()
         pasillos_ordenados = sorted(range(1, self.A + 1), key=lambda a: capacidades[a-1], reverse=True)
         lista_k = pasillos_ordenados
         tiempo_por_k = umbral 
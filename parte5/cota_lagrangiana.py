@@ -0,0 +1,58 @@
+import numpy as np
+
+# Cota lagrangiana (Farley) del maestro para un k: para cualquier vector de
+# duales π (>= 0 en las filas <=) vale
+#     z <= π·b + (columnas por solución) · (máximo costo reducido en π),
+# con π·b = π_card·k + π_ub·UB + Σ π_orden + Σ π_pasillo. El máximo costo
+# reducido puede reemplazarse por cualquier cota superior: la del pricing
+# exacto (su cota dual) o, en todas las iteraciones, la de una mochila
+# fraccionaria sobre las órdenes que sólo respeta UB y la capacidad total de
+# los pasillos.
+
+
+def valor_dual(duales, k, UB):
+    return sum(v for c, v in duales.items() if c.startswith(("orden_", "pasillo_"))) \
+        + duales.get("card_k", 0) * k + duales.get("restr_total_ub", 0) * UB
+
+
+def mochila_fraccionaria(beneficio, pesos, capacidades):
+    # Valor de la mochila fraccionaria para cada capacidad de `capacidades`
+    utiles = np.flatnonzero((beneficio > 0) & (pesos > 0))
+    utiles = utiles[np.argsort(-beneficio[utiles] / pesos[utiles], kind="stable")]
+    peso_acumulado = np.concatenate(([0], np.cumsum(pesos[utiles])))
+    valor_acumulado = np.concatenate(([0.0], np.cumsum(beneficio[utiles])))
+
+    enteras = np.searchsorted(peso_acumulado, capacidades, side="right") - 1
+    valor = valor_acumulado[enteras]
+    parcial = enteras < len(utiles)
+    siguiente = utiles[enteras[parcial]]
+    valor[parcial] += beneficio[siguiente] * (capacidades[parcial] - peso_acumulado[enteras[parcial]]) / pesos[siguiente]
+    return valor
+
+
+def cota_costo_reducido(unidades, duales, UB, capacidades, pasillos_por_columna, k_minimo=None):
+    # Cota del costo reducido de una columna con `pasillos_por_columna`
+    # pasillos: mochila fraccionaria de las órdenes con beneficio reducido
+    # positivo, con capacidad min(UB, capacidad de los pasillos), menos la
+    # parte fija (card_k y duales de pasillo). Con un pasillo se evalúa cada
+    # pasillo; con más, las mayores capacidades y los menores duales. Con
+    # `k_minimo` (ver presolve.py) quedan afuera las órdenes que necesitan
+    # más pasillos que los de la columna.
+    dual_ordenes = np.array([duales.get(f"orden_{o}", 0) for o in range(len(unidades))])
+    beneficio = unidades * (1 - duales.get("restr_total_ub", 0)) - dual_ordenes
+    if k_minimo is not None:
+        beneficio[k_minimo > pasillos_por_columna] = 0
+    dual_pasillos = np.array([duales.get(f"pasillo_{a}", 0) for a in range(len(capacidades))])
+    fijo_card = duales.get("card_k", 0) * pasillos_por_columna
+
+    if pasillos_por_columna == 1:
+        mochila = mochila_fraccionaria(beneficio, unidades, np.minimum(capacidades, UB).astype(float))
+        return float((mochila - dual_pasillos).max() - fijo_card)
+
+    capacidad = min(UB, np.sort(capacidades)[::-1][:pasillos_por_columna].sum())
+    mochila = mochila_fraccionaria(beneficio, unidades, np.array([capacidad], dtype=float))[0]
+    return float(mochila - np.sort(dual_pasillos)[:pasillos_por_columna].sum() - fijo_card)
+
+
+def gap_relativo(cota, valor):
+    return (cota - valor) / max(1.0, abs(cota))
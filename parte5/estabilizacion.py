@@ -0,0 +1,54 @@
+# Estabilización de duales para la generación de columnas (suavizado de
+# Wentges): el pricing no usa los duales π del maestro sino
+# π~ = α·π^ + (1 - α)·π, con π^ el centro de estabilidad (el último punto en
+# el que se hizo pricing). Si en π~ no aparece ninguna columna con costo
+# reducido positivo respecto de π (mal pricing), se repite con
+# α_j = max(0, 1 - j·(1 - α)) en el intento j; con α = 0 el pricing es el de
+# siempre, así que la convergencia sigue probándose con los duales del maestro
+# y con el pricing completo.
+
+# Costo reducido mínimo para considerar que una columna mejora el maestro
+TOLERANCIA_COSTO_REDUCIDO = 1e-6
+
+
+def costo_reducido(col, duales):
+    # Contra las filas card_k, orden_o, restr_total_ub y pasillo_a del maestro
+    return (col.unidades * (1 - duales.get("restr_total_ub", 0))
+            - duales.get("card_k", 0) * len(col.pasillos)
+            - sum(duales.get(f"orden_{o}", 0) for o in col.ordenes.tolist())
+            - sum(duales.get(f"pasillo_{a}", 0) for a in col.pasillos))
+
+
+class EstabilizacionDual:
+    def __init__(self, alfa=0.5):
+        self.alfa = alfa
+        self.centro = None
+        self.mal_precios = 0
+
+    def punto(self, duales, alfa):
+        if alfa <= 0:
+            return dict(duales)
+        claves = set(duales) | set(self.centro)
+        return {c: alfa * self.centro.get(c, 0.0) + (1 - alfa) * duales.get(c, 0.0) for c in claves}
+
+    def alfa_intento(self, intento):
+        # Tras cada mal pricing el punto se acerca a los duales del maestro
+        return max(0.0, 1 - intento * (1 - self.alfa))
+
+    def generar(self, duales, generar, generar_suavizado=None):
+        # `generar(duales)` devuelve (columnas, tipo de pricing). En los puntos
+        # suavizados se usa `generar_suavizado` si se pasa (p. ej. sólo la
+        # heurística, para no pagar un MIP exacto por cada mal pricing). Se
+        # devuelven todas las columnas del último pricing si alguna mejora en π.
+        # Sin centro todavía, el punto es π y no hay mal pricing posible
+        alfa, intento = (self.alfa if self.centro is not None else 0.0), 0
+        while True:
+            punto = self.punto(duales, alfa)
+            nuevas, tipo = (generar if alfa == 0 or generar_suavizado is None else generar_suavizado)(punto)
+            if alfa == 0 or any(costo_reducido(col, duales) > TOLERANCIA_COSTO_REDUCIDO for col in nuevas):
+                break
+            self.mal_precios += 1
+            intento += 1
+            alfa = self.alfa_intento(intento)
+        self.centro = punto
+        return nuevas, tipo
@@ -5,31 +5,41 @@ import sys
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 from cargar_input import leer_input
 from guardar_output import guardar_resultado
+from presolve import presolve
 
-archivo_input = "datos_de_entrada/b/instance_0003.txt"
-W, S, LB, UB = leer_input(archivo_input)
+if __name__ == "__main__":
+    # Cantidad de procesos para explorar valores de k en paralelo (opcional)
+    procesos = int(sys.argv[1]) if len(sys.argv) > 1 else 1
 
-solver = Columns(W, S, LB, UB)
-start = time.time()
-resultado = solver.Opt_ExplorarCantidadPasillos(600)
-end = time.time()
-print("====== RESULTADO FINAL ======")
-print(f"Tiempo total de ejecución: {end - start:.0f} segundos")
+    archivo_input = "datos_de_entrada/b/instance_0003.txt"
+    W, S, LB, UB = leer_input(archivo_input)
+    reduccion = presolve(W, S, LB, UB)
+    print(f"Presolve: {reduccion.resumen(W, S)}")
+    W, S = reduccion.W, reduccion.S
 
-if resultado:
-    print("Valor objetivo:", resultado["valor_objetivo"])
-    print("Pasillos seleccionados:", resultado["pasillos_seleccionados"])
-    print("Órdenes seleccionadas:", resultado["ordenes_seleccionadas"])
-else:
-    print("No se encontró solución con el umbral de tiempo dado.")
+    solver = Columns(W, S, LB, UB)
+    solver.procesos_k = procesos
+    start = time.time()
+    resultado = solver.Opt_ExplorarCantidadPasillos(600)
+    end = time.time()
+    print("====== RESULTADO FINAL ======")
+    print(f"Tiempo total de ejecución: {end - start:.0f} segundos")
 
+    if resultado:
+        print("Valor objetivo:", resultado["valor_objetivo"])
+        print("Pasillos seleccionados:", resultado["pasillos_seleccionados"])
+        print("Órdenes seleccionadas:", resultado["ordenes_seleccionadas"])
+    else:
+        print("No se encontró solución con el umbral de tiempo dado.")
 
-guardar_resultado(
-    archivo_input=archivo_input,
-    parte="parte5",  
-    resultado={
-        "valor_objetivo": resultado["valor_objetivo"],
-        "ordenes_seleccionadas": list(resultado["ordenes_seleccionadas"]),
-        "pasillos_seleccionados": list(resultado["pasillos_seleccionados"])
-    }
-)
\ No newline at end of file
+
+    guardar_resultado(
+        archivo_input=archivo_input,
+        parte="parte5",  
+        resultado={
+            "valor_objetivo": resultado["valor_objetivo"],
+            "ordenes_seleccionadas": list(resultado["ordenes_seleccionadas"]),
+            "pasillos_seleccionados": list(resultado["pasillos_seleccionados"])
+        },
+        reduccion=reduccion
+    )
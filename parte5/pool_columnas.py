@@ -0,0 +1,87 @@
+import numpy as np
+
+
+class Columna:
+    # Una columna del maestro: órdenes (índices ordenados, int32), pasillos
+    # (tupla ordenada) y unidades totales. `clave` es el hash del contenido.
+    __slots__ = ("ordenes", "pasillos", "unidades", "clave")
+
+    def __init__(self, ordenes, pasillos, unidades):
+        self.ordenes = np.unique(np.asarray(ordenes, dtype=np.int32))
+        self.pasillos = tuple(sorted(int(a) for a in pasillos))
+        self.unidades = int(unidades)
+        self.clave = hash((self.pasillos, self.ordenes.tobytes()))
+
+    def misma_que(self, otra):
+        return (self.clave == otra.clave and self.pasillos == otra.pasillos
+                and np.array_equal(self.ordenes, otra.ordenes))
+
+    def __repr__(self):
+        return f"Columna(pasillos={self.pasillos}, ordenes={len(self.ordenes)}, unidades={self.unidades})"
+
+
+class PoolColumnas:
+    # Columnas de un k sin repetidas. El índice de cada columna es su posición
+    # de inserción (la misma que su variable en el maestro). Mantiene además
+    # las columnas que contienen cada orden y cada pasillo.
+    def __init__(self, n_ordenes, columnas=()):
+        self.n_ordenes = n_ordenes
+        self.columnas = []
+        self.por_clave = {}
+        self.por_orden = [[] for _ in range(n_ordenes)]
+        self.por_pasillo = {}
+        self.rechazadas = 0
+        for col in columnas:
+            self.agregar(col)
+
+    def __len__(self):
+        return len(self.columnas)
+
+    def __iter__(self):
+        return iter(self.columnas)
+
+    def __getitem__(self, idx):
+        return self.columnas[idx]
+
+    def buscar(self, col):
+        for idx in self.por_clave.get(col.clave, ()):
+            if self.columnas[idx].misma_que(col):
+                return idx
+        return None
+
+    def agregar(self, col):
+        # Devuelve False (y no la agrega) si ya hay una columna igual
+        if self.buscar(col) is not None:
+            self.rechazadas += 1
+            return False
+        idx = len(self.columnas)
+        self.columnas.append(col)
+        self.por_clave.setdefault(col.clave, []).append(idx)
+        for o in col.ordenes.tolist():
+            self.por_orden[o].append(idx)
+        for a in col.pasillos:
+            self.por_pasillo.setdefault(a, []).append(idx)
+        return True
+
+    def columnas_de_orden(self, o):
+        return self.por_orden[o]
+
+    def columnas_de_pasillo(self, a):
+        return self.por_pasillo.get(a, [])
+
+    def copia(self):
+        return PoolColumnas(self.n_ordenes, self.columnas)
+
+    def filtrar(self, conservar):
+        # Nuevo pool con las columnas cuyos índices cumplen `conservar(idx)`
+        return PoolColumnas(self.n_ordenes, (col for idx, col in enumerate(self.columnas) if conservar(idx)))
+
+    def seleccion(self, valores, tolerancia=1e-5):
+        # Pasillos, órdenes y unidades de las columnas con valor > tolerancia
+        pasillos, ordenes, unidades = set(), set(), 0
+        for col, val in zip(self.columnas, valores):
+            if val and val > tolerancia:
+                pasillos.update(col.pasillos)
+                ordenes.update(col.ordenes.tolist())
+                unidades += col.unidades
+        return pasillos, ordenes, unidades
@@ -17,7 +17,7 @@ class Columns(ColumnsBase):
 
     def Rankear(self, umbral, alpha=1.0, verbose=True):
 
-        capacidades = np.sum(self.S, axis=1)
+        capacidades = self.S.totales
 
         if self.A > 1 and np.ptp(capacidades) > 1e-9:
             n_clusters = min(self.A, len(np.unique(capacidades)))
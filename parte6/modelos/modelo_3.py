@@ -4,7 +4,8 @@ import time
 from collections import deque, defaultdict
 from pyscipopt import Model, quicksum, SCIP_PARAMSETTING
 
-from parte5.columns_solver import construir_mejor_solucion
+from parte5.columns_solver import construir_mejor_solucion, mayor_costo_reducido, valores_columnas
+from parte5.estabilizacion import EstabilizacionDual
 
 try:
     from parte5.columns_solver import Columns as ColumnsBase
@@ -18,31 +19,24 @@ class Columns(ColumnsBase):
         super().__init__(W, S, LB, UB)
         self.inactive_counter = defaultdict(lambda: deque(maxlen=5))
         self.iteracion_actual = defaultdict(int)
-        self.col_hashes = defaultdict(set)
 
 
     def tiempo_restante(self, tiempo_ini, umbral):
         return umbral - (time.time() - tiempo_ini)
 
 
-    def actualizar_historial_inactividad(self, modelo_relajado, k, umbral_iteraciones=5):
-        for idx, x in enumerate(modelo_relajado.getVars()):
+    def actualizar_historial_inactividad(self, modelo_relajado, nombres, k, umbral_iteraciones=5):
+        for idx, val in enumerate(valores_columnas(modelo_relajado, nombres)):
             col = self.columnas[k][idx]
             key = (k, id(col))
-            val = x.getLPSol() or 0
-            self.inactive_counter[key].append(1 if val < 1e-5 else 0)
+            self.inactive_counter[key].append(1 if (val or 0) < 1e-5 else 0)
 
     def eliminar_columnas_inactivas(self, k, umbral_iteraciones=5):
-        nuevas_columnas, eliminadas = [], 0
-        for col in self.columnas[k]:
-            key = (k, id(col))
-            historial = self.inactive_counter.get(key, [])
-            if len(historial) == umbral_iteraciones and all(historial):
-                eliminadas += 1
-            else:
-                nuevas_columnas.append(col)
+        def activa(idx):
+            historial = self.inactive_counter.get((k, id(self.columnas[k][idx])), [])
+            return not (len(historial) == umbral_iteraciones and all(historial))
 
-        self.columnas[k] = nuevas_columnas
+        self.columnas[k] = self.columnas[k].filtrar(activa)
 
 
     def _resolver_maestro_relajado(self, maestro):
@@ -62,7 +56,11 @@ class Columns(ColumnsBase):
 
     def Opt_cantidadPasillosFija(self, k, umbral):
         tiempo_ini = time.time()
-        self.inicializar_columnas_para_k(k, umbral=0.3 * umbral)
+        self.sembrar_columnas_para_k(k, umbral=0.3 * umbral)
+        self.estabilizador = EstabilizacionDual(self.alfa_estabilizacion)
+        if self.reusar_columnas:
+            self.estabilizador.centro = self.ultimos_duales
+        self.costo_reducido_exacto = None
 
         mejor_sol, primera_iteracion = None, True
         
@@ -73,11 +71,17 @@ class Columns(ColumnsBase):
             if tiempo_restante <= 0:
                 break
 
-            maestro, _, _, _, _, _ = self.construir_modelo_maestro(k, tiempo_restante)
+            inicio_construccion = time.time()
+            maestro, x_vars, _, _, _, _ = self.construir_modelo_maestro(k, tiempo_restante)
             if maestro is None:
                 return None
+            nombres = [x.name for x in x_vars]
 
+            # El tiempo de LP incluye la copia relajada del maestro
+            inicio_lp = time.time()
+            tiempo_construccion = inicio_lp - inicio_construccion
             maestro_relajado, dual_map = self._resolver_maestro_relajado(maestro)
+            tiempo_lp = time.time() - inicio_lp
             if maestro_relajado is None:
                 break
 
@@ -86,21 +90,55 @@ class Columns(ColumnsBase):
                 primera_iteracion = False
 
             mejor_sol = construir_mejor_solucion(
-                maestro_relajado, self.columnas.get(k, []),
+                maestro_relajado, self.columnas[k], nombres,
                 maestro_relajado.getObjVal(), self.cant_var_inicio
             )
+            self.ultimos_duales = dual_map
+            mejor_sol["cota_lagrangiana"] = self.cota_lagrangiana(dual_map, k)
+            registro = {
+                "k": k,
+                "iteracion": self.iteracion_actual[k] + 1,
+                "maestro": "reconstruido",
+                "columnas": len(self.columnas[k]),
+                "tiempo_construccion": tiempo_construccion,
+                "tiempo_lp": tiempo_lp,
+                "valor_lp": maestro_relajado.getObjVal(),
+                "cota_lagrangiana": mejor_sol["cota_lagrangiana"],
+                "pricing": None,
+                "columnas_nuevas": 0,
+                "tiempo_pricing": 0.0,
+                "costo_reducido": None,
+                "mal_precios": self.estabilizador.mal_precios
+            }
+            motivo = self.motivo_de_corte(maestro_relajado.getObjVal(), k)
+            if motivo:
+                self.registrar_iteracion(registro)
+                self.mostrar(f"✂️ Fin de la generación de columnas para k = {k}: {motivo}")
+                break
 
             self.iteracion_actual[k] += 1
-            self.actualizar_historial_inactividad(maestro_relajado, k)
-
-            nueva_col = self.resolver_subproblema(
-                self.W, self.S, dual_map, self.UB, k, tiempo_restante
-            )
-
-            if nueva_col is None :
+            self.actualizar_historial_inactividad(maestro_relajado, nombres, k)
+
+            inicio_pricing = time.time()
+            nuevas, _ = self.generar_columnas_estabilizadas(dual_map, k, lambda duales: (
+                self.resolver_subproblema_multiple(self.W, self.S, duales, self.UB, k, tiempo_restante), "exacto"
+            ))
+            nueva_col = nuevas[0] if nuevas else None
+            mejor_sol["cota_lagrangiana"] = self.cota_lagrangiana(dual_map, k)
+            registro.update({
+                "pricing": "exacto",
+                "columnas_nuevas": len(nuevas),
+                "tiempo_pricing": time.time() - inicio_pricing,
+                "costo_reducido": mayor_costo_reducido(nuevas, dual_map),
+                "cota_lagrangiana": mejor_sol["cota_lagrangiana"],
+                "mal_precios": self.estabilizador.mal_precios
+            })
+            self.registrar_iteracion(registro)
+
+            # El pool descarta las columnas repetidas
+            if nueva_col is None or not self.columnas[k].agregar(nueva_col):
                 break
-            
-            self.columnas.setdefault(k, []).append(nueva_col)
+            self.registrar_columnas([nueva_col])
 
 
         if self.iteracion_actual[k] >= 5:
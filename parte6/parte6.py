@@ -1,17 +1,18 @@
+import argparse
 import os
 import sys
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 from script import leer_config, ejecutar_todos_modelos, escribir_csv
 
 def main():
-    if len(sys.argv) < 2:
-        print("Uso: python parte6.py archivo.cfg")
-        cfg_path = "parte6/experimento.cfg"
-    else:
-        cfg_path = sys.argv[1]
+    parser = argparse.ArgumentParser(description="Experimentos de la parte 6")
+    parser.add_argument("cfg", nargs="?", default="parte6/experimento.cfg", help="archivo .cfg del experimento")
+    parser.add_argument("--jobs", type=int, default=None,
+                        help="cantidad de corridas (modelo, instancia) en paralelo; por defecto `jobs` del .cfg o 1")
+    args = parser.parse_args()
 
-    config = leer_config(cfg_path)
-    metrica_dict, modelos = ejecutar_todos_modelos(config)
+    config = leer_config(args.cfg)
+    metrica_dict, modelos = ejecutar_todos_modelos(config, jobs=args.jobs)
 
     csv_path = os.path.join(os.path.dirname(__file__), "resultados_parte6.csv")
     escribir_csv(metrica_dict, csv_path, modelos)
@@ -8,30 +8,32 @@ import time
 try:
     from parte5.columns_solver import Columns as ColumnsBase
 
-    from parte5.columns_solver import tiempo_excedido
+    from parte5.columns_solver import tiempo_excedido, soluciones_mejorantes, mayor_costo_reducido, valores_columnas
 
 except ImportError:
     sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
     from parte5.columns_solver import Columns as ColumnsBase
 
-    from parte5.columns_solver import tiempo_excedido
+    from parte5.columns_solver import tiempo_excedido, soluciones_mejorantes, mayor_costo_reducido, valores_columnas
+from greedy_vectorizado import generar_columnas_greedy, ordenes_diversas
+from parte5.pool_columnas import Columna, PoolColumnas
+from parte5.estabilizacion import EstabilizacionDual
 
-def tiempo_excedido(tiempo_ini, umbral):
-    return time.time() - tiempo_ini > umbral
+from exploracion_paralela import explorar_k_en_paralelo
+from busqueda_local import mejorar_resultado
 
-def construir_mejor_solucion(maestro_relajado, columnas_k, cant_var_inicio, k):
-    pasillos_seleccionados = set()
-    ordenes_seleccionadas = set()
-    valor_obj_real = 0
+# Socios por pasillo (los de mayor capacidad) en el respaldo de columnas de dos pasillos
+PAREJAS_POR_PASILLO = 3
 
+def tiempo_excedido(tiempo_ini, umbral):
+    return time.time() - tiempo_ini > umbral
 
-    for idx, x in enumerate(maestro_relajado.getVars()):
-        val = maestro_relajado.getVal(x)
-        if val > 1e-6:  
-            pasillos_seleccionados.update(columnas_k[idx].get('pasillos', []))
-            for o, sel in enumerate(columnas_k[idx]['ordenes']):
-                if sel:
-                    ordenes_seleccionadas.add(o)
+def construir_mejor_solucion(maestro_relajado, columnas_k, nombres, cant_var_inicio, k, LB):
+    valores = valores_columnas(maestro_relajado, nombres)
+    pasillos_seleccionados, ordenes_seleccionadas, unidades = columnas_k.seleccion(valores, 1e-6)
+    # Las columnas del LP sólo sirven como solución si son k pasillos que llegan a LB
+    if len(pasillos_seleccionados) != k or unidades < LB:
+        return None
     valor_obj_real = maestro_relajado.getObjVal()
 
     cota_dual_real = maestro_relajado.getDualbound()
@@ -51,9 +53,6 @@ def construir_mejor_solucion(maestro_relajado, columnas_k, cant_var_inicio, k):
         "gap_real": gap_real
     }
 
-    print(f"🔹 Mejor solución construida: Total={valor_obj_real:.6f}, "
-          f"Prod/ps={productividad:.6f}, Dual={cota_dual_real:.6f}, Gap={gap_real:.6e}")
-
     return mejor_sol
 
 
@@ -62,149 +61,77 @@ class Columns(ColumnsBase):
         super().__init__(W, S, LB, UB) 
         self.modelos = {}  
         self.n_pasillos = self.A
-        self.columnas_iniciales = []   
+        self.columnas_iniciales = PoolColumnas(self.O)
         self.columnas = {}  
         self.inactive_counter = {}
         self.iteracion_actual = {}
 
-    def inicializar_columnas_iniciales(self, umbral=None):
-            tiempo_ini = time.time()
-            self.columnas_iniciales = []
-
-            W_np = np.array(self.W) 
-            S_np = np.array(self.S)  
-            unidades_o = W_np.sum(axis=1)  
-            ordenes_indexadas = np.argsort(-unidades_o) 
-            
-
-            for a in range(self.A):
-                if umbral and (time.time() - tiempo_ini) > umbral:
-                    break
-
-                columna_generada = False
-
-                cap_restante = S_np[a].copy()
-                sel = np.zeros(self.O, dtype=int)
-                total_unidades = 0
-
-                for o in range(self.O):
-                    if np.all(W_np[o] <= cap_restante) and (total_unidades + unidades_o[o] <= self.UB):
-                        sel[o] = 1
-                        total_unidades += unidades_o[o]
-                        cap_restante -= W_np[o]
+    # El pricing busca columnas de exactamente k pasillos, y cualquier
+    # solución con k pasillos es una de esas columnas: la cota lagrangiana
+    # usa una sola columna de k pasillos
+    def pasillos_por_columna(self, k):
+        return k
 
-                if total_unidades > 0:
-                    self.columnas_iniciales.append({'pasillos':[a], 'ordenes':sel.tolist(), 'unidades':total_unidades})
-                    columna_generada = True
+    def columnas_por_solucion(self, k):
+        return 1
 
-            if len(self.columnas_iniciales) == 0:
-                for a in range(self.A):
-                    for b in range(a + 1, self.A):
-                        if umbral and (time.time() - tiempo_ini) > umbral:
-                            break
-
-                        cap_restante = S_np[a] + S_np[b]
-                        sel = np.zeros(self.O, dtype=int)
-                        total_unidades = 0
-
-                        for o in ordenes_indexadas:
-                            if unidades_o[o] + total_unidades <= self.UB and np.all(W_np[o] <= cap_restante):
-                                sel[o] = 1
-                                total_unidades += unidades_o[o]
-                                cap_restante -= W_np[o]
-
-                        if total_unidades > 0:
-                            self.columnas_iniciales.append({'pasillos':[a,b], 'ordenes':sel.tolist(), 'unidades':total_unidades})
-                            break 
-
-            print(f"✅ {len(self.columnas_iniciales)} columnas iniciales generadas para todos los k posibles")
+    def inicializar_columnas_iniciales(self, umbral=None):
+            tiempo_ini = time.time()
+            self.columnas_iniciales = PoolColumnas(self.O)
+
+            grupos = [[a] for a in range(self.A)]
+            columnas, estadisticas = generar_columnas_greedy(self.W, self.S, self.UB, grupos, ordenes_diversas(self.O, 1), umbral)
+
+            if len(columnas) == 0:
+                # Ningún pasillo solo atiende una orden: se prueban parejas de
+                # cada pasillo con los de mayor capacidad, todas a la vez, y se
+                # queda la primera que sirve para cada pasillo
+                socios = np.argsort(-self.S.totales, kind="stable")[:PAREJAS_POR_PASILLO + 1].tolist()
+                grupos = sorted({tuple(sorted((a, b))) for a in range(self.A) for b in socios if b != a})
+                ordenes_indexadas = np.argsort(-self.W.totales, kind="stable")
+                restante = None if umbral is None else max(0.0, umbral - (time.time() - tiempo_ini))
+                columnas, estadisticas = generar_columnas_greedy(self.W, self.S, self.UB, grupos, [ordenes_indexadas], restante)
+                usados = set()
+                columnas_pares = []
+                for g, ordenes, unidades in columnas:
+                    if grupos[g][0] not in usados:
+                        usados.add(grupos[g][0])
+                        columnas_pares.append((g, ordenes, unidades))
+                columnas = columnas_pares
+
+            for g, ordenes, unidades in columnas:
+                self.columnas_iniciales.agregar(Columna(ordenes, grupos[g], unidades))
+
+            duracion = time.time() - tiempo_ini
+            self.estadisticas_inicializacion.append(dict(estadisticas, columnas=len(self.columnas_iniciales), tiempo=duracion))
+            print(f"✅ {len(self.columnas_iniciales)} columnas iniciales generadas para todos los k posibles "
+                  f"({len(self.columnas_iniciales) / max(duracion, 1e-9):.0f} columnas/s)")
     
-    def construir_modelo_maestro(self, k, umbral):
-        tiempo_ini = time.time()
-
-        modelo = Model(f"RMP_k_{k}")
-        modelo.setParam('display/verblevel', 0)
-        modelo.setParam('limits/time', umbral)
-        x_vars = []
-
-        for idx, col in enumerate(self.columnas[k]):
-            if tiempo_excedido(tiempo_ini, umbral):
-                print("⏱️ Tiempo excedido durante la creación de variables.")
-                return None, None, None, None, None, None
+    def inicializar_columnas_para_k(self, k, umbral=None):
+        # Las columnas iniciales se generan una sola vez, para todos los k
+        self.columnas[k] = self.columnas_iniciales.copia()
 
-            x = modelo.addVar(vtype="B", name=f"x_{idx}")
-            x_vars.append(x)
-
-        restr_card_k = modelo.addCons(
-            quicksum(x_vars[j] * len(self.columnas[k][j].get('pasillos', [])) for j in range(len(x_vars))) == k,
-            name="card_k"
-        )
-
-        restr_ordenes = {}
-        for o in range(self.O):
-            if tiempo_excedido(tiempo_ini, umbral):
-                print("⏱️ Tiempo excedido durante la creación de restricciones de órdenes.")
-                return None, None, None, None, None, None
-
-            cons = modelo.addCons(
-                quicksum(x_vars[j] * self.columnas[k][j]['ordenes'][o] for j in range(len(x_vars))) <= 1,
-                name=f"orden_{o}"
-            )
-            restr_ordenes[o] = cons
-
-        if tiempo_excedido(tiempo_ini, umbral):
-            print("⏱️ Tiempo excedido antes de la restricción de unidades totales.")
-            return None, None, None, None, None, None
-
-        restr_ub = modelo.addCons(
-            quicksum(x_vars[j] * self.columnas[k][j]['unidades'] for j in range(len(x_vars))) <= self.UB,
-            name="restr_total_ub"
-        )
-
-        restr_pasillos = {}
-        for a in range(self.A):
-            if tiempo_excedido(tiempo_ini, umbral):
-                print("⏱️ Tiempo excedido durante la creación de restricciones de pasillos.")
-                return None, None, None, None, None, None
-
-            cons = modelo.addCons(
-                quicksum(
-                    x_vars[j] for j in range(len(x_vars)) if a in self.columnas[k][j].get('pasillos', [])
-                ) <= 1,
-                name=f"pasillo_{a}"
-            )
-            restr_pasillos[a] = cons
-
-        if tiempo_excedido(tiempo_ini, umbral):
-            print("⏱️ Tiempo excedido antes de definir la función objetivo.")
-            return None, None, None, None, None, None
-
-        modelo.setObjective(
-            quicksum(
-                x_vars[j] * sum(
-                    self.W[o][i]
-                    for o in range(self.O) if self.columnas[k][j]['ordenes'][o]
-                    for i in range(self.I)
-                )
-                for j in range(len(x_vars))
-            ),
-            sense="maximize"
-        )
-
-        return modelo, x_vars, restr_card_k, restr_ordenes, restr_ub, restr_pasillos
+    def construir_modelo_maestro(self, k, umbral):
+        # Mismo maestro que la parte 5 (card_k ya cuenta los pasillos de cada
+        # columna), con límite de tiempo
+        resultado = super().construir_modelo_maestro(k, umbral)
+        if resultado[0] is not None:
+            resultado[0].setParam('limits/time', umbral)
+        return resultado
     
 
-    def resolver_subproblema(self, W, S, dual_vals, UB, k, umbral=None):
+    def resolver_subproblema_multiple(self, W, S, dual_vals, UB, k, umbral=None, max_columnas=1):
         tiempo_ini = time.time()
+        self.llamadas_pricing += 1
         O = len(W)
         I = len(W[0])
         A = len(S)
 
         if tiempo_excedido(tiempo_ini, umbral):
             print("⏱️ Tiempo excedido antes de comenzar.")
-            return None
+            return []
 
-        units_o = [sum(W[o][i] for i in range(I)) for o in range(O)]
+        units_o = W.totales.tolist()
 
         modelo = Model("Subproblema_unico")
         modelo.setParam("display/verblevel", 0)
@@ -215,13 +142,18 @@ class Columns(ColumnsBase):
 
         modelo.addCons(quicksum(y[a] for a in range(A)) == k, name="al_menos_un_pasillo")
 
+        ordenes_por_item = W.transpuesta()
+        pasillos_por_item = S.transpuesta()
         for i in range(I):
             if tiempo_excedido(tiempo_ini, umbral):
                 print("⏱️ Tiempo excedido antes de comenzar.")
-                return None
+                return []
+            ordenes_i = list(ordenes_por_item.items(i))
+            if not ordenes_i:
+                continue
             modelo.addCons(
-                quicksum(W[o][i] * z[o] for o in range(O)) <=
-                quicksum(S[a][i] * y[a] for a in range(A)),
+                quicksum(cant * z[o] for o, cant in ordenes_i) <=
+                quicksum(cant * y[a] for a, cant in pasillos_por_item.items(i)),
                 name=f"capacidad_total_item_{i}"
             )
 
@@ -237,32 +169,37 @@ class Columns(ColumnsBase):
 
         modelo.setObjective(expr_cj - expr_Ajy, sense="maximize")
         modelo.optimize()
+        if abs(modelo.getDualbound()) < modelo.infinity():
+            self.costo_reducido_exacto = (dual_vals, modelo.getDualbound())
 
         if modelo.getStatus() != "optimal":
             print("⚠️ Subproblema no óptimo.")
-            return None
+            return []
         
         reduced_cost = modelo.getObjVal()
-        print(f"🔹 Costo reducido subproblema: {reduced_cost:.6f}")
-
-        if reduced_cost <= 1e-6:
-            return None
+        self.mostrar(f"🔹 Costo reducido subproblema: {reduced_cost:.6f}")
 
-        pasillos_seleccionados = [a for a in range(A) if modelo.getVal(y[a]) > 0.5]
-        ordenes = [int(modelo.getVal(z[o]) + 0.5) for o in range(O)]
-        unidades = sum(units_o[o] for o in range(O) if ordenes[o])
+        columnas = []
+        for pasillos, ordenes_sel in soluciones_mejorantes(modelo, y, z, max_columnas):
+            unidades = sum(units_o[o] for o in ordenes_sel)
+            columnas.append(Columna(ordenes_sel, pasillos, unidades))
 
-        return {'pasillos': pasillos_seleccionados, 'ordenes': ordenes, 'unidades': unidades}
+        return columnas
 
 
     def Opt_cantidadPasillosFija(self, k, umbral):
         tiempo_ini = time.time()
         tiempo_inicializacion = 0.3 * umbral
-        self.columnas[k] = self.columnas_iniciales.copy()
+        self.sembrar_columnas_para_k(k, umbral=tiempo_inicializacion)
+        self.estabilizador = EstabilizacionDual(self.alfa_estabilizacion)
+        if self.reusar_columnas:
+            self.estabilizador.centro = self.ultimos_duales
+        self.costo_reducido_exacto = None
 
         mejor_sol_global = None
         mejor_prod_global = -1
         primera_iteracion = True
+        iteracion = 0
 
         while True:
             tiempo_actual = time.time()
@@ -270,23 +207,28 @@ class Columns(ColumnsBase):
             tiempo_restante_total = umbral - tiempo_transcurrido
 
             if tiempo_restante_total <= 0:
-                print("⏳ Tiempo agotado en Opt_cantidadPasillosFija → Fin del bucle.")
+                self.mostrar("⏳ Tiempo agotado en Opt_cantidadPasillosFija → Fin del bucle.")
                 break
 
-            print(f"⌛ Iteración con {len(self.columnas.get(k, []))} columnas")
+            self.mostrar(f"⌛ Iteración con {len(self.columnas.get(k, []))} columnas")
 
+            inicio_construccion = time.time()
             maestro, x_vars, restr_card_k, restr_ordenes, restr_ub, restr_pasillos = self.construir_modelo_maestro(k, tiempo_restante_total)
             if maestro is None:
                 print("No se pudo construir el modelo maestro a tiempo")
                 break
 
+            nombres = [x.name for x in x_vars]
             maestro_relajado = Model(sourceModel=maestro)
             maestro_relajado.setPresolve(SCIP_PARAMSETTING.OFF)
             maestro_relajado.setParam('limits/time', tiempo_restante_total)
             maestro_relajado.disablePropagation()
             for var in maestro_relajado.getVars():
                 maestro_relajado.chgVarType(var, "CONTINUOUS")
+            tiempo_construccion = time.time() - inicio_construccion
+            inicio_lp = time.time()
             maestro_relajado.optimize()
+            tiempo_lp = time.time() - inicio_lp
 
             if maestro_relajado.getStatus() != "optimal":
                 print("⚠️ No se encontró solución. Estado del modelo:", maestro_relajado.getStatus())
@@ -297,24 +239,74 @@ class Columns(ColumnsBase):
                 primera_iteracion = False
 
             valor_objetivo_primal = maestro_relajado.getObjVal()
-            sol_actual = construir_mejor_solucion(maestro_relajado, self.columnas.get(k, []),
-                                                self.cant_var_inicio,k)
+            sol_actual = construir_mejor_solucion(maestro_relajado, self.columnas[k], nombres,
+                                                self.cant_var_inicio, k, self.LB)
 
-            if sol_actual['productividad_por_pasillo'] > mejor_prod_global:
+            if sol_actual and sol_actual['productividad_por_pasillo'] > mejor_prod_global:
                 mejor_prod_global = sol_actual['productividad_por_pasillo']
                 mejor_sol_global = sol_actual
-                print("🎉🎉🎉 Mejor solución actual:", mejor_sol_global)
+                self.mostrar("🎉🎉🎉 Mejor solución actual:", mejor_sol_global)
 
             dual_map = {cons.name: maestro_relajado.getDualSolVal(cons) for cons in maestro_relajado.getConss()}
+            self.ultimos_duales = dual_map
+            cota_lagrangiana = self.cota_lagrangiana(dual_map, k)
+            for sol in (sol_actual, mejor_sol_global):
+                if sol:
+                    sol["cota_lagrangiana"] = cota_lagrangiana
+
+            iteracion += 1
+            registro = {
+                "k": k,
+                "iteracion": iteracion,
+                "maestro": "reconstruido",
+                "columnas": len(self.columnas.get(k, [])),
+                "tiempo_construccion": tiempo_construccion,
+                "tiempo_lp": tiempo_lp,
+                "valor_lp": valor_objetivo_primal,
+                "cota_lagrangiana": cota_lagrangiana,
+                "pricing": None,
+                "columnas_nuevas": 0,
+                "tiempo_pricing": 0.0,
+                "costo_reducido": None,
+                "mal_precios": self.estabilizador.mal_precios
+            }
+            motivo = self.motivo_de_corte(valor_objetivo_primal, k)
+            if motivo:
+                self.registrar_iteracion(registro)
+                self.mostrar(f"✂️ Fin de la generación de columnas para k = {k}: {motivo}")
+                break
             tiempo_restante_total = umbral - (time.time() - tiempo_ini)
-            nueva_col = self.resolver_subproblema(self.W, self.S, dual_map, self.UB, k, tiempo_restante_total)
+            inicio_pricing = time.time()
+            nuevas_cols, _ = self.generar_columnas_estabilizadas(dual_map, k, lambda duales: (
+                self.resolver_subproblema_multiple(
+                    self.W, self.S, duales, self.UB, k, umbral - (time.time() - tiempo_ini),
+                    max_columnas=self.max_columnas_por_iteracion
+                ), "exacto"
+            ))
+
+            cota_lagrangiana = self.cota_lagrangiana(dual_map, k)
+            for sol in (sol_actual, mejor_sol_global):
+                if sol:
+                    sol["cota_lagrangiana"] = cota_lagrangiana
+
+            registro.update({
+                "pricing": "exacto",
+                "columnas_nuevas": len(nuevas_cols),
+                "tiempo_pricing": time.time() - inicio_pricing,
+                "costo_reducido": mayor_costo_reducido(nuevas_cols, dual_map),
+                "cota_lagrangiana": cota_lagrangiana,
+                "mal_precios": self.estabilizador.mal_precios
+            })
+            self.registrar_iteracion(registro)
 
-            if nueva_col is None:
-                print("No se generó columna nueva o ya existe → Fin del bucle.")
+            # El pool descarta las columnas que ya estaban en el maestro
+            agregadas = sum(self.columnas[k].agregar(col) for col in nuevas_cols)
+            self.registrar_columnas(nuevas_cols)
+            if not agregadas:
+                self.mostrar("No se generó columna nueva o ya existe → Fin del bucle.")
                 break
 
-            print("Nueva columna encontrada:", nueva_col)
-            self.columnas.setdefault(k, []).append(nueva_col)
+            self.mostrar(f"Nuevas columnas encontradas: {agregadas}")
 
         return mejor_sol_global
 
@@ -357,18 +349,9 @@ class Columns(ColumnsBase):
         tiempo_total = time.time() - tiempo_ini
 
         if status in ["optimal", "feasible"] and modelo.getNSols() > 0:
-            valor_obj_real = 0
-            pasillos_seleccionados = set()
-            ordenes_seleccionadas = set()
-
-            for idx, x in enumerate(x_vars):
-                val = x.getLPSol()
-                if val and val > 1e-6:
-                    pasillos_seleccionados.update(self.columnas[k][idx].get('pasillos', []))
-                    for o, sel in enumerate(self.columnas[k][idx]['ordenes']):
-                        if sel:
-                            ordenes_seleccionadas.add(o)
-                    valor_obj_real += self.columnas[k][idx]['unidades']
+            pasillos_seleccionados, ordenes_seleccionadas, valor_obj_real = self.columnas[k].seleccion(
+                [modelo.getVal(x) for x in x_vars], 1e-6
+            )
             
             mejor_sol = {
                 "valor_objetivo":  valor_obj_real / k if k > 0 else 0,
@@ -395,8 +378,8 @@ class Columns(ColumnsBase):
 
 
 
-    def Opt_ExplorarCantidadPasillos(self, umbral):
-        self.columnas = {}
+    def explorar_cantidad_pasillos(self, umbral):
+        self.reiniciar_columnas()
         best_sol = None
         tiempo_ini = time.time()
 
@@ -404,9 +387,28 @@ class Columns(ColumnsBase):
         tiempo_inicializacion = umbral * ratio_inicial
         tiempo_final_fijo = 60
 
-        lista_k, lista_umbrales = self.Rankear(umbral)
+        lista_k, lista_umbrales = self.podar_lista_k(*self.Rankear(umbral))
+        print(f"✂️ Poda por cotas: {self.cotas_k.resumen()}")
         self.inicializar_columnas_iniciales(tiempo_inicializacion)
 
+        if self.procesos_k > 1 and len(lista_k) > 1:
+            tiempo_exploracion = (umbral * 0.9) - tiempo_final_fijo - (time.time() - tiempo_ini)
+            best_sol, columnas_por_k = explorar_k_en_paralelo(
+                self, lista_k, max(0.0, tiempo_exploracion), self.procesos_k, lista_umbrales,
+                clave_valor="productividad_por_pasillo",
+                atributos=dict(self.configuracion(), columnas_iniciales=self.columnas_iniciales),
+                cotas=self.cotas_k
+            )
+            self.columnas.update(columnas_por_k)
+            lista_k, lista_umbrales = [], []
+
+        if self.planificador_adaptativo and lista_k:
+            best_sol = self.explorar_con_planificador(
+                lista_k, lista_umbrales, (umbral * 0.9) - tiempo_final_fijo - (time.time() - tiempo_ini),
+                clave_valor="productividad_por_pasillo"
+            )
+            lista_k, lista_umbrales = [], []
+
         for k, tiempo_k_estimado in zip(lista_k, lista_umbrales):
             tiempo_actual = time.time()
             tiempo_transcurrido = tiempo_actual - tiempo_ini
@@ -416,8 +418,14 @@ class Columns(ColumnsBase):
                 print("⏳ Sin tiempo restante para seguir evaluando k.")
                 break
 
+            best_prod = best_sol.get("productividad_por_pasillo", -float('inf')) if best_sol else -float('inf')
+            if not self.podar_lista_k([k], [tiempo_k_estimado], best_prod)[0]:
+                print(f"✂️ k={k} descartado: cota {self.cotas_k.cota(k):.4f} <= {best_prod:.4f}")
+                continue
+
             tiempo_k = min(tiempo_k_estimado, tiempo_restante_total)
-            print(f"Evaluando k={k} con tiempo asignado {tiempo_k:.2f} segundos")
+            self.mostrar(f"Evaluando k={k} con tiempo asignado {tiempo_k:.2f} segundos")
+            self.mejor_valor_conocido = best_prod
 
             sol = self.Opt_cantidadPasillosFija(k, tiempo_k)
 
@@ -428,14 +436,19 @@ class Columns(ColumnsBase):
                     best_sol = sol
 
         if best_sol:
-            print("✅ Mejor solución global encontrada:", best_sol)
+            self.mostrar("✅ Mejor solución global encontrada:", best_sol)
 
             self.pasillos_fijos = best_sol["pasillos_seleccionados"]
             resultado_final = self.Opt_PasillosFijos(tiempo_final_fijo)
+            tiempo_busqueda = min(self.tiempo_busqueda_local, umbral - (time.time() - tiempo_ini))
+            resultado_final = mejorar_resultado(self.W, self.S, self.LB, self.UB, resultado_final, tiempo_busqueda)
             resultado_final["tiempo_total"] = round(time.time() - tiempo_ini, 2)
             resultado_final["variables"] = best_sol["variables"]
+            resultado_final["cota_lagrangiana"] = best_sol.get("cota_lagrangiana")
+            resultado_final["llamadas_pricing"] = self.llamadas_pricing
+            resultado_final.update(self.resumen_telemetria())
 
-            print("✅ Resultado final con pasillos fijos:", resultado_final)
+            self.mostrar("✅ Resultado final con pasillos fijos:", resultado_final)
             return resultado_final
 
         print("⚠️ No se encontró ninguna solución durante la exploración.")
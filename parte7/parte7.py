@@ -1,3 +1,4 @@
+import argparse
 import os
 import sys
 sys.path.append(os.path.dirname(os.path.dirname(__file__)))
@@ -5,14 +6,14 @@ from script import leer_config, ejecutar_todos_modelos, escribir_csv
 
 
 def main():
-    if len(sys.argv) < 2:
-        print("Uso: python parte7.py archivo.cfg")
-        cfg_path = "parte7/experimento.cfg"
-    else:
-        cfg_path = sys.argv[1]
+    parser = argparse.ArgumentParser(description="Experimentos de la parte 7")
+    parser.add_argument("cfg", nargs="?", default="parte7/experimento.cfg", help="archivo .cfg del experimento")
+    parser.add_argument("--jobs", type=int, default=None,
+                        help="cantidad de corridas (modelo, instancia) en paralelo; por defecto `jobs` del .cfg o 1")
+    args = parser.parse_args()
 
-    config = leer_config(cfg_path)
-    metrica_dict, modelos = ejecutar_todos_modelos(config)
+    config = leer_config(args.cfg)
+    metrica_dict, modelos = ejecutar_todos_modelos(config, jobs=args.jobs)
 
     csv_path = os.path.join(os.path.dirname(__file__), "resultados_parte7.csv")
     escribir_csv(metrica_dict, csv_path, modelos)
@@ -0,0 +1,119 @@
+import math
+import time
+
+from poda_k import TOLERANCIA_PODA
+
+# Peso del bono de exploración (UCB) frente al potencial y al progreso de cada k
+PESO_EXPLORACION = 0.5
+# Un turno que termina antes de usar esta fracción de su tiempo se da por
+# cerrado: el solver terminó ese k (o lo cortó por cota) y revisitarlo no suma
+FRACCION_CIERRE = 0.8
+# Turnos seguidos sin progreso antes de retirar un k
+TURNOS_SIN_PROGRESO = 2
+
+
+class PlanificadorK:
+    # Reparte el tiempo de la exploración entre los k como un bandido. En cada
+    # turno elige el k vivo de mayor puntaje
+    #   potencial (cota del k sobre el mejor valor, normalizada entre los vivos)
+    #   + progreso de su último turno (fracción del gap del k que cerró)
+    #   + PESO_EXPLORACION * sqrt(ln(turnos + 1) / (visitas del k + 1))
+    # Un k sin visitar cuenta con progreso 1, así que la primera pasada sigue
+    # el orden de las cotas. Se retira un k cuando su cota no supera al mejor
+    # valor, cuando su turno terminó antes de tiempo o tras
+    # TURNOS_SIN_PROGRESO turnos sin progreso. La primera visita recibe una
+    # parte pareja del tiempo restante entre los vivos (hasta el tope del k,
+    # si lo hay) y cada revisita el doble de la anterior; el solver retoma el
+    # k desde lo que guardó de él (incumbente, columnas).
+    def __init__(self, lista_k, cota, presupuesto, topes=None, tiempo_minimo=1.0):
+        self.inicio = time.time()
+        self.presupuesto = presupuesto
+        self.tiempo_minimo = tiempo_minimo
+        self.orden = list(lista_k)
+        self.posicion = {k: i for i, k in enumerate(self.orden)}
+        self.cota = {k: cota(k) for k in self.orden}
+        self.tope = dict(zip(self.orden, topes)) if topes is not None else {}
+        self.valor = {}
+        self.visitas = dict.fromkeys(self.orden, 0)
+        self.tiempo = {}
+        self.progreso = dict.fromkeys(self.orden, 1.0)
+        self.sin_progreso = dict.fromkeys(self.orden, 0)
+        self.retirados = {}
+        self.turnos = 0
+        self.mejor_valor = -float("inf")
+
+    def restante(self):
+        return self.presupuesto - (time.time() - self.inicio)
+
+    def vivos(self):
+        vivos = []
+        for k in self.orden:
+            if k in self.retirados:
+                continue
+            if self.cota[k] <= self.mejor_valor + TOLERANCIA_PODA:
+                self.retirados[k] = "cota"
+                continue
+            vivos.append(k)
+        return vivos
+
+    def gap(self, k):
+        return self.cota[k] - max(self.mejor_valor, self.valor.get(k, -float("inf")))
+
+    def siguiente(self, mejor_valor=-float("inf")):
+        # (k, tiempo) del próximo turno, o None si no queda tiempo ni k vivos
+        self.mejor_valor = max(self.mejor_valor, mejor_valor)
+        restante = self.restante()
+        vivos = self.vivos()
+        if restante <= 0 or not vivos:
+            return None
+
+        base = self.mejor_valor if self.mejor_valor > -float("inf") else 0.0
+        escala = max(self.cota[k] for k in vivos) - base
+        log_turnos = math.log(self.turnos + 1)
+
+        def puntaje(k):
+            potencial = (self.cota[k] - base) / escala if escala > 0 else 0.0
+            bono = PESO_EXPLORACION * math.sqrt(log_turnos / (self.visitas[k] + 1))
+            return potencial + self.progreso[k] + bono, -self.posicion[k]
+
+        k = max(vivos, key=puntaje)
+        if self.visitas[k] == 0:
+            tiempo = max(self.tiempo_minimo, restante / len(vivos))
+            if k in self.tope:
+                tiempo = min(tiempo, self.tope[k])
+        else:
+            tiempo = 2 * self.tiempo[k]
+        return k, min(max(self.tiempo_minimo, tiempo), restante)
+
+    def registrar(self, k, tiempo, duracion, valor=None, cota=None):
+        # Resultado del turno de k: `valor` y `cota` en unidades / pasillos
+        # (None si el turno no los dio)
+        gap_antes = self.gap(k)
+        if valor is not None:
+            self.valor[k] = max(self.valor.get(k, -float("inf")), valor)
+        if cota is not None:
+            self.cota[k] = min(self.cota[k], cota)
+        gap_despues = self.gap(k)
+
+        self.turnos += 1
+        self.visitas[k] += 1
+        self.tiempo[k] = tiempo
+        if gap_antes > 0 and gap_antes < float("inf"):
+            self.progreso[k] = min(1.0, max(0.0, (gap_antes - gap_despues) / gap_antes))
+        else:
+            self.progreso[k] = 0.0
+        self.sin_progreso[k] = 0 if self.progreso[k] > 0 else self.sin_progreso[k] + 1
+
+        if duracion < FRACCION_CIERRE * tiempo:
+            self.retirados[k] = "cerrado"
+        elif self.sin_progreso[k] >= TURNOS_SIN_PROGRESO:
+            self.retirados[k] = "estancado"
+
+    def resumen(self):
+        motivos = {}
+        for motivo in self.retirados.values():
+            motivos[motivo] = motivos.get(motivo, 0) + 1
+        visitados = sum(1 for v in self.visitas.values() if v)
+        revisitas = sum(v - 1 for v in self.visitas.values() if v > 1)
+        retirados = ", ".join(f"{n} por {motivo}" for motivo, n in sorted(motivos.items()))
+        return f"{self.turnos} turnos sobre {visitados} valores de k ({revisitas} revisitas); retirados: {retirados or 'ninguno'}"
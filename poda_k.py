@@ -0,0 +1,76 @@
+import numpy as np
+
+# Margen para no descartar un k cuya cota empata con el incumbente
+TOLERANCIA_PODA = 1e-9
+
+
+def capacidad_util_por_pasillo(W, S):
+    # Existencias de cada pasillo recortadas a la demanda total de cada ítem
+    demanda = W.transpuesta().totales
+    filas = np.repeat(np.arange(S.n_filas), np.diff(S.indptr))
+    utiles = np.minimum(S.datos, demanda[S.indices])
+    return np.bincount(filas, weights=utiles, minlength=S.n_filas).astype(np.int64)
+
+
+def unidades_maximas_por_k(W, S):
+    # Cota de las unidades que pueden cubrir k pasillos, para todos los k.
+    # Por ítem: T[k] = suma sobre ítems de min(demanda del ítem, suma de sus
+    # k mayores existencias). Se calcula ordenando los no nulos de S por
+    # ítem: la existencia de rango r (0 = la mayor) aporta a todos los k > r.
+    demanda = W.transpuesta().totales
+    St = S.transpuesta()
+
+    items = np.repeat(np.arange(St.n_filas), np.diff(St.indptr))
+    cantidades = St.datos.astype(np.int64)
+    orden = np.lexsort((-cantidades, items))
+    items, cantidades = items[orden], cantidades[orden]
+
+    inicio_fila = St.indptr[:-1][items]
+    rango = np.arange(len(items)) - inicio_fila
+
+    # Acumulado por ítem, recortado a la demanda; el aporte de cada no nulo es
+    # el incremento del acumulado recortado respecto del rango anterior.
+    acumulado = np.cumsum(cantidades)
+    base = np.concatenate(([0], acumulado))[inicio_fila]
+    acumulado_item = acumulado - base
+    aporte = np.minimum(acumulado_item, demanda[items]) - np.minimum(acumulado_item - cantidades, demanda[items])
+
+    T = np.zeros(S.n_filas + 1, dtype=np.int64)
+    if len(rango):
+        T[1:] = np.cumsum(np.bincount(rango, weights=aporte, minlength=S.n_filas)[:S.n_filas]).astype(np.int64)
+
+    # También vale la suma de las k mayores capacidades útiles por pasillo
+    # (existencias recortadas a la demanda de cada ítem). Ambas son cóncavas
+    # en k, así que el mínimo también.
+    T[1:] = np.minimum(T[1:], np.cumsum(np.sort(capacidad_util_por_pasillo(W, S))[::-1]))
+    return T
+
+
+class CotasK:
+    # Cota superior del cociente unidades / pasillos para cada k:
+    # cota(k) = min(UB, T[k]) / k. T es cóncava, así que la cota no crece con
+    # k; un k con T[k] < LB no tiene ninguna solución factible.
+    def __init__(self, W, S, LB, UB):
+        self.LB = LB
+        self.UB = UB
+        self.unidades = unidades_maximas_por_k(W, S)
+        self.n_pasillos = len(self.unidades) - 1
+
+    def es_factible(self, k):
+        return 1 <= k <= self.n_pasillos and self.unidades[k] >= self.LB
+
+    def cota(self, k):
+        if not self.es_factible(k):
+            return -float("inf")
+        return min(self.UB, int(self.unidades[k])) / k
+
+    def podar(self, lista_k, mejor_valor=-float("inf")):
+        # Mantiene el orden de lista_k
+        return [k for k in lista_k if self.cota(k) > mejor_valor + TOLERANCIA_PODA]
+
+    def ordenar(self, lista_k):
+        return sorted(lista_k, key=self.cota, reverse=True)
+
+    def resumen(self, mejor_valor=-float("inf")):
+        vivos = self.podar(range(1, self.n_pasillos + 1), mejor_valor)
+        return f"{len(vivos)}/{self.n_pasillos} valores de k con cota > {mejor_valor:.4f}"
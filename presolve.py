@@ -0,0 +1,116 @@
+import numpy as np
+
+from cargar_input import MatrizDispersa, asegurar_dispersa
+
+
+def submatriz(M, filas, columnas):
+    # Filas y columnas dadas (en ese orden) de una MatrizDispersa
+    posicion = np.full(M.n_columnas, -1, dtype=np.int64)
+    posicion[columnas] = np.arange(len(columnas))
+
+    largos = M.indptr[filas + 1] - M.indptr[filas]
+    indptr_filas = np.concatenate(([0], np.cumsum(largos)))
+    desplazamiento = np.arange(indptr_filas[-1]) - np.repeat(indptr_filas[:-1], largos)
+    origen = np.repeat(M.indptr[filas], largos) + desplazamiento
+
+    nuevas_columnas = posicion[M.indices[origen]]
+    vivo = nuevas_columnas >= 0
+    fila_de = np.repeat(np.arange(len(filas)), largos)[vivo]
+
+    indptr = np.zeros(len(filas) + 1, dtype=np.int64)
+    np.cumsum(np.bincount(fila_de, minlength=len(filas)), out=indptr[1:])
+    return MatrizDispersa(len(filas), len(columnas), indptr,
+                          nuevas_columnas[vivo].astype(np.int32), M.datos[origen][vivo])
+
+
+def k_minimo_por_orden(W, S):
+    # Menor cantidad de pasillos con la que cada orden puede ser atendida:
+    # para cada ítem de la orden, cuántas de las mayores existencias del ítem
+    # hacen falta para cubrir lo pedido; la orden necesita el máximo de eso.
+    # Una orden sin stock suficiente en todo el depósito queda en A + 1.
+    St = S.transpuesta()
+    items = np.repeat(np.arange(St.n_filas), np.diff(St.indptr))
+    cantidades = St.datos.astype(np.int64)
+    orden = np.lexsort((-cantidades, items))
+    items, cantidades = items[orden], cantidades[orden]
+
+    acumulado = np.cumsum(cantidades)
+    inicio = St.indptr[:-1]
+    base = np.concatenate(([0], acumulado))
+    acumulado_item = acumulado - base[inicio[items]]
+
+    # Clave creciente en todo el arreglo: ítem primero, acumulado después
+    escala = int(acumulado_item.max()) + 2 if len(acumulado_item) else 2
+    claves = items * escala + acumulado_item
+
+    filas_W = np.repeat(np.arange(W.n_filas), np.diff(W.indptr))
+    items_W = W.indices.astype(np.int64)
+    pedidos = np.minimum(W.datos.astype(np.int64), escala - 1)
+    posiciones = np.searchsorted(claves, items_W * escala + pedidos, side="left")
+    fin_item = St.indptr[items_W + 1]
+    necesarios = np.where(posiciones < fin_item, posiciones - St.indptr[items_W] + 1, S.n_filas + 1)
+
+    k_minimo = np.zeros(W.n_filas, dtype=np.int64)
+    np.maximum.at(k_minimo, filas_W, necesarios)
+    return k_minimo
+
+
+class InstanciaReducida:
+    # Instancia sin órdenes imposibles, ítems que nadie pide ni pasillos sin
+    # nada útil, con los índices originales de cada fila/columna que queda.
+    def __init__(self, W, S, LB, UB, ordenes, items, pasillos, k_minimo):
+        self.W = W
+        self.S = S
+        self.LB = LB
+        self.UB = UB
+        self.ordenes = ordenes
+        self.items = items
+        self.pasillos = pasillos
+        self.k_minimo = k_minimo
+
+    def ordenes_para_k(self, k):
+        # Órdenes (índices reducidos) que pueden aparecer en una ola de k pasillos
+        return np.flatnonzero(self.k_minimo <= k)
+
+    def traducir(self, resultado):
+        if not resultado:
+            return resultado
+        traducido = dict(resultado)
+        for clave, mapa in (("ordenes_seleccionadas", self.ordenes), ("pasillos_seleccionados", self.pasillos)):
+            if clave in resultado and resultado[clave] is not None:
+                traducido[clave] = type(resultado[clave])(int(mapa[j]) for j in resultado[clave])
+        return traducido
+
+    def resumen(self, W_original, S_original):
+        return (f"órdenes {W_original.n_filas}→{self.W.n_filas}, "
+                f"ítems {W_original.n_columnas}→{self.W.n_columnas}, "
+                f"pasillos {S_original.n_filas}→{self.S.n_filas}")
+
+
+def presolve(W, S, LB, UB):
+    W = asegurar_dispersa(W)
+    S = asegurar_dispersa(S)
+
+    # Órdenes: vacías, con más unidades que UB o que piden más de algún ítem
+    # de lo que hay en todo el depósito
+    stock = S.transpuesta().totales
+    k_minimo = k_minimo_por_orden(W, S)
+    ordenes = np.flatnonzero((W.totales > 0) & (W.totales <= UB) & (k_minimo <= S.n_filas))
+
+    # Ítems pedidos por alguna orden que queda
+    vivas = np.zeros(W.n_filas, dtype=bool)
+    vivas[ordenes] = True
+    pedidos = np.zeros(W.n_columnas, dtype=bool)
+    pedidos[W.indices[vivas[np.repeat(np.arange(W.n_filas), np.diff(W.indptr))]]] = True
+    items = np.flatnonzero(pedidos & (stock > 0))
+
+    # Pasillos con existencias de algún ítem que queda
+    utiles = np.zeros(S.n_filas, dtype=bool)
+    filas_S = np.repeat(np.arange(S.n_filas), np.diff(S.indptr))
+    utiles[filas_S[pedidos[S.indices]]] = True
+    pasillos = np.flatnonzero(utiles)
+
+    W_reducida = submatriz(W, ordenes, items)
+    S_reducida = submatriz(S, pasillos, items)
+    return InstanciaReducida(W_reducida, S_reducida, LB, UB, ordenes, items, pasillos,
+                             k_minimo_por_orden(W_reducida, S_reducida))
@@ -4,8 +4,12 @@ import glob
 import time
 import importlib.util
 import csv
+import re
+import multiprocessing
+from multiprocessing.connection import wait
 
 from cargar_input import leer_input
+from presolve import presolve
 
 def leer_config(cfg_path):
     config = {}
@@ -17,23 +21,153 @@ def leer_config(cfg_path):
     return config
 
 def cargar_modulo(path):
-    spec = importlib.util.spec_from_file_location("modulo_modelo", path)
+    # Nombre único por archivo y registrado en sys.modules, para que las clases
+    # del modelo puedan ubicarse desde otros procesos. Se carga una sola vez.
+    nombre = "modulo_" + re.sub(r"\W", "_", os.path.splitext(os.path.abspath(path))[0])
+    if nombre in sys.modules:
+        return sys.modules[nombre]
+    spec = importlib.util.spec_from_file_location(nombre, path)
     mod = importlib.util.module_from_spec(spec)
+    sys.modules[nombre] = mod
     spec.loader.exec_module(mod)
     return mod
 
-def ejecutar_modelo(modulo, W, S, LB, UB, umbral):
+# Claves del .cfg que se copian como atributos del solver (Columns, o el que
+# arma `resolver`) si lo tiene, con la conversión desde el texto del .cfg
+PARAMETROS_SOLVER = {
+    "estabilizacion": lambda v: v != '0',
+    "alfa_estabilizacion": float,
+    "tolerancia_gap": float,
+    "reusar_columnas": lambda v: v != '0',
+    "tiempo_busqueda_local": float,
+    "planificador_adaptativo": lambda v: v != '0',
+    "archivo_telemetria": str,
+    "verbose": lambda v: v != '0',
+}
+
+def parametros_solver(config):
+    return {clave: convertir(config[clave]) for clave, convertir in PARAMETROS_SOLVER.items() if clave in config}
+
+def ejecutar_modelo(modulo, W, S, LB, UB, umbral, parametros=None):
     if hasattr(modulo, "Columns"):
         ColumnsClass = getattr(modulo, "Columns")
         solver = ColumnsClass(W, S, LB, UB)
+        for nombre, valor in (parametros or {}).items():
+            if hasattr(solver, nombre):
+                setattr(solver, nombre, valor)
         return solver.Opt_ExplorarCantidadPasillos(umbral)
     elif hasattr(modulo, "resolver"):
-        return modulo.resolver(W, S, LB, UB, umbral)
+        return modulo.resolver(W, S, LB, UB, umbral, parametros)
     else:
         print("❌ Módulo sin interfaz conocida (Columns o resolver)")
         return None
 
-def ejecutar_todos_modelos(config):
+# Margen sobre el threshold antes de matar una corrida en modo --jobs
+GRACIA_KILL = 0.05
+GRACIA_KILL_MIN = 5
+
+
+def ejecutar_corrida(path_modelo, input_file, umbral, usar_cache, usar_presolve=True, parametros=None):
+    modulo = cargar_modulo(path_modelo)
+    W, S, LB, UB = leer_input(input_file, usar_cache=usar_cache)
+
+    start_time = time.time()
+    reduccion = None
+    if usar_presolve:
+        reduccion = presolve(W, S, LB, UB)
+        print(f"  Presolve: {reduccion.resumen(W, S)}")
+        W, S = reduccion.W, reduccion.S
+    resultado = ejecutar_modelo(modulo, W, S, LB, UB, umbral, parametros)
+    elapsed = time.time() - start_time
+
+    if resultado is None:
+        resultado = {}
+    elif reduccion is not None:
+        resultado = reduccion.traducir(resultado)
+    resultado['tiempo_total'] = round(elapsed, 2)
+    return resultado
+
+def guardar_salida(out_dir, nombre_archivo, resultado):
+    nombre_archivo = nombre_archivo.split('.')[0]
+    out_file = os.path.join(out_dir, f"{nombre_archivo}.out")
+
+    with open(out_file, 'w') as f:
+        f.write(f"Mejor valor objetivo: {resultado.get('valor_objetivo', 0)}\n")
+
+        f.write("Ordenes seleccionadas:\n")
+        ordenes = " ".join(str(o) for o in sorted(resultado.get('ordenes_seleccionadas', [])))
+        f.write(f"{ordenes}\n")
+
+        f.write("Pasillos seleccionados:\n")
+        pasillos = " ".join(str(p) for p in sorted(resultado.get('pasillos_seleccionados', [])))
+        f.write(f"{pasillos}\n")
+
+def _trabajador(conexion, path_modelo, input_file, umbral, usar_cache, usar_presolve, parametros, log_path):
+    # Cada corrida escribe su salida en un .log propio para no mezclar los prints
+    with open(log_path, 'w', buffering=1) as log:
+        sys.stdout = sys.stderr = log
+        try:
+            resultado = ejecutar_corrida(path_modelo, input_file, umbral, usar_cache, usar_presolve, parametros)
+        except Exception as e:
+            print(f"❌ Error: {e!r}")
+            resultado = {'error': repr(e)}
+    conexion.send(resultado)
+    conexion.close()
+
+def ejecutar_en_paralelo(corridas, umbral, usar_cache, usar_presolve, jobs, parametros=None):
+    # Corre los pares (modelo, instancia) en hasta `jobs` procesos. Cada corrida
+    # se mata si pasa el threshold más un margen; su resultado queda vacío.
+    contexto = multiprocessing.get_context()
+    limite = umbral + max(GRACIA_KILL_MIN, umbral * GRACIA_KILL)
+    pendientes = list(corridas)
+    activas = {}
+    resultados = {}
+
+    while pendientes or activas:
+        while pendientes and len(activas) < jobs:
+            modelo, nombre_archivo, path_modelo, input_file, out_dir = pendientes.pop(0)
+            log_path = os.path.join(out_dir, f"{nombre_archivo.split('.')[0]}.log")
+            receptor, emisor = contexto.Pipe(duplex=False)
+            proceso = contexto.Process(target=_trabajador,
+                                       args=(emisor, path_modelo, input_file, umbral, usar_cache, usar_presolve, parametros, log_path))
+            proceso.start()
+            emisor.close()
+            activas[receptor] = (proceso, modelo, nombre_archivo, time.time())
+            print(f"  ▶️ {modelo} - {nombre_archivo} (pid {proceso.pid})")
+
+        ahora = time.time()
+        espera = min(inicio + limite for _, _, _, inicio in activas.values()) - ahora
+        listas = wait(list(activas), timeout=max(0.0, espera))
+
+        for receptor in list(activas):
+            proceso, modelo, nombre_archivo, inicio = activas[receptor]
+            elapsed = time.time() - inicio
+            if receptor in listas:
+                try:
+                    resultado = receptor.recv()
+                except EOFError:
+                    print(f"⚠️ {modelo} - {nombre_archivo} terminó sin resultado (código {proceso.exitcode})")
+                    resultado = {'tiempo_total': round(elapsed, 2)}
+            elif elapsed >= limite:
+                print(f"⏱️ {modelo} - {nombre_archivo} superó {limite:.0f}s, se corta")
+                proceso.terminate()
+                proceso.join(2)
+                if proceso.is_alive():
+                    proceso.kill()
+                resultado = {'tiempo_total': round(elapsed, 2), 'cortado': True}
+            else:
+                continue
+
+            proceso.join()
+            receptor.close()
+            del activas[receptor]
+            resultados[(modelo, nombre_archivo)] = resultado
+            if 'valor_objetivo' in resultado:
+                print(f"  ✅ {modelo} - {nombre_archivo} en {elapsed:.1f}s → {resultado['valor_objetivo']}")
+
+    return resultados
+
+def ejecutar_todos_modelos(config, jobs=None):
     input_base_path = os.path.abspath(config['inPath'])
     threshold = float(config.get('threshold', 10))  
 
@@ -43,6 +177,11 @@ def ejecutar_todos_modelos(config):
 
     datasets = config.get('datasets', 'A').split(',')
     max_files_per_dataset = int(config.get('max_files_per_dataset', 4))
+    usar_cache = config.get('cache', '1') != '0'
+    usar_presolve = config.get('presolve', '1') != '0'
+    parametros = parametros_solver(config)
+    if jobs is None:
+        jobs = int(config.get('jobs', 1))
 
     modelos = []
     model_paths = {}
@@ -64,6 +203,7 @@ def ejecutar_todos_modelos(config):
     print(f"Datasets a procesar: {datasets}")
     print(f"Máximo archivos por dataset: {max_files_per_dataset}")
 
+    corridas = []
     for dataset in datasets:
         dataset_path = os.path.join(input_base_path, dataset)
         if not os.path.isdir(dataset_path):
@@ -74,43 +214,31 @@ def ejecutar_todos_modelos(config):
         print(f"\nProcesando dataset {dataset}, archivos: {[os.path.basename(f) for f in input_files]}")
 
         for modelo in modelos:
-            print(f"\n➡️ Ejecutando {modelo} ...")
-            modulo = cargar_modulo(model_paths[modelo])
             out_dir = out_paths.get(modelo, os.path.join(base_dir, "output", modelo))
             os.makedirs(out_dir, exist_ok=True)
 
             for input_file in input_files:
                 nombre_archivo = f"{dataset}_{os.path.basename(input_file)}"
-                print(f"  Procesando {nombre_archivo} ...")
-                W, S, LB, UB = leer_input(input_file)
+                corridas.append((modelo, nombre_archivo, model_paths[modelo], input_file, out_dir))
 
-                start_time = time.time()
-                resultado = ejecutar_modelo(modulo, W, S, LB, UB, threshold)
-                elapsed = time.time() - start_time
-
-                if resultado is None:
-                    print(f"⚠️ Resultado None para {modelo} - {nombre_archivo}, asignando dict vacío")
-                    resultado = {}
-
-                resultado['tiempo_total'] = round(elapsed, 2)
-
-                if nombre_archivo not in metrica_dict:
-                    metrica_dict[nombre_archivo] = {}
-                metrica_dict[nombre_archivo][modelo] = resultado
-
-                nombre_archivo = nombre_archivo.split('.')[0]
-                out_file = os.path.join(out_dir, f"{nombre_archivo}.out")
-
-                with open(out_file, 'w') as f:
-                    f.write(f"Mejor valor objetivo: {resultado['valor_objetivo']}\n")
+    if jobs > 1:
+        print(f"\n➡️ Ejecutando {len(corridas)} corridas en {jobs} procesos ...")
+        resultados = ejecutar_en_paralelo(corridas, threshold, usar_cache, usar_presolve, jobs, parametros)
+    else:
+        resultados = {}
+        for modelo, nombre_archivo, path_modelo, input_file, out_dir in corridas:
+            print(f"\n➡️ Ejecutando {modelo} - {nombre_archivo} ...")
+            resultados[(modelo, nombre_archivo)] = ejecutar_corrida(path_modelo, input_file, threshold, usar_cache, usar_presolve, parametros)
 
-                    f.write("Ordenes seleccionadas:\n")
-                    ordenes = " ".join(str(o) for o in sorted(resultado.get('ordenes_seleccionadas', [])))
-                    f.write(f"{ordenes}\n")
+    for modelo, nombre_archivo, _, _, out_dir in corridas:
+        resultado = resultados.get((modelo, nombre_archivo), {})
+        if 'valor_objetivo' not in resultado:
+            print(f"⚠️ Resultado vacío para {modelo} - {nombre_archivo}")
 
-                    f.write("Pasillos seleccionados:\n")
-                    pasillos = " ".join(str(p) for p in sorted(resultado.get('pasillos_seleccionados', [])))
-                    f.write(f"{pasillos}\n")
+        if nombre_archivo not in metrica_dict:
+            metrica_dict[nombre_archivo] = {}
+        metrica_dict[nombre_archivo][modelo] = resultado
+        guardar_salida(out_dir, nombre_archivo, resultado)
 
     return metrica_dict, modelos
 
@@ -120,6 +248,15 @@ def escribir_csv(metrica_dict, csv_path, modelos):
         ("# variables inicial", 'variables'),
         ("# variables en últ. maestro", 'variables_final'),
         ("Mejor objetivo", 'valor_objetivo'),
+        ("Cota dual", 'cota_dual'),
+        ("Cota lagrangiana", 'cota_lagrangiana'),
+        ("Llamadas a pricing", 'llamadas_pricing'),
+        ("k cortados por cota dual", 'k_cortados'),
+        ("Tiempo recuperado", 'tiempo_recuperado'),
+        ("Iteraciones de generación de columnas", 'iteraciones'),
+        ("Tiempo construcción del maestro", 'tiempo_construccion'),
+        ("Tiempo LP del maestro", 'tiempo_lp'),
+        ("Tiempo pricing", 'tiempo_pricing'),
         ("Tiempo total", 'tiempo_total'),
     ]
 
@@ -0,0 +1,45 @@
+import json
+from collections import deque
+
+# Registros que se guardan en memoria (los más viejos se descartan)
+CAPACIDAD_TELEMETRIA = 10000
+# Campos de tiempo que suma el resumen
+CAMPOS_TIEMPO = ("tiempo_construccion", "tiempo_lp", "tiempo_pricing")
+
+
+class Telemetria:
+    # Un registro (dict) por iteración de la generación de columnas: los
+    # últimos `capacidad` quedan en memoria y, con `archivo`, cada uno se
+    # agrega como una línea JSON. Con `imprimir` también se muestran.
+    def __init__(self, capacidad=CAPACIDAD_TELEMETRIA):
+        self.registros = deque(maxlen=capacidad)
+        self.archivo = None
+        self.imprimir = False
+        self.totales = dict.fromkeys(CAMPOS_TIEMPO, 0.0)
+        self.iteraciones = 0
+        self._salida = None
+
+    def registrar(self, registro):
+        self.registros.append(registro)
+        self.iteraciones += 1
+        for campo in CAMPOS_TIEMPO:
+            self.totales[campo] += registro.get(campo) or 0.0
+        if self.archivo:
+            if self._salida is None or self._salida.name != self.archivo:
+                self.cerrar()
+                # Por líneas: cada registro queda en el archivo aunque la corrida se corte
+                self._salida = open(self.archivo, "a", encoding="utf-8", buffering=1)
+            self._salida.write(json.dumps(registro) + "\n")
+        if self.imprimir:
+            print(" ".join(f"{campo}={valor:.4g}" if isinstance(valor, float) else f"{campo}={valor}"
+                           for campo, valor in registro.items()))
+
+    def cerrar(self):
+        if self._salida is not None:
+            self._salida.close()
+            self._salida = None
+
+    def resumen(self):
+        # Tiempo total por fase y cantidad de iteraciones (incluidas las que
+        # ya no están en memoria)
+        return dict(self.totales, iteraciones=self.iteraciones)
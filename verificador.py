@@ -0,0 +1,211 @@
+import argparse
+import glob
+import json
+import multiprocessing
+import os
+import time
+import numpy as np
+
+from cargar_input import leer_input
+
+# Diferencia tolerada entre el objetivo escrito en el .out y el recalculado
+TOLERANCIA_OBJETIVO = 1e-2
+# Cantidad máxima de ítems violados que se listan por salida
+MAX_ITEMS_REPORTADOS = 20
+
+
+def leer_salida(path_out):
+    # Devuelve (objetivo escrito o None, órdenes, pasillos) tal cual aparecen
+    # en el archivo, sin quitar repetidos
+    valor = None
+    ordenes = []
+    pasillos = []
+
+    with open(path_out, "r") as f:
+        lines = [line.strip() for line in f if line.strip()]
+
+    modo = None
+    for line in lines:
+        low = line.lower()
+
+        if low.startswith("mejor valor objetivo"):
+            try:
+                valor = float(line.split(":", 1)[1])
+            except ValueError:
+                valor = None
+            continue
+        if low.startswith("ordenes"):
+            modo = "ordenes"
+            continue
+        if low.startswith("pasillos"):
+            modo = "pasillos"
+            continue
+
+        if modo == "ordenes":
+            ordenes.extend(int(x) for x in line.split())
+        elif modo == "pasillos":
+            pasillos.extend(int(x) for x in line.split())
+
+    return valor, ordenes, pasillos
+
+
+def leer_out(path_out):
+    _, ordenes, pasillos = leer_salida(path_out)
+    return set(ordenes), set(pasillos)
+
+
+def verificar(W, S, LB, UB, ordenes, pasillos, valor_declarado=None):
+    reporte = {"errores": []}
+    ordenes = np.asarray(ordenes, dtype=np.int64)
+    pasillos = np.asarray(pasillos, dtype=np.int64)
+
+    for nombre, ids, n in (("orden", ordenes, W.n_filas), ("pasillo", pasillos, S.n_filas)):
+        fuera = ids[(ids < 0) | (ids >= n)]
+        if len(fuera):
+            reporte["errores"].append(f"{nombre} fuera de rango: {sorted(set(fuera.tolist()))[:MAX_ITEMS_REPORTADOS]}")
+        if len(np.unique(ids)) != len(ids):
+            reporte["errores"].append(f"{nombre} repetido")
+    if reporte["errores"]:
+        reporte["factible"] = False
+        return reporte
+
+    demanda = W.suma_filas(ordenes)
+    capacidad = S.suma_filas(pasillos)
+    violados = np.flatnonzero(demanda > capacidad)
+    unidades = int(demanda.sum())
+    valor = unidades / len(pasillos) if len(pasillos) else 0.0
+
+    reporte.update({
+        "ordenes": len(ordenes),
+        "pasillos": len(pasillos),
+        "unidades": unidades,
+        "valor_objetivo": valor,
+        "valor_declarado": valor_declarado,
+        "lb_ok": unidades >= LB,
+        "ub_ok": unidades <= UB,
+        "items_violados": len(violados),
+        "detalle_items_violados": [
+            {"item": int(e), "demanda": int(demanda[e]), "capacidad": int(capacidad[e])}
+            for e in violados[:MAX_ITEMS_REPORTADOS]
+        ],
+    })
+    if len(pasillos) == 0:
+        reporte["errores"].append("sin pasillos")
+    if valor_declarado is not None and abs(valor_declarado - valor) > TOLERANCIA_OBJETIVO:
+        reporte["errores"].append(f"objetivo declarado {valor_declarado} distinto del recalculado {valor:.4f}")
+
+    reporte["factible"] = bool(len(pasillos) and reporte["lb_ok"] and reporte["ub_ok"] and not len(violados))
+    return reporte
+
+
+def verificar_solucion(path, ordenes_sel, pasillos_sel):
+    # Interfaz de los verificar_factibilidad.py de cada parte
+    W, S, LB, UB = leer_input(str(path), usar_cache=True)
+    reporte = verificar(W, S, LB, UB, sorted(ordenes_sel), sorted(pasillos_sel))
+    imprimir_reporte(reporte)
+    return reporte["factible"]
+
+
+def imprimir_reporte(reporte, prefijo=""):
+    for error in reporte["errores"]:
+        print(f"{prefijo}❌ {error}")
+    for item in reporte.get("detalle_items_violados", []):
+        print(f"{prefijo}❌ No factible: elemento {item['item']}, demanda {item['demanda']}, capacidad {item['capacidad']}")
+    if "unidades" not in reporte:
+        return
+    if not reporte["lb_ok"] or not reporte["ub_ok"]:
+        print(f"{prefijo}❌ No factible: unidades {reporte['unidades']} fuera de [LB, UB]")
+    if reporte["factible"]:
+        print(f"{prefijo}✅ Solución factible")
+    print(f"{prefijo}Unidades totales: {reporte['unidades']}, Pasillos usados: {reporte['pasillos']}, "
+          f"Valor objetivo: {reporte['valor_objetivo']:.2f}")
+
+
+def salidas_de_instancia(path_instancia, carpetas_output):
+    # Acepta los dos nombres que usan las partes: instance_0001.out (parte 5)
+    # y a_instance_0001.out (script.py de las partes 6 y 7)
+    dataset = os.path.basename(os.path.dirname(os.path.abspath(path_instancia)))
+    base = os.path.splitext(os.path.basename(path_instancia))[0]
+    salidas = []
+    for carpeta in carpetas_output:
+        for nombre in (f"{base}.out", f"{dataset}_{base}.out"):
+            path_out = os.path.join(carpeta, nombre)
+            if os.path.exists(path_out):
+                salidas.append(path_out)
+                break
+    return salidas
+
+
+def _verificar_instancia(tarea):
+    # Carga la instancia una vez y verifica todas sus salidas
+    path_instancia, salidas = tarea
+    W, S, LB, UB = leer_input(path_instancia, usar_cache=True)
+    reportes = []
+    for path_out in salidas:
+        try:
+            valor, ordenes, pasillos = leer_salida(path_out)
+            reporte = verificar(W, S, LB, UB, ordenes, pasillos, valor)
+        except Exception as e:
+            reporte = {"factible": False, "errores": [f"error leyendo la salida: {e!r}"]}
+        reporte["instancia"] = path_instancia
+        reporte["salida"] = path_out
+        reportes.append(reporte)
+    return reportes
+
+
+def verificar_lote(dir_instancias, carpetas_output, procesos=None):
+    instancias = sorted(glob.glob(os.path.join(dir_instancias, "*.txt")))
+    tareas = [(p, salidas_de_instancia(p, carpetas_output)) for p in instancias]
+    tareas = [t for t in tareas if t[1]]
+    if not tareas:
+        return []
+
+    procesos = min(procesos or os.cpu_count() or 1, len(tareas))
+    reportes = []
+    if procesos == 1:
+        resultados = map(_verificar_instancia, tareas)
+    else:
+        pool = multiprocessing.get_context().Pool(processes=procesos)
+        resultados = pool.imap_unordered(_verificar_instancia, tareas)
+    try:
+        for reportes_instancia in resultados:
+            reportes.extend(reportes_instancia)
+    finally:
+        if procesos > 1:
+            pool.close()
+            pool.join()
+
+    return sorted(reportes, key=lambda r: (r["instancia"], r["salida"]))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Verifica en lote las salidas .out contra sus instancias")
+    parser.add_argument("instancias", help="directorio del dataset (p. ej. datos_de_entrada/b)")
+    parser.add_argument("outputs", nargs="+", help="carpetas con archivos .out")
+    parser.add_argument("--procesos", type=int, default=None, help="procesos a usar (por defecto, todos los CPU)")
+    parser.add_argument("--reporte", default=None, help="archivo JSON donde escribir el reporte")
+    args = parser.parse_args()
+
+    inicio = time.time()
+    reportes = verificar_lote(args.instancias, args.outputs, args.procesos)
+
+    for reporte in reportes:
+        estado = "✅" if reporte["factible"] and not reporte["errores"] else "❌"
+        problemas = list(reporte["errores"])
+        if reporte.get("lb_ok") is False:
+            problemas.append(f"{reporte['unidades']} unidades < LB")
+        if reporte.get("ub_ok") is False:
+            problemas.append(f"{reporte['unidades']} unidades > UB")
+        valor = reporte.get("valor_objetivo")
+        valor = f"{valor:.2f}" if valor is not None else "-"
+        print(f"{estado} {os.path.relpath(reporte['salida'])}: objetivo {valor}, "
+              f"ítems violados {reporte.get('items_violados', '-')}"
+              + (f" ({'; '.join(problemas)})" if problemas else ""))
+
+    factibles = sum(1 for r in reportes if r["factible"])
+    print(f"\n{factibles}/{len(reportes)} salidas factibles, verificadas en {time.time() - inicio:.2f} segundos")
+
+    if args.reporte:
+        with open(args.reporte, "w", encoding="utf-8") as f:
+            json.dump(reportes, f, indent=2, ensure_ascii=False)
+        print(f"Reporte guardado en {args.reporte}")